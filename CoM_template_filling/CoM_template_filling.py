@@ -13,6 +13,7 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 from zoomin_client import client
+from zoomin_client.utils import measure_time, profiler
 
 
 # Configure logger
@@ -27,6 +28,7 @@ logging.basicConfig(
 )
 
 
+@measure_time
 def get_region_data(region_code, pathway_description="national", result_format="df"):
     """
     Get region data from the DSP
@@ -156,6 +158,7 @@ def get_dsp_value(variable, region_data, year=2020, climate_experiment="RCP8.5")
         return 0
 
 
+@measure_time
 def calculate_sois(region_code: str, region_data: pd.DataFrame) -> dict:
     """
     Calculate SOIs for a region.
@@ -333,6 +336,7 @@ def calculate_sois(region_code: str, region_data: pd.DataFrame) -> dict:
     return soi_df
 
 
+@measure_time
 def fill_com_template(region_code, soi_df, region_data, output_dir=""):
     """
     Fill the CoM template with calculated values.
@@ -445,3 +449,7 @@ if __name__ == "__main__":
     region_data = get_region_data(region_code)
     soi_df = calculate_sois(region_code, region_data)
     fill_com_template(region_code, soi_df, region_data, output_dir=output_dir)
+
+    # set ZOOMIN_PROFILE=1 to profile the stages
+    if profiler.enabled:
+        logger.info(f"Profile of the stages: {profiler.to_json()}")
@@ -0,0 +1,72 @@
+"""
+Compare the rows/s of building a dataframe from paged DSP records.
+
+- `json_normalize`: `pd.json_normalize` per page and one `pd.concat` at the end
+- `columnar`: `ColumnarBuilder`, appending each page to typed column buffers
+
+Usage: python benchmarks/bench_dataframe_builder.py [n_rows] [page_size]
+"""
+import sys
+import time
+import random
+import pandas as pd
+from zoomin_client.columnar import ColumnarBuilder
+
+
+def make_pages(n_rows, page_size):
+    """Return pages of synthetic variable data records, shaped like the DSP's."""
+    random.seed(0)
+    pathways = [None, "national", "with_behavioural_changes"]
+    experiments = [None, "RCP2.6", "RCP4.5", "RCP8.5"]
+    records = [
+        {
+            "value": random.random(),
+            "year": 2020 + 5 * (i % 7),
+            "pathway": pathways[i % 3],
+            "climate_experiment": experiments[i % 4],
+            "var_name": f"var_{i % 50}",
+            "region_code": f"DE{i % 400:03d}_{i:08d}",
+            "value_confidence_level": "MEDIUM",
+        }
+        for i in range(n_rows)
+    ]
+    return [records[i : i + page_size] for i in range(0, n_rows, page_size)]
+
+
+def build_json_normalize(pages):
+    """Build the dataframe as the getters did before `ColumnarBuilder`."""
+    return pd.concat([pd.json_normalize(page) for page in pages])
+
+
+def build_columnar(pages):
+    """Build the dataframe with `ColumnarBuilder`."""
+    builder = ColumnarBuilder()
+    for page in pages:
+        builder.append(page)
+    return builder.build()
+
+
+def measure(build, pages, n_rows, repeat=3):
+    """Return the best rows/s and the memory of the dataframe of `repeat` builds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result_df = build(pages)
+        best = min(best, time.perf_counter() - start)
+    return n_rows / best, result_df.memory_usage(deep=True).sum()
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    pages = make_pages(n_rows, page_size)
+
+    for name, build in [
+        ("json_normalize", build_json_normalize),
+        ("columnar", build_columnar),
+    ]:
+        rows_per_s, n_bytes = measure(build, pages, n_rows)
+        print(
+            f"{name:>15}: {rows_per_s:>12,.0f} rows/s, "
+            f"dataframe {n_bytes / 1024**2:,.1f} MiB"
+        )
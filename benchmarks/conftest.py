@@ -0,0 +1,30 @@
+import os
+import sys
+import pytest
+
+# the stand-in DSP of the tests
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests")
+)
+from fake_dsp import FakeDSP  # noqa: E402
+
+
+def _env(name, default, convert=int):
+    """Return the value of the environment variable ZOOMIN_BENCH_<name>, or `default`."""
+    value = os.environ.get(f"ZOOMIN_BENCH_{name}")
+    return default if value is None else convert(value)
+
+
+@pytest.fixture(scope="module")
+def bench_dsp():
+    """A local stand-in DSP, at the scale and latency set by the ZOOMIN_BENCH_* environment variables."""
+    server = FakeDSP(
+        page_size=_env("PAGE_SIZE", 1000),
+        n_nuts3=_env("N_NUTS3", 20),
+        n_lau_per_nuts3=_env("N_LAU_PER_NUTS3", 25),
+        n_variables_per_kind=_env("N_VARIABLES_PER_KIND", 4),
+        latency=_env("LATENCY", 0.0, float),
+        cache_results=True,
+    ).start()
+    yield server
+    server.stop()
@@ -0,0 +1,123 @@
+"""
+Throughput of each getter and result format against a local stand-in DSP.
+
+Besides the timings of pytest-benchmark, each benchmark reports in its `extra_info`:
+
+- `pages_per_s` and `rows_per_s`: the pages and records fetched per second
+- `build_s`: the seconds spent building the result from the records of the pages
+- `peak_rss_mib`: the peak resident memory of the process so far
+
+The scale and latency of the stand-in DSP are set with the environment variables
+ZOOMIN_BENCH_N_NUTS3, ZOOMIN_BENCH_N_LAU_PER_NUTS3, ZOOMIN_BENCH_N_VARIABLES_PER_KIND,
+ZOOMIN_BENCH_PAGE_SIZE and ZOOMIN_BENCH_LATENCY (seconds per response).
+
+Usage: pytest benchmarks/ [--benchmark-json=results.json] [--benchmark-compare]
+"""
+
+import sys
+import pytest
+from zoomin_client import client
+from zoomin_client.instrumentation import MetricsHook
+
+pytest.importorskip("pytest_benchmark")
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+# the query of each getter, and the result formats it is benchmarked with
+QUERIES = {
+    "get_region_metadata": (
+        lambda dsp: dict(country_code="lv", spatial_resolution="LAU"),
+        ["json"],
+    ),
+    "get_region_data": (
+        lambda dsp: dict(country_code="lv", region_code=dsp.regions[3]["region_code"]),
+        ["json", "df", "arrow", "xarray"],
+    ),
+    "get_variable_metadata": (
+        lambda dsp: dict(country_code="lv"),
+        ["json", "df", "arrow"],
+    ),
+    "get_proxy_details": (
+        lambda dsp: dict(country_code="lv", variable="cproj_annual_mean_temperature"),
+        ["json", "df", "arrow"],
+    ),
+    "get_variable_data": (
+        lambda dsp: dict(
+            country_code="lv",
+            spatial_resolution="LAU",
+            variable="cproj_annual_mean_temperature",
+        ),
+        ["json", "df", "arrow", "xarray"],
+    ),
+}
+
+CASES = [
+    (getter, result_format)
+    for getter, (_, result_formats) in QUERIES.items()
+    for result_format in result_formats
+]
+
+
+class ThroughputHook(MetricsHook):
+    """Add up the pages, records and build time of all queries."""
+
+    def __init__(self):
+        self.n_pages = 0
+        self.n_records = 0
+        self.build_time = 0.0
+
+    def on_page(self, page):
+        self.n_pages += 1
+        self.n_records += page.n_records
+
+    def on_query(self, query):
+        self.build_time += query.normalize_time
+
+
+def peak_rss_mib():
+    """Return the peak resident memory of the process in MiB, or None if unknown."""
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+@pytest.mark.parametrize("getter, result_format", CASES)
+def test_getter(benchmark, bench_dsp, getter, result_format):
+    if result_format == "arrow":
+        pytest.importorskip("pyarrow")
+    if result_format == "xarray":
+        pytest.importorskip("xarray")
+
+    hook = ThroughputHook()
+    # without memoization, so that every call queries the stand-in DSP
+    dsp_client = client.DSPClient(
+        "v5", base_url=bench_dsp.base_url, metadata_memo_size=0, hooks=[hook]
+    )
+    query = QUERIES[getter][0](bench_dsp)
+    # region metadata is always returned as records
+    if getter != "get_region_metadata":
+        query["result_format"] = result_format
+    n_calls = 0
+
+    def run():
+        nonlocal n_calls
+        n_calls += 1
+        return getattr(dsp_client, getter)(**query)
+
+    with dsp_client:
+        result = benchmark(run)
+
+    mean = benchmark.stats.stats.mean
+    benchmark.extra_info.update(
+        pages_per_s=hook.n_pages / n_calls / mean,
+        rows_per_s=hook.n_records / n_calls / mean,
+        build_s=hook.build_time / n_calls,
+        peak_rss_mib=peak_rss_mib(),
+    )
+    assert result is not None and hook.n_records > 0
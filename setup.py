@@ -19,6 +19,13 @@ setuptools.setup(
     packages=setuptools.find_packages(),
     setup_requires=["setuptools-git"],
     python_requires=">=3.10",
+    extras_require={
+        "async": ["httpx"],
+        "streaming": ["ijson"],
+        "parquet": ["pyarrow"],
+        "xarray": ["xarray"],
+        "benchmark": ["pytest-benchmark"],
+    },
     classifiers=[
         "Development Status :: 2 - Pre-Alpha",
         "Intended Audience :: Science/Research",
@@ -0,0 +1,10 @@
+import pytest
+from fake_dsp import FakeDSP
+
+
+@pytest.fixture
+def fake_dsp():
+    """A local stand-in DSP, running for the duration of one test."""
+    server = FakeDSP().start()
+    yield server
+    server.stop()
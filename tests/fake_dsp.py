@@ -0,0 +1,345 @@
+"""A local stand-in for the DSP, serving synthetic data over the paginated DSP endpoints."""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+YEARS = [2020, 2025, 2030, 2035, 2040, 2045, 2050]
+PATHWAYS = ["national", "with_behavioural_changes"]
+CLIMATE_EXPERIMENTS = ["RCP2.6", "RCP4.5", "RCP8.5"]
+
+
+def make_regions(country_code="lv", n_nuts3=6, n_lau_per_nuts3=3):
+    """Return region metadata records of one NUTS1/NUTS2 chain with the given number of NUTS3 and LAU regions."""
+    nuts0 = country_code.upper()
+    regions = [
+        {"resolution": "NUTS0", "region_code": nuts0},
+        {"resolution": "NUTS1", "region_code": f"{nuts0}0"},
+        {"resolution": "NUTS2", "region_code": f"{nuts0}00"},
+    ]
+    for i in range(n_nuts3):
+        nuts3 = f"{nuts0}00{i + 1}"
+        regions.append({"resolution": "NUTS3", "region_code": nuts3})
+        for j in range(n_lau_per_nuts3):
+            regions.append(
+                {"resolution": "LAU", "region_code": f"{nuts3}_{i + 1:02d}{j + 1:05d}"}
+            )
+
+    for region in regions:
+        region["region_name"] = f"Region {region['region_code']}"
+        region["year"] = 2016
+
+    return regions
+
+
+def make_variables(n_per_kind=1):
+    """Return variable metadata records of `n_per_kind` collected, EUCalc and climate projection variables each."""
+    variables = [
+        {
+            "var_name": "population",
+            "var_description": "Number of inhabitants",
+            "var_unit": "number",
+            "data_last_update": 2021,
+            "var_aggregation_method": "SUM",
+        },
+        {
+            "var_name": "eucalc_emissions_co2e",
+            "var_description": None,
+            "var_unit": "Mt",
+            "data_last_update": 2022,
+            "var_aggregation_method": "SUM",
+        },
+        {
+            "var_name": "cproj_annual_mean_temperature",
+            "var_description": "Daily mean temperature averaged over a year",
+            "var_unit": "degree celsius",
+            "data_last_update": 2021,
+            "var_aggregation_method": "AVG",
+        },
+    ]
+    return [
+        dict(
+            variable,
+            var_name=f"{variable['var_name']}_{k}" if k else variable["var_name"],
+        )
+        for k in range(n_per_kind)
+        for variable in variables
+    ]
+
+
+def _value_keys(var_name):
+    """Return the (year, pathway, climate_experiment) combinations a variable has values for."""
+    if var_name.startswith("eucalc_"):
+        return [(year, pathway, None) for year in YEARS for pathway in PATHWAYS]
+    if var_name.startswith("cproj_"):
+        return [(year, None, exp) for year in YEARS for exp in CLIMATE_EXPERIMENTS]
+    return [(2020, None, None)]
+
+
+def make_variable_data(regions, variables):
+    """Return synthetic data records of every variable for every region."""
+    records = []
+    for variable in variables:
+        var_name = variable["var_name"]
+        for region_index, region in enumerate(regions):
+            for year, pathway, climate_experiment in _value_keys(var_name):
+                records.append(
+                    {
+                        "value": float(region_index + 1) + (year - 2020) / 100,
+                        "year": year,
+                        "pathway": pathway,
+                        "climate_experiment": climate_experiment,
+                        "region_code": region["region_code"],
+                        "resolution": region["resolution"],
+                        "var_name": var_name,
+                        "value_confidence_level": "MEDIUM",
+                    }
+                )
+    return records
+
+
+class FakeDSP:
+    """
+    Synthetic DSP data served by a threaded HTTP server on localhost.
+
+    :param page_size: the default number of results per page
+    :param n_nuts3: the number of NUTS3 regions of the country
+    :param n_lau_per_nuts3: the number of LAU regions per NUTS3 region
+    :param max_page_size: the largest page size served, smaller `page_size` parameters are capped to it
+    :param n_variables_per_kind: the number of collected, EUCalc and climate projection variables each
+    :param latency: the seconds every response is delayed by
+    :param cache_results: whether the filtered results of a query are kept for its later pages, instead of
+        filtered again per page. Only for data that is not changed after the first request
+    """
+
+    def __init__(
+        self,
+        page_size=10,
+        n_nuts3=6,
+        n_lau_per_nuts3=3,
+        max_page_size=None,
+        n_variables_per_kind=1,
+        latency=0.0,
+        cache_results=False,
+    ):
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+        self.latency = latency
+        self.slow_pages = None
+        self.regions = make_regions(n_nuts3=n_nuts3, n_lau_per_nuts3=n_lau_per_nuts3)
+        self.variables = make_variables(n_variables_per_kind)
+        self.variable_data = make_variable_data(self.regions, self.variables)
+        # the filtered results of each query, shared by all of its pages
+        self._results = {} if cache_results else None
+
+        self.requests = []
+        self.connections = 0
+        self.faults = []
+        self._lock = threading.Lock()
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(self))
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def origin(self):
+        """Return the scheme, host and port of the server."""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        """Return the URL under which the DSP versions are served."""
+        return f"{self.origin}/dsp/"
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def inject_faults(self, *statuses, retry_after=None):
+        """Answer the next requests with the given HTTP error statuses, in order, before serving data again."""
+        with self._lock:
+            self.faults.extend((status, retry_after) for status in statuses)
+
+    def slow_down(self, page_size, delay):
+        """Answer requests for pages of at least `page_size` results only after `delay` seconds."""
+        self.slow_pages = (page_size, delay)
+
+    def proxy_details(self, var_name):
+        """Return the proxy details of a variable."""
+        return [
+            {
+                "year": year,
+                "disaggregation_binary_criteria": None,
+                "disaggregation_proxy": "population",
+                "proxy_confidence_level": 3,
+            }
+            for year in sorted({key[0] for key in _value_keys(var_name)})
+        ]
+
+    def query(self, endpoint, params):
+        """Return all results of an endpoint, filtered on the query parameters."""
+        if endpoint == "region_metadata":
+            return [
+                region
+                for region in self.regions
+                if region["resolution"] == params.get("resolution")
+                and params.get("region", region["region_code"]) == region["region_code"]
+            ]
+
+        if endpoint == "variable_metadata":
+            return [
+                variable
+                for variable in self.variables
+                if params.get("variable", variable["var_name"]) == variable["var_name"]
+            ]
+
+        if endpoint == "proxy_details":
+            return self.proxy_details(params["variable"])
+
+        # the scenario filters only apply to records with a pathway or climate experiment
+        records = [
+            record
+            for record in self.variable_data
+            if record["pathway"] in (None, params.get("pathway", record["pathway"]))
+            and record["climate_experiment"]
+            in (None, params.get("climate_experiment", record["climate_experiment"]))
+        ]
+
+        if endpoint == "variable_data":
+            return [
+                _strip(record, ("resolution", "var_name"))
+                for record in records
+                if record["resolution"] == params.get("resolution")
+                and record["var_name"] == params.get("variable")
+            ]
+
+        # region_data, region_data/mini_version
+        variables = {variable["var_name"]: variable for variable in self.variables}
+        results = []
+        for record in records:
+            if record["region_code"] != params.get("region"):
+                continue
+            if params.get("variable", record["var_name"]) != record["var_name"]:
+                continue
+
+            result = _strip(
+                record, ("resolution", "region_code", "value_confidence_level")
+            )
+            variable = variables[record["var_name"]]
+            result["var_unit"] = variable["var_unit"]
+            result["var_description"] = variable["var_description"]
+            result["data_last_update"] = variable["data_last_update"]
+            result["var_aggregation_method"] = variable["var_aggregation_method"]
+            results.append(result)
+        return results
+
+    def page(self, url):
+        """Return the DRF-style page body for a request URL."""
+        parsed = urlparse(url)
+        params = dict(parse_qsl(parsed.query))
+        # /dsp/<version>/<country_code>/<endpoint>/[mini_version/]
+        endpoint, *mini_version = parsed.path.strip("/").split("/")[3:]
+
+        filters = {
+            name: value
+            for name, value in params.items()
+            if name not in ("page", "page_size")
+        }
+        key = (parsed.path, tuple(sorted(filters.items())))
+        results = self._results.get(key) if self._results is not None else None
+        if results is None:
+            results = self.query(endpoint, params)
+            if mini_version:
+                results = [
+                    _strip(
+                        result,
+                        (
+                            "var_description",
+                            "data_last_update",
+                            "var_aggregation_method",
+                        ),
+                    )
+                    for result in results
+                ]
+            if self._results is not None:
+                self._results[key] = results
+
+        page_size = int(params.get("page_size", self.page_size))
+        if self.max_page_size is not None:
+            page_size = min(page_size, self.max_page_size)
+        page = int(params.get("page", 1))
+        start = (page - 1) * page_size
+
+        next_url = None
+        if start + page_size < len(results):
+            next_params = dict(params, page=str(page + 1))
+            next_url = f"{self.origin}{parsed.path}?" + urlencode(
+                sorted(next_params.items())
+            )
+
+        return {
+            "count": len(results),
+            "next": next_url,
+            "previous": None,
+            "results": results[start : start + page_size],
+        }
+
+
+def _strip(record, keys):
+    """Return a copy of `record` without `keys`."""
+    return {key: value for key, value in record.items() if key not in keys}
+
+
+def _make_handler(fake_dsp):
+    """Return a request handler class bound to `fake_dsp`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # send the body without waiting for the client to acknowledge the headers
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            with fake_dsp._lock:
+                fake_dsp.connections += 1
+
+        def do_GET(self):  # noqa: N802
+            with fake_dsp._lock:
+                fake_dsp.requests.append(self.path)
+                fault = fake_dsp.faults.pop(0) if fake_dsp.faults else None
+
+            if fault is not None:
+                status, retry_after = fault
+                body = json.dumps({"detail": "injected fault"}).encode("utf-8")
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header("Retry-After", retry_after)
+            else:
+                params = dict(parse_qsl(urlparse(self.path).query))
+                if fake_dsp.latency:
+                    time.sleep(fake_dsp.latency)
+                if fake_dsp.slow_pages is not None:
+                    slow_page_size, delay = fake_dsp.slow_pages
+                    if int(params.get("page_size", 0)) >= slow_page_size:
+                        time.sleep(delay)
+
+                body = json.dumps(fake_dsp.page(self.path)).encode("utf-8")
+                self.send_response(200)
+
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
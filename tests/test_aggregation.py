@@ -0,0 +1,91 @@
+import pandas as pd
+import pytest
+from zoomin_client import client
+from zoomin_client.aggregation import AggregationRule, parent_codes
+
+
+def test_aggregation_matches_group_by(fake_dsp):
+    """Check that LAU data is summed, or averaged with weights, into its parent regions."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    query = dict(country_code="lv", spatial_resolution="LAU", result_format="df")
+    lau_df = dsp_client.get_variable_data(**query, variable="eucalc_emissions_co2e")
+
+    output = dsp_client.aggregate_variable_data(
+        country_code="lv", variable="eucalc_emissions_co2e"
+    )
+
+    # 6 NUTS3, 1 NUTS2 and 1 NUTS0 region * 7 years * 2 pathways
+    assert len(output) == (6 + 1 + 1) * 7 * 2
+    nuts3_output = output[output["resolution"] == "NUTS3"]
+    expected = (
+        lau_df.assign(region_code=lau_df["region_code"].str[:5])
+        .groupby(["region_code", "year", "pathway"], observed=True)["value"]
+        .sum()
+    )
+    output_values = nuts3_output.set_index(["region_code", "year", "pathway"])["value"]
+    pd.testing.assert_series_equal(
+        output_values.sort_index(),
+        expected.sort_index(),
+        check_index_type=False,
+    )
+
+    # temperature averaged over the LAU regions, weighted by their population
+    output = dsp_client.aggregate_variable_data(
+        country_code="lv",
+        variable="cproj_annual_mean_temperature",
+        spatial_resolutions=["NUTS0"],
+        climate_experiment="RCP2.6",
+        rules={
+            "cproj_annual_mean_temperature": AggregationRule(
+                "weighted_mean", "population"
+            )
+        },
+    )
+    population = dsp_client.get_variable_data(**query, variable="population")
+    population = population.set_index("region_code")["value"]
+    temperature_df = dsp_client.get_variable_data(
+        **query, variable="cproj_annual_mean_temperature", climate_experiment="RCP2.6"
+    )
+    temperature_2050 = temperature_df[temperature_df["year"] == 2050]
+    weights = temperature_2050["region_code"].map(population)
+    expected_2050 = (temperature_2050["value"] * weights).sum() / weights.sum()
+
+    assert len(output) == 7
+    assert output.loc[output["year"] == 2050, "value"].item() == pytest.approx(
+        expected_2050
+    )
+
+
+def test_aggregation_check(fake_dsp):
+    """Check that aggregated values are compared against the values of the DSP."""
+    # the NUTS3 population of the DSP is the sum of its LAU population, except in LV001
+    population = {
+        record["region_code"]: record
+        for record in fake_dsp.variable_data
+        if record["var_name"] == "population"
+    }
+    for region_code, record in population.items():
+        if record["resolution"] == "NUTS3":
+            record["value"] = sum(
+                lau_record["value"]
+                for lau_code, lau_record in population.items()
+                if lau_code.startswith(f"{region_code}_")
+            )
+    population["LV001"]["value"] += 1
+
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    output = dsp_client.aggregate_variable_data(
+        country_code="lv",
+        variable="population",
+        spatial_resolutions=["NUTS3"],
+        check=True,
+        result_format="json",
+    )
+
+    assert [record["region_code"] for record in output if not record["matches"]] == [
+        "LV001"
+    ]
+    assert parent_codes(pd.Series(["LV001_0100001", "LV002"]), "NUTS2").tolist() == [
+        "LV00",
+        "LV00",
+    ]
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+import pandas as pd
+from zoomin_client import client
+
+pytest.importorskip("httpx")
+
+from zoomin_client.async_client import AsyncDSPClient  # noqa: E402
+
+
+def test_async_region_data_gather(fake_dsp):
+    """Check that concurrent region queries return the same data as one at a time."""
+    region_codes = [
+        region["region_code"]
+        for region in fake_dsp.regions
+        if region["resolution"] == "LAU"
+    ]
+
+    async def gather_region_data():
+        async with AsyncDSPClient(
+            "v5", base_url=fake_dsp.base_url, max_concurrency=4
+        ) as dsp_client:
+            return await asyncio.gather(
+                *[
+                    dsp_client.get_region_data(
+                        country_code="lv", region_code=region_code
+                    )
+                    for region_code in region_codes
+                ]
+            )
+
+    outputs = asyncio.run(gather_region_data())
+
+    assert len(outputs) == len(region_codes)
+    for output in outputs:
+        # population + eucalc (years * pathways) + cproj (years * RCPs)
+        assert len(output) == 1 + 7 * 2 + 7 * 3
+
+
+def test_async_proxy_details(fake_dsp):
+    """Check that proxy details are returned in each result format as by the synchronous client."""
+    pytest.importorskip("pyarrow")
+    query = dict(country_code="lv", variable="population")
+
+    async def get_proxy_details(result_format):
+        async with AsyncDSPClient("v5", base_url=fake_dsp.base_url) as dsp_client:
+            return await dsp_client.get_proxy_details(
+                **query, result_format=result_format
+            )
+
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    output = asyncio.run(get_proxy_details("df"))
+    assert len(output) == 1
+    pd.testing.assert_frame_equal(
+        output, dsp_client.get_proxy_details(**query, result_format="df")
+    )
+    assert asyncio.run(get_proxy_details("json")) == dsp_client.get_proxy_details(
+        **query
+    )
+    assert asyncio.run(get_proxy_details("arrow")).equals(
+        dsp_client.get_proxy_details(**query, result_format="arrow")
+    )
+
+
+def test_async_retry(fake_dsp):
+    """Check that the asynchronous client retries transient errors."""
+    from zoomin_client.retry import RetryPolicy
+
+    fake_dsp.inject_faults(503, 429)
+
+    async def get_variable_data():
+        async with AsyncDSPClient(
+            "v5",
+            base_url=fake_dsp.base_url,
+            retry_policy=RetryPolicy(backoff_factor=0.01),
+        ) as dsp_client:
+            return await dsp_client.get_variable_data(
+                country_code="lv", spatial_resolution="LAU", variable="population"
+            )
+
+    assert len(asyncio.run(get_variable_data())) == 18
+    assert len(fake_dsp.requests) == 2 + 2
+
+
+def test_async_adaptive_page_size(fake_dsp):
+    """Check that the asynchronous client grows an adaptive page size."""
+    from zoomin_client.paging import AdaptivePageSize
+
+    async def get_variable_data():
+        async with AsyncDSPClient("v5", base_url=fake_dsp.base_url) as dsp_client:
+            return await dsp_client.get_variable_data(
+                country_code="lv",
+                spatial_resolution="LAU",
+                variable="eucalc_emissions_co2e",
+                page_size=AdaptivePageSize(initial_size=64, min_size=8),
+            )
+
+    assert len(asyncio.run(get_variable_data())) == 252
+    assert len(fake_dsp.requests) == 3
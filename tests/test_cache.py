@@ -0,0 +1,83 @@
+import os
+import time
+from zoomin_client import client
+from zoomin_client.cache import ResponseCache
+
+
+def test_cache_modes(fake_dsp, tmp_path):
+    """Check that 'use' serves cached pages, and 'refresh' and 'off' fetch them."""
+    dsp_client = client.DSPClient(
+        "v5",
+        base_url=fake_dsp.base_url,
+        response_cache=ResponseCache(str(tmp_path)),
+        metadata_memo_size=0,
+    )
+    query = dict(country_code="lv", spatial_resolution="LAU")
+
+    output = dsp_client.get_region_metadata(**query, cache="use")
+    assert len(fake_dsp.requests) == 2
+
+    assert dsp_client.get_region_metadata(**query, cache="use") == output
+    assert len(fake_dsp.requests) == 2
+
+    assert dsp_client.get_region_metadata(**query, cache="refresh") == output
+    assert len(fake_dsp.requests) == 4
+
+    assert dsp_client.get_region_metadata(**query, cache="off") == output
+    assert len(fake_dsp.requests) == 6
+
+
+def test_cache_ttl(tmp_path):
+    """Check that entries expire after the time-to-live of their endpoint."""
+    response_cache = ResponseCache(str(tmp_path), ttl={"variable_data": 0})
+    metadata_url = "http://localhost/dsp/v5/lv/variable_metadata/"
+    data_url = "http://localhost/dsp/v5/lv/variable_data/?variable=population"
+
+    response_cache.set(metadata_url, {"results": [1]})
+    response_cache.set(data_url, {"results": [2]})
+
+    assert response_cache.get(metadata_url) == {"results": [1]}
+    assert response_cache.get(data_url) is None
+
+
+def test_cache_lru_eviction(tmp_path):
+    """Check that the least recently used entries are evicted once the cache is full."""
+    response_cache = ResponseCache(str(tmp_path), max_size=250)
+    urls = [f"http://localhost/dsp/v5/lv/proxy_details/?variable={i}" for i in range(3)]
+
+    response_cache.set(urls[0], {"results": [0]})
+    response_cache.set(urls[1], {"results": [1]})
+    # make the first entry the most recently used one
+    os.utime(response_cache._path(urls[1]), (time.time() - 60, time.time() - 60))
+    assert response_cache.get(urls[0]) is not None
+
+    response_cache.set(urls[2], {"results": [2]})
+
+    assert response_cache.get(urls[0]) is not None
+    assert response_cache.get(urls[1]) is None
+    assert response_cache.get(urls[2]) is not None
+
+
+def test_metadata_memoization(fake_dsp):
+    """Check that repeated metadata queries are answered from memory."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+
+    output = dsp_client.get_variable_metadata(country_code="lv")
+    output.append({"var_name": "added_by_caller"})
+    assert dsp_client.get_variable_metadata(country_code="lv") == output[:-1]
+    assert len(fake_dsp.requests) == 1
+
+    var_name = output[0]["var_name"]
+    output[0]["var_name"] = "changed_by_caller"
+    assert (
+        dsp_client.get_variable_metadata(country_code="lv")[0]["var_name"] == var_name
+    )
+
+    dsp_client.get_proxy_details(country_code="lv", variable="population")
+    dsp_client.get_proxy_details(country_code="lv", variable="population")
+    dsp_client.get_proxy_details(country_code="lv", variable="eucalc_emissions_co2e")
+    assert len(fake_dsp.requests) == 3
+
+    dsp_client.clear_cache()
+    dsp_client.get_variable_metadata(country_code="lv")
+    assert len(fake_dsp.requests) == 4
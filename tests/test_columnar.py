@@ -0,0 +1,41 @@
+import pandas as pd
+from zoomin_client.columnar import ColumnarBuilder
+
+
+def test_columnar_builder_matches_json_normalize():
+    """Check that the built dataframe holds the same data as json_normalize + concat."""
+    pages = [
+        [
+            {"value": 1.5, "year": 2020, "pathway": "national", "var_name": "a"},
+            {"value": None, "year": 2025, "pathway": None, "var_name": "a"},
+        ],
+        [
+            {"value": 3, "year": None, "climate_experiment": "RCP2.6", "var_name": "b"},
+            {"value": 4.0, "year": 2030, "unit": {"name": "Mt"}, "var_name": "c"},
+        ],
+    ]
+
+    builder = ColumnarBuilder()
+    for page in pages:
+        builder.append(page)
+    output = builder.build()
+
+    expected = pd.concat([pd.json_normalize(page) for page in pages])
+    expected = expected.reset_index(drop=True)[list(output.columns)]
+
+    assert isinstance(output["var_name"].dtype, pd.CategoricalDtype)
+    assert output["value"].dtype == "float64"
+    pd.testing.assert_frame_equal(
+        output.astype(object).where(output.notna(), None),
+        expected.astype(object).where(expected.notna(), None),
+    )
+
+
+def test_columnar_builder_falls_back_on_unexpected_types():
+    """Check that a field which does not fit its typed buffer keeps its values."""
+    output = ColumnarBuilder.from_records(
+        [{"year": 2020, "value": 1.0}, {"year": "unknown", "value": "n/a"}]
+    )
+
+    assert output["year"].tolist() == [2020, "unknown"]
+    assert output["value"].tolist() == [1.0, "n/a"]
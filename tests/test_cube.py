@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+from zoomin_client import client
+from zoomin_client.cube import CubeBuilder
+
+
+def test_cube_builder_matches_pivot_table():
+    """Check that the cube holds the values of pivot_table, with NaN for missing combinations."""
+    pages = [
+        [
+            {"region_code": "A", "year": 2020, "pathway": "national", "value": 1.0},
+            {"region_code": "B", "year": 2020, "pathway": "national", "value": 2.0},
+        ],
+        [
+            {"region_code": "A", "year": 2025, "pathway": "national", "value": 3.0},
+            {"region_code": "B", "year": 2025, "pathway": None, "value": None},
+        ],
+    ]
+
+    builder = CubeBuilder()
+    for page in pages:
+        builder.append(page)
+    cube, coords = builder.build_numpy()
+
+    assert coords == {
+        "region_code": ["A", "B"],
+        "year": [2020, 2025],
+        "pathway": ["national", None],
+    }
+    assert cube.shape == (2, 2, 2)
+
+    expected = pd.DataFrame([record for page in pages for record in page])
+    expected = expected[expected["pathway"].notna()].pivot_table(
+        index="region_code", columns="year", values="value"
+    )
+    np.testing.assert_array_equal(cube[:, :, 0], expected.to_numpy())
+    assert np.isnan(cube[:, :, 1]).all()
+
+
+def test_xarray_result_format(fake_dsp):
+    """Check that variable data is returned as a cube with one dimension per field."""
+    pytest.importorskip("xarray")
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    query = dict(
+        country_code="lv", spatial_resolution="LAU", variable="eucalc_emissions_co2e"
+    )
+
+    output = dsp_client.get_variable_data(**query, result_format="xarray")
+    output_df = dsp_client.get_variable_data(**query, result_format="df")
+
+    assert output.dims == ("region_code", "year", "pathway")
+    assert output.shape == (18, 7, 2)
+    record = output_df.iloc[0]
+    assert (
+        output.sel(
+            region_code=record["region_code"],
+            year=record["year"],
+            pathway=record["pathway"],
+        ).item()
+        == record["value"]
+    )
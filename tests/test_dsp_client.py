@@ -0,0 +1,281 @@
+import time
+import pytest
+import pandas as pd
+from zoomin_client import client
+
+
+def test_client_reuses_connections(fake_dsp):
+    """Check that all pages of a query are fetched over one pooled connection."""
+    with client.DSPClient("v5", base_url=fake_dsp.base_url) as dsp_client:
+        output = dsp_client.get_variable_data(
+            country_code="lv",
+            spatial_resolution="LAU",
+            variable="population",
+            result_format="df",
+        )
+
+    assert isinstance(output, pd.DataFrame)
+    assert len(output) == 18
+    assert len(fake_dsp.requests) == 2
+    assert fake_dsp.connections == 1
+
+
+def test_client_without_keep_alive(fake_dsp):
+    """Check that a client without keep-alive opens a connection per page."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url, keep_alive=False)
+    output = dsp_client.get_region_metadata(country_code="lv", spatial_resolution="LAU")
+
+    assert len(output) == 18
+    assert fake_dsp.connections == len(fake_dsp.requests) == 2
+
+
+@pytest.mark.parametrize("result_format", ["json", "df"])
+def test_prefetch_keeps_page_order(fake_dsp, result_format):
+    """Check that prefetched pages are combined in the same order as followed pages."""
+    query = dict(
+        country_code="lv",
+        spatial_resolution="LAU",
+        variable="eucalc_emissions_co2e",
+        result_format=result_format,
+    )
+    sequential = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    prefetching = client.DSPClient("v5", base_url=fake_dsp.base_url, prefetch_workers=4)
+
+    expected = sequential.get_variable_data(**query)
+    output = prefetching.get_variable_data(**query)
+
+    if result_format == "json":
+        assert output == expected
+    else:
+        pd.testing.assert_frame_equal(output, expected)
+    # 18 LAU * 7 years * 2 pathways, 10 per page, requested by both clients
+    assert len(fake_dsp.requests) == 2 * 26
+
+
+def test_prefetch_window(fake_dsp):
+    """Check that prefetching keeps a window of pages ahead, and follows `next` after an empty first page."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url, prefetch_workers=2)
+    query = dict(
+        country_code="lv", spatial_resolution="LAU", variable="eucalc_emissions_co2e"
+    )
+
+    records = dsp_client.iter_variable_data(**query, result_format="df")
+    next(records)
+    next(records)
+    time.sleep(0.2)
+    # the first page, the page yielded and the 2 pages fetched ahead of it
+    assert len(fake_dsp.requests) == 4
+    records.close()
+
+    get_page = dsp_client._get_page
+
+    def empty_first_page(request_url, *args):
+        page = get_page(request_url, *args)
+        return page if "page=" in request_url else dict(page, results=[])
+
+    dsp_client._get_page = empty_first_page
+    output = dsp_client.get_variable_data(**query)
+    assert len(output) == 18 * 7 * 2 - 10
+
+
+def test_get_region_data_many(fake_dsp):
+    """Check that region data is concatenated, and that errors are collected per region."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    region_codes = ["LV001", "LV002"]
+
+    output, errors = dsp_client.get_region_data_many(
+        region_codes=region_codes,
+        country_code="lv",
+        variable="population",
+        result_format="df",
+        concat=True,
+    )
+
+    assert list(output["region_code"].unique()) == region_codes
+    assert errors == {}
+
+    _, errors = dsp_client.get_region_data_many(
+        region_codes=region_codes,
+        country_code="lv",
+        pathway_description="unknown",
+    )
+    assert sorted(errors) == sorted(region_codes)
+    assert all(isinstance(error, ValueError) for error in errors.values())
+
+
+def test_get_variable_data_many(fake_dsp):
+    """Check that variable data is returned per (country, variable)."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    output, errors = dsp_client.get_variable_data_many(
+        country_codes=["lv"],
+        variables=["population", "eucalc_emissions_co2e"],
+        spatial_resolution="NUTS3",
+    )
+
+    assert errors == {}
+    assert len(output[("lv", "population")]) == 6
+    assert len(output[("lv", "eucalc_emissions_co2e")]) == 6 * 7 * 2
+
+
+def test_multi_valued_filters(fake_dsp):
+    """Check that one query runs per combination of filter values, and that the records are merged once."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+
+    output = dsp_client.get_region_data(
+        country_code="lv",
+        region_code="LV001",
+        pathway_description=["national", "with_behavioural_changes"],
+        climate_experiment=["RCP2.6", "RCP8.5"],
+        result_format="df",
+    )
+
+    # population + eucalc (years * pathways) + cproj (years * 2 RCPs), each once
+    assert len(output) == 1 + 7 * 2 + 7 * 2
+    # 4 combinations of 15 records, 10 per page
+    assert len(fake_dsp.requests) == 4 * 2
+
+    output = dsp_client.get_variable_data(
+        country_code="lv",
+        spatial_resolution="NUTS3",
+        variable=["population", "eucalc_emissions_co2e"],
+        pathway_description="national",
+    )
+    assert len(output) == 6 + 6 * 7
+    assert {record["var_name"] for record in output} == {
+        "population",
+        "eucalc_emissions_co2e",
+    }
+
+    with pytest.raises(ValueError):
+        dsp_client.get_variable_data(
+            country_code="lv",
+            spatial_resolution="NUTS3",
+            variable="eucalc_emissions_co2e",
+            pathway_description=["national", "unknown"],
+        )
+
+
+def test_iter_variable_data(fake_dsp):
+    """Check that records are yielded page by page, without fetching ahead."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    query = dict(
+        country_code="lv", spatial_resolution="LAU", variable="eucalc_emissions_co2e"
+    )
+
+    records = dsp_client.iter_variable_data(**query)
+    first_record = next(records)
+    assert len(fake_dsp.requests) == 1
+
+    assert [first_record, *records] == dsp_client.get_variable_data(**query)
+
+    pages = list(dsp_client.iter_variable_data(**query, result_format="df"))
+    assert len(pages) == 26
+    assert all(len(page) <= 10 for page in pages)
+
+
+def test_incremental_parsing(fake_dsp):
+    """Check that incrementally parsed pages equal fully buffered ones."""
+    pytest.importorskip("ijson")
+    query = dict(country_code="lv", region_code="LV001", mini_version=False)
+
+    expected = client.DSPClient("v5", base_url=fake_dsp.base_url).get_region_data(
+        **query
+    )
+    output = client.DSPClient(
+        "v5", base_url=fake_dsp.base_url, incremental_parsing=True
+    ).get_region_data(**query)
+
+    assert output == expected
+    assert all(isinstance(record["value"], float) for record in output)
+
+
+def test_arrow_and_parquet(fake_dsp, tmp_path):
+    """Check that arrow results match dataframes and are saved as a partitioned dataset."""
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset as ds
+
+    query = dict(
+        country_code="lv",
+        spatial_resolution="LAU",
+        variable="eucalc_emissions_co2e",
+    )
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    output_df = dsp_client.get_variable_data(**query, result_format="df")
+    output_table = dsp_client.get_variable_data(
+        **query,
+        result_format="arrow",
+        save_result=True,
+        save_path=str(tmp_path),
+        partition_cols=["country_code", "var_name", "year"],
+    )
+
+    pd.testing.assert_frame_equal(output_table.to_pandas(), output_df)
+    assert (tmp_path / "variable_data" / "country_code=lv").is_dir()
+
+    dataset = ds.dataset(tmp_path / "variable_data", partitioning="hive")
+    saved = dataset.to_table(columns=["value"], filter=ds.field("year") == 2020)
+    assert saved.num_rows == (output_df["year"] == 2020).sum()
+
+    dsp_client.get_region_metadata(
+        country_code="lv",
+        spatial_resolution="LAU",
+        save_result=True,
+        save_path=str(tmp_path),
+        save_format="parquet",
+    )
+    assert len(pd.read_parquet(tmp_path / "region_metadata.parquet")) == 18
+
+
+def test_partition_cols_checked_before_query(fake_dsp, tmp_path, monkeypatch):
+    """Check that a partitioned save that cannot be made fails before any request."""
+    query = dict(
+        country_code="lv",
+        spatial_resolution="LAU",
+        variable="population",
+        save_result=True,
+        save_path=str(tmp_path),
+        partition_cols=["country_code"],
+    )
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    with pytest.raises(ValueError, match="partition_cols"):
+        dsp_client.get_variable_data(**query, save_format="csv")
+
+    monkeypatch.setattr(client, "pa", None)
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        dsp_client.get_variable_data(**query, result_format="arrow")
+
+    assert not fake_dsp.requests
+
+
+def test_checkpoint_resumes_failed_query(fake_dsp, tmp_path):
+    """Check that a query failing midway resumes from the last checkpointed page."""
+    query = dict(
+        country_code="lv",
+        spatial_resolution="LAU",
+        variable="eucalc_emissions_co2e",
+        result_format="df",
+        checkpoint_dir=str(tmp_path),
+    )
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    expected = dsp_client.get_variable_data(**query)
+    n_pages = len(fake_dsp.requests)
+    assert list(tmp_path.iterdir()) == []
+
+    get_page = dsp_client._get_page
+
+    def fail_on_page_6(request_url, *args):
+        if "page=6" in request_url:
+            raise TimeoutError(request_url)
+        return get_page(request_url, *args)
+
+    dsp_client._get_page = fail_on_page_6
+    with pytest.raises(TimeoutError):
+        dsp_client.get_variable_data(**query)
+
+    dsp_client._get_page = get_page
+    fake_dsp.requests.clear()
+    output = dsp_client.get_variable_data(**query)
+
+    pd.testing.assert_frame_equal(output, expected)
+    assert len(fake_dsp.requests) == n_pages - 5
+    assert list(tmp_path.iterdir()) == []
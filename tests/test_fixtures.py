@@ -0,0 +1,38 @@
+import pytest
+from zoomin_client import client
+from zoomin_client.fixtures import FixtureArchive, FixtureNotFoundError
+
+QUERY = dict(
+    country_code="lv",
+    spatial_resolution="LAU",
+    variable="eucalc_emissions_co2e",
+    result_format="df",
+)
+
+
+def test_record_and_replay(fake_dsp, tmp_path):
+    """Check that recorded pages are replayed without requests, with their latencies if asked."""
+    path = str(tmp_path / "fixtures" / "dsp.jsonl.gz")
+    recording = client.DSPClient(
+        "v5", base_url=fake_dsp.base_url, fixtures=FixtureArchive(path, "record")
+    )
+    expected = recording.get_variable_data(**QUERY)
+    recording.get_region_metadata(country_code="lv", spatial_resolution="LAU")
+    n_requests = len(fake_dsp.requests)
+    fake_dsp.stop()
+
+    archive = FixtureArchive(path, "replay")
+    assert len(archive) == n_requests
+
+    replaying = client.DSPClient("v5", base_url=fake_dsp.base_url, fixtures=archive)
+    records = replaying.get_variable_data(**dict(QUERY, result_format="json"))
+    records[0]["value"] = None
+    output = replaying.get_variable_data(**QUERY)
+    assert output.equals(expected)
+
+    with pytest.raises(FixtureNotFoundError):
+        replaying.get_variable_metadata(country_code="lv")
+
+    replaying.fixtures = FixtureArchive(path, "replay", replay_latency=True)
+    output = replaying.get_region_metadata(country_code="lv", spatial_resolution="LAU")
+    assert len(output) == 18
@@ -0,0 +1,91 @@
+from zoomin_client import client
+from zoomin_client.cache import ResponseCache
+from zoomin_client.instrumentation import MetricsHook
+from zoomin_client.retry import RetryPolicy
+
+QUERY = dict(
+    country_code="lv",
+    spatial_resolution="LAU",
+    variable="eucalc_emissions_co2e",
+    result_format="df",
+)
+
+
+class RecordingHook(MetricsHook):
+    def __init__(self):
+        self.pages = []
+        self.queries = []
+
+    def on_page(self, page):
+        self.pages.append(page)
+
+    def on_query(self, query):
+        self.queries.append(query)
+
+
+def test_page_and_query_metrics(fake_dsp, tmp_path):
+    """Check that every page is reported with its retries and cache hits, and that the summary is attached to the result."""
+    hook = RecordingHook()
+    dsp_client = client.DSPClient(
+        "v5",
+        base_url=fake_dsp.base_url,
+        prefetch_workers=4,
+        response_cache=ResponseCache(str(tmp_path)),
+        retry_policy=RetryPolicy(backoff_factor=0.01),
+        hooks=[hook],
+    )
+    fake_dsp.inject_faults(503)
+    output = dsp_client.get_variable_data(**QUERY, cache="refresh")
+
+    # 18 LAU * 7 years * 2 pathways, 10 per page, all of them prefetched but the first
+    assert len(hook.pages) == 26
+    assert sum(page.n_records for page in hook.pages) == len(output)
+    assert all(page.n_bytes > 0 and page.parse_time is not None for page in hook.pages)
+    assert [query.pages for query in hook.queries] == [hook.pages]
+
+    summary = output.attrs["query_metrics"]
+    assert summary["n_pages"] == 26
+    assert summary["retries"] == 1
+    assert summary["cache_hits"] == 0
+    assert summary["n_records"] == len(output)
+
+    output = dsp_client.get_variable_data(**QUERY, cache="use")
+    assert output.attrs["query_metrics"]["cache_hits"] == 26
+    assert len(fake_dsp.requests) == 27
+
+
+def test_query_metrics_of_any_result_format(fake_dsp, tmp_path):
+    """Check that the summary of the last query is returned for every getter, whatever its result format and source."""
+    hook = RecordingHook()
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url, hooks=[hook])
+    assert dsp_client.last_query_metrics() is None
+
+    output = dsp_client.get_variable_data(**{**QUERY, "result_format": "json"})
+    assert dsp_client.last_query_metrics()["n_records"] == len(output)
+
+    metadata_query = dict(country_code="lv", result_format="df")
+    dsp_client.get_variable_metadata(**metadata_query)
+    assert dsp_client.last_query_metrics()["n_pages"] == 1
+
+    # answered from memory, without pages
+    output = dsp_client.get_variable_metadata(**metadata_query)
+    summary = dsp_client.last_query_metrics()
+    assert summary["n_pages"] == 0
+    assert summary["n_records"] == len(output) == 3
+    assert output.attrs["query_metrics"] == summary
+
+    output = dsp_client.get_proxy_details(country_code="lv", variable="population")
+    assert dsp_client.last_query_metrics()["n_pages"] == 1
+    assert "proxy_details" in hook.queries[-1].url
+
+    # collected by worker threads
+    dsp_client.get_variable_data(
+        **{**QUERY, "variable": ["population", "eucalc_emissions_co2e"]}
+    )
+    assert dsp_client.last_query_metrics() is None
+
+    dsp_client.sync_country("lv", store_path=str(tmp_path / "replica.sqlite3"))
+    output = dsp_client.get_variable_data(**QUERY, source="local")
+    summary = dsp_client.last_query_metrics()
+    assert summary["n_pages"] == 0
+    assert summary["n_records"] == len(output) == 252
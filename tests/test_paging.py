@@ -0,0 +1,87 @@
+from urllib.parse import parse_qsl, urlparse
+import pytest
+from fake_dsp import FakeDSP
+from zoomin_client import client
+from zoomin_client.paging import AdaptivePageSize, AdaptivePager, PagingError
+
+QUERY = dict(
+    country_code="lv", spatial_resolution="LAU", variable="eucalc_emissions_co2e"
+)
+
+
+def _page_sizes(request_paths):
+    """Return the page size parameter of each request."""
+    return [
+        int(dict(parse_qsl(urlparse(path).query))["page_size"])
+        for path in request_paths
+    ]
+
+
+def test_fixed_page_size(fake_dsp):
+    """Check that a larger page size returns the same data in fewer requests."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    expected = dsp_client.get_variable_data(**QUERY)
+    fake_dsp.requests.clear()
+
+    output = dsp_client.get_variable_data(**QUERY, page_size=100)
+
+    assert output == expected
+    # 18 LAU * 7 years * 2 pathways
+    assert len(fake_dsp.requests) == 3
+
+    with pytest.raises(ValueError):
+        dsp_client.get_variable_data(**QUERY, page_size=0)
+
+
+def test_adaptive_page_size_grows(fake_dsp):
+    """Check that fast pages grow the page size, within the size the DSP serves."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    expected = dsp_client.get_variable_data(**QUERY)
+    fake_dsp.requests.clear()
+
+    output = dsp_client.get_variable_data(
+        **QUERY, page_size=AdaptivePageSize(initial_size=8, min_size=8, max_size=256)
+    )
+
+    assert output == expected
+    # the page size only doubles at offsets that are a multiple of the doubled size
+    assert _page_sizes(fake_dsp.requests) == [8, 8, 16, 32, 64, 128]
+
+    capped_dsp = FakeDSP(max_page_size=50).start()
+    try:
+        dsp_client = client.DSPClient("v5", base_url=capped_dsp.base_url)
+        output = dsp_client.get_variable_data(**QUERY, page_size="adaptive")
+    finally:
+        capped_dsp.stop()
+
+    assert output == expected
+    # the first page is served at 50 and requested again at 32
+    assert _page_sizes(capped_dsp.requests)[:2] == [1024, 32]
+
+
+def test_adaptive_page_size_shrinks_after_timeout(fake_dsp):
+    """Check that a page that timed out is requested again at half the size."""
+    fake_dsp.slow_down(page_size=32, delay=1)
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url, timeout=(5, 0.3))
+
+    output = dsp_client.get_variable_data(
+        **QUERY,
+        page_size=AdaptivePageSize(initial_size=64, min_size=8, max_size=64),
+        result_format="df",
+    )
+
+    assert len(output) == 252
+    assert _page_sizes(fake_dsp.requests)[:3] == [64, 32, 16]
+    assert set(_page_sizes(fake_dsp.requests)[2:]) == {16}
+
+
+def test_adaptive_pager_rejects_empty_pages():
+    """Check that an empty page with a next link raises instead of being requested again."""
+    pager = AdaptivePager("http://dsp/v5/lv/variable_data/", AdaptivePageSize())
+    page = {"count": 100, "next": "http://dsp/v5/lv/variable_data/?page=2"}
+
+    with pytest.raises(PagingError):
+        pager.add_page(dict(page, results=[]), 0.1)
+
+    assert pager.add_page(dict(page, count=0, next=None, results=[]), 0.1) == []
+    assert pager.next_url() is None
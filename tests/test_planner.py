@@ -0,0 +1,59 @@
+import pytest
+from zoomin_client import client
+from zoomin_client.planner import resolution_of
+
+
+def _record_key(record):
+    """Return a sort key of a record with None values."""
+    return [str(value) for value in record.values()]
+
+
+def test_strategies_return_the_same_slice(fake_dsp):
+    """Check that region- and variable-wise queries return the same records."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    query = dict(
+        country_code="lv",
+        regions=["LV001", "LV002", "LV001_0100001"],
+        variables=["eucalc_emissions_co2e", "population"],
+        years=[2020, 2030],
+    )
+
+    by_region = dsp_client.get_data(**query, strategy="region")
+    by_variable = dsp_client.get_data(**query, strategy="variable")
+
+    # 3 regions * (2 years * 2 pathways + 1 population value)
+    assert len(by_region) == 15
+    assert sorted(by_region, key=_record_key) == sorted(by_variable, key=_record_key)
+    # region-wise results follow the order of the regions given
+    assert list(dict.fromkeys(record["region_code"] for record in by_region)) == (
+        query["regions"]
+    )
+
+
+def test_planner_chooses_the_cheaper_strategy(fake_dsp):
+    """Check that the planner picks the strategy with the fewest estimated pages."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+
+    # few regions of many values: one query per region
+    plan = dsp_client.plan_data(
+        "lv", regions=["LV001"], variables=["eucalc_emissions_co2e", "population"]
+    )
+    assert plan.strategy == "region"
+    assert plan.estimated_pages < plan.alternative_pages
+
+    # all regions of one variable: one query per spatial resolution
+    plan = dsp_client.plan_data(
+        "lv", spatial_resolution="LAU", variables=["population"]
+    )
+    assert plan.strategy == "variable"
+    assert plan.queries == [{"spatial_resolution": "LAU", "variable": "population"}]
+
+    output = dsp_client.get_data(
+        "lv", spatial_resolution="LAU", variables=["population"]
+    )
+    assert len(output) == 18
+
+    with pytest.raises(ValueError):
+        dsp_client.plan_data("lv", variables=["population"])
+    with pytest.raises(ValueError):
+        resolution_of("LV00123")
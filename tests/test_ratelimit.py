@@ -0,0 +1,97 @@
+import time
+import threading
+import multiprocessing
+from zoomin_client import client
+from zoomin_client.ratelimit import RateLimiter
+
+
+def take_tokens(lock_dir, n_tokens, timestamps):
+    """Take tokens from a limiter shared through `lock_dir` and record when each was taken."""
+    rate_limiter = RateLimiter(rate=20, lock_dir=lock_dir)
+    for _ in range(n_tokens):
+        with rate_limiter.limit():
+            timestamps.put(time.time())
+
+
+def test_rate():
+    """Check that tokens are handed out at the sustained rate after the burst."""
+    rate_limiter = RateLimiter(rate=20, burst=5)
+
+    start = time.monotonic()
+    for _ in range(5 + 10):
+        with rate_limiter.limit():
+            pass
+
+    assert 0.45 <= time.monotonic() - start < 1.5
+
+
+def test_pause():
+    """Check that no request is let through while the limiter is paused, e.g. after a 429, also without a rate."""
+    for rate_limiter in [RateLimiter(rate=100, burst=10), RateLimiter(max_in_flight=2)]:
+        rate_limiter.pause(0.3)
+
+        start = time.monotonic()
+        with rate_limiter.limit():
+            pass
+
+        assert time.monotonic() - start >= 0.3
+
+
+def test_max_in_flight():
+    """Check that no more than `max_in_flight` threads hold a slot at once."""
+    rate_limiter = RateLimiter(max_in_flight=2)
+    in_flight = []
+    lock = threading.Lock()
+    counts = []
+
+    def request():
+        with rate_limiter.limit():
+            with lock:
+                in_flight.append(1)
+                counts.append(len(in_flight))
+            time.sleep(0.02)
+            with lock:
+                in_flight.pop()
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(counts) == 2
+
+
+def test_shared_between_processes(tmp_path):
+    """Check that processes sharing a lock folder share one budget."""
+    timestamps = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=take_tokens, args=(str(tmp_path), 5, timestamps))
+        for _ in range(2)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    taken_at = sorted(timestamps.get() for _ in range(10))
+    # one token up front, then one every 1/20 s
+    assert taken_at[-1] - taken_at[0] >= 9 / 20 * 0.9
+
+
+def test_client_rate_limited(fake_dsp):
+    """Check that the pages of a prefetched query stay within the rate of the limiter."""
+    dsp_client = client.DSPClient(
+        "v5",
+        base_url=fake_dsp.base_url,
+        prefetch_workers=8,
+        rate_limiter=RateLimiter(rate=50, max_in_flight=4),
+    )
+
+    start = time.monotonic()
+    output = dsp_client.get_variable_data(
+        country_code="lv", spatial_resolution="LAU", variable="eucalc_emissions_co2e"
+    )
+
+    assert len(output) == 18 * 7 * 2
+    assert time.monotonic() - start >= (len(fake_dsp.requests) - 1) / 50 * 0.9
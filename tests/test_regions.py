@@ -0,0 +1,40 @@
+import pytest
+from zoomin_client import client
+from zoomin_client.regions import RegionIndex
+
+
+def test_region_index_links(fake_dsp, tmp_path):
+    """Check the children, ancestors and descendants of the region tree, and that the saved index is reused."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    region_index = dsp_client.get_region_index("lv", index_dir=str(tmp_path))
+
+    # 1 NUTS0, 1 NUTS1, 1 NUTS2, 6 NUTS3 and 18 LAU regions
+    assert len(region_index) == 27
+    assert region_index.children("LV00") == [f"LV00{i}" for i in range(1, 7)]
+    assert region_index.children("LV002") == [
+        "LV002_0200001",
+        "LV002_0200002",
+        "LV002_0200003",
+    ]
+    assert region_index.children("LV002_0200001") == []
+    assert region_index.parent("LV002_0200001") == "LV002"
+    assert region_index.parent("LV") is None
+    assert region_index.ancestors("LV002_0200001") == ["LV", "LV0", "LV00", "LV002"]
+    assert region_index.resolution("LV002_0200001") == "LAU"
+    assert len(region_index.descendants("LV")) == 26
+    assert region_index.descendants("LV0", "LAU") == region_index.regions("LAU")
+    assert region_index.descendants("LV003") == region_index.children("LV003")
+    with pytest.raises(KeyError):
+        region_index.children("EE")
+
+    fake_dsp.requests.clear()
+    loaded_index = dsp_client.get_region_index("lv", index_dir=str(tmp_path))
+    assert fake_dsp.requests == []
+    assert loaded_index.descendants("LV001") == region_index.descendants("LV001")
+    assert loaded_index.ancestors("LV006") == ["LV", "LV0", "LV00"]
+
+    # regions whose parent is missing are roots
+    partial_index = RegionIndex(["LV001_0100001", "LV001", "LV002_0200001"])
+    assert partial_index.regions("NUTS3") == ["LV001"]
+    assert partial_index.descendants("LV001") == ["LV001_0100001"]
+    assert partial_index.parent("LV002_0200001") is None
@@ -0,0 +1,114 @@
+import pytest
+import pandas as pd
+import requests
+from zoomin_client import client
+
+
+@pytest.fixture
+def synced_client(fake_dsp, tmp_path):
+    """A client whose local replica holds the data of the fake country."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+    dsp_client.sync_country("lv", store_path=str(tmp_path / "replica.sqlite3"))
+    return dsp_client
+
+
+def test_local_source_matches_dsp(fake_dsp, synced_client):
+    """Check that the local replica answers queries as the DSP does, without requests."""
+    queries = [
+        ("get_region_metadata", dict(spatial_resolution="LAU")),
+        ("get_region_metadata", dict(spatial_resolution="NUTS3", region_code="LV002")),
+        ("get_region_data", dict(region_code="LV001")),
+        ("get_region_data", dict(region_code="LV001", mini_version=False)),
+        ("get_variable_metadata", dict(variable="population")),
+        ("get_proxy_details", dict(variable="eucalc_emissions_co2e")),
+        (
+            "get_variable_data",
+            dict(
+                spatial_resolution="LAU",
+                variable="eucalc_emissions_co2e",
+                pathway_description="national",
+            ),
+        ),
+    ]
+    expected = [
+        getattr(synced_client, getter)(country_code="lv", **query)
+        for getter, query in queries
+    ]
+    n_requests = len(fake_dsp.requests)
+
+    for (getter, query), expected_output in zip(queries, expected):
+        output = getattr(synced_client, getter)(
+            country_code="lv", **query, source="local"
+        )
+        assert output == expected_output
+
+    output_df = synced_client.get_variable_data(
+        country_code="lv",
+        spatial_resolution="NUTS3",
+        variable="population",
+        result_format="df",
+        source="local",
+    )
+    assert isinstance(output_df, pd.DataFrame)
+    assert len(output_df) == 6
+    assert len(fake_dsp.requests) == n_requests
+
+
+def test_failed_sync_keeps_replica(fake_dsp, synced_client):
+    """Check that a failing sync keeps the data synced before, and unsynced countries raise."""
+    get_page = synced_client._get_page
+
+    def fail_on_lau_data(request_url, *args, **kwargs):
+        if "variable_data" in request_url and "LAU" in request_url:
+            raise requests.ConnectionError(request_url)
+        return get_page(request_url, *args, **kwargs)
+
+    # the data of the coarser resolutions is written before the query fails
+    synced_client._get_page = fail_on_lau_data
+    with pytest.raises(requests.ConnectionError):
+        synced_client.sync_country("lv", max_workers=1, incremental=False)
+
+    output = synced_client.get_region_metadata(
+        country_code="lv", spatial_resolution="LAU", source="local"
+    )
+    assert len(output) == 18
+    output = synced_client.get_variable_data(
+        country_code="lv",
+        spatial_resolution="NUTS3",
+        variable="population",
+        source="local",
+    )
+    assert len(output) == 6
+
+    with pytest.raises(ValueError):
+        synced_client.get_region_metadata(
+            country_code="ee", spatial_resolution="LAU", source="local"
+        )
+
+
+def test_incremental_sync(fake_dsp, synced_client):
+    """Check that a repeated sync only queries variables whose data_last_update changed."""
+    for record in fake_dsp.variable_data:
+        if record["var_name"] == "population":
+            record["value"] += 1
+    fake_dsp.variables[0]["data_last_update"] = 2023
+
+    # the climate projection variable is no longer published
+    del fake_dsp.variables[2]
+    fake_dsp.variable_data = [
+        record
+        for record in fake_dsp.variable_data
+        if record["var_name"] != "cproj_annual_mean_temperature"
+    ]
+    fake_dsp.requests.clear()
+
+    assert synced_client.sync_country("lv") == ["population"]
+    assert all(
+        "variable=population" in path
+        for path in fake_dsp.requests
+        if "variable_data" in path or "proxy_details" in path
+    )
+
+    query = dict(country_code="lv", region_code="LV001", mini_version=False)
+    expected = synced_client.get_region_data(**query)
+    assert synced_client.get_region_data(**query, source="local") == expected
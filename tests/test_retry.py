@@ -0,0 +1,133 @@
+import time
+import pytest
+import requests
+from zoomin_client import client
+from zoomin_client.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    parse_retry_after,
+)
+
+FAST_RETRY = RetryPolicy(backoff_factor=0.01)
+QUERY = dict(country_code="lv", spatial_resolution="LAU", variable="population")
+
+
+def test_retry_transient_errors(fake_dsp):
+    """Check that transient errors are retried and the query still succeeds."""
+    fake_dsp.inject_faults(503, 502, 504)
+    dsp_client = client.DSPClient(
+        "v5", base_url=fake_dsp.base_url, retry_policy=FAST_RETRY
+    )
+    output = dsp_client.get_variable_data(**QUERY)
+
+    assert len(output) == 18
+    assert len(fake_dsp.requests) == 3 + 2
+
+
+def test_retry_gives_up(fake_dsp):
+    """Check that an error is raised once the attempts are exhausted, and not retried if not transient."""
+    dsp_client = client.DSPClient("v5", base_url=fake_dsp.base_url)
+
+    fake_dsp.inject_faults(503, 503)
+    with pytest.raises(requests.HTTPError):
+        dsp_client.get_variable_data(
+            **QUERY, retry=RetryPolicy(max_attempts=2, backoff_factor=0.01)
+        )
+    assert len(fake_dsp.requests) == 2
+
+    fake_dsp.inject_faults(404)
+    with pytest.raises(requests.HTTPError):
+        dsp_client.get_variable_data(**QUERY, retry=FAST_RETRY)
+    assert len(fake_dsp.requests) == 3
+
+
+def test_retry_after(fake_dsp):
+    """Check that Retry-After is honoured, within the maximum total time of a query."""
+    dsp_client = client.DSPClient(
+        "v5", base_url=fake_dsp.base_url, retry_policy=FAST_RETRY
+    )
+
+    fake_dsp.inject_faults(429, retry_after="1")
+    start = time.monotonic()
+    dsp_client.get_variable_data(**QUERY)
+    assert time.monotonic() - start >= 1
+
+    fake_dsp.inject_faults(503, retry_after="30")
+    start = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        dsp_client.get_variable_data(
+            **QUERY, retry=RetryPolicy(backoff_factor=0.01, max_total_time=5)
+        )
+    assert time.monotonic() - start < 5
+
+
+def test_circuit_breaker(fake_dsp):
+    """Check that the breaker fails fast once open, and closes after a successful trial."""
+    circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.5)
+    dsp_client = client.DSPClient(
+        "v5",
+        base_url=fake_dsp.base_url,
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=circuit_breaker,
+    )
+
+    fake_dsp.inject_faults(503, 503)
+    for _ in range(2):
+        with pytest.raises(requests.HTTPError):
+            dsp_client.get_variable_data(**QUERY)
+    assert circuit_breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        dsp_client.get_variable_data(**QUERY)
+    assert len(fake_dsp.requests) == 2
+
+    time.sleep(0.5)
+    assert circuit_breaker.state == "half-open"
+    assert len(dsp_client.get_variable_data(**QUERY)) == 18
+    assert circuit_breaker.state == "closed"
+
+
+def test_default_circuit_breaker_is_per_query(fake_dsp):
+    """Check that without a breaker of the client, failures do not carry over to other queries."""
+    dsp_client = client.DSPClient(
+        "v5",
+        base_url=fake_dsp.base_url,
+        retry_policy=RetryPolicy(max_attempts=1),
+    )
+
+    fake_dsp.inject_faults(*[503] * 5)
+    for _ in range(5):
+        with pytest.raises(requests.HTTPError):
+            dsp_client.get_variable_data(**QUERY)
+
+    assert len(dsp_client.get_variable_data(**QUERY)) == 18
+
+
+def test_batch_shares_circuit_breaker(fake_dsp):
+    """Check that the queries of a batch stop early once the DSP is down."""
+    dsp_client = client.DSPClient(
+        "v5", base_url=fake_dsp.base_url, retry_policy=FAST_RETRY
+    )
+    region_codes = [
+        record["region_code"]
+        for record in dsp_client.get_region_metadata(
+            country_code="lv", spatial_resolution="LAU"
+        )
+    ]
+    n_requests = len(fake_dsp.requests)
+
+    fake_dsp.inject_faults(*[503] * 100)
+    results, errors = dsp_client.get_region_data_many(region_codes, max_workers=4)
+
+    assert not results
+    assert len(errors) == len(region_codes)
+    assert any(isinstance(error, CircuitOpenError) for error in errors.values())
+    assert len(fake_dsp.requests) - n_requests < len(region_codes)
+
+
+def test_parse_retry_after():
+    """Check that Retry-After is parsed in seconds and as an HTTP date."""
+    assert parse_retry_after("120") == 120
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert parse_retry_after("soon") is None
@@ -0,0 +1,72 @@
+import math
+import pytest
+from zoomin_client import client
+from zoomin_client.utils import LatencyHistogram, Profiler, profiler
+
+
+def test_latency_percentiles():
+    """Check that percentiles are estimated within the width of a bucket."""
+    histogram = LatencyHistogram()
+    for i in range(1, 1001):
+        histogram.add(i / 1000)
+
+    assert histogram.count == 1000
+    assert histogram.percentile(0.5) == pytest.approx(0.5, rel=0.1)
+    assert histogram.percentile(0.99) == pytest.approx(0.99, rel=0.1)
+    assert histogram.percentile(1) == 1
+    assert math.isnan(LatencyHistogram().percentile(0.5))
+
+
+def test_profiler_records_only_when_enabled():
+    """Check that calls are recorded once enabled, captured without nesting, and exported."""
+    local_profiler = Profiler()
+
+    @local_profiler.wrap
+    def inner():
+        return [0] * 1000
+
+    @local_profiler.wrap
+    def outer():
+        return inner() + inner()
+
+    assert len(outer()) == 2000
+    assert local_profiler.summary() == {}
+
+    local_profiler.configure(cprofile=True, trace_memory=True)
+    outer()
+
+    outer_name, inner_name = (
+        f"{f.__module__}.{f.__qualname__}" for f in (outer, inner)
+    )
+    summary = local_profiler.summary()
+    assert summary[outer_name]["count"] == 1
+    assert summary[inner_name]["count"] == 2
+    assert summary[outer_name]["peak_memory"] > 0
+    assert local_profiler.stats(inner_name) is None
+    assert local_profiler.stats(outer_name) is not None
+
+    exposition = local_profiler.to_prometheus()
+    assert (
+        f'zoomin_client_call_seconds_count{{function="{inner_name}"}} 2' in exposition
+    )
+    assert 'le="+Inf"} 2' in exposition
+
+
+def test_getters_are_profiled(fake_dsp, monkeypatch):
+    """Check that the module-level getters are recorded by the shared profiler."""
+    monkeypatch.setattr(
+        client,
+        "_shared_clients",
+        {"v5": client.DSPClient("v5", base_url=fake_dsp.base_url)},
+    )
+    profiler.configure()
+    try:
+        client.get_region_metadata(
+            version="v5", country_code="lv", spatial_resolution="LAU"
+        )
+    finally:
+        profiler.configure(enabled=False)
+
+    summary = profiler.summary()
+    profiler.reset()
+    assert summary["zoomin_client.client.get_region_metadata"]["count"] == 1
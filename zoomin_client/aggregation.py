@@ -0,0 +1,209 @@
+"""Local aggregation of variable data from finer to coarser spatial resolutions."""
+from dataclasses import dataclass
+from typing import Dict, Literal, Mapping, Optional, Sequence
+import numpy as np
+import pandas as pd
+
+AggregationMethod = Literal["sum", "mean", "weighted_mean"]
+
+# the spatial resolutions from the finest to the coarsest
+RESOLUTION_LEVELS = ("LAU", "NUTS3", "NUTS2", "NUTS1", "NUTS0")
+
+# the columns that identify a value of a region, besides the region code
+KEY_COLUMNS = ("year", "pathway", "climate_experiment")
+
+
+@dataclass(frozen=True)
+class AggregationRule:
+    """
+    How the values of the regions within a parent region are combined into its value.
+
+    :param method: 'sum' to add up the values, 'mean' to average them, 'weighted_mean'
+        to average them weighted by the values of `weight_variable`
+    :type method: str, one of {'sum', 'mean', 'weighted_mean'}
+
+    **Default arguments:**
+
+    :param weight_variable: the variable whose values weight the average. E.g. 'population'
+        |br| * the default value is None
+    :type weight_variable: str
+    """
+
+    method: AggregationMethod
+    weight_variable: Optional[str] = None
+
+    def __post_init__(self) -> None:
+        if (self.method == "weighted_mean") != (self.weight_variable is not None):
+            raise ValueError(
+                "weight_variable should be given if and only if method is 'weighted_mean'"
+            )
+
+
+# the rule of each `var_aggregation_method` of the variable metadata
+AGGREGATION_RULES: Dict[str, AggregationRule] = {
+    "SUM": AggregationRule("sum"),
+    "AVG": AggregationRule("mean"),
+}
+
+
+def rule_for(
+    variable_metadata: dict, rules: Optional[Mapping[str, AggregationRule]] = None
+) -> AggregationRule:
+    """
+    Return the aggregation rule of a variable.
+
+    :param variable_metadata: the metadata record of the variable
+    :type variable_metadata: dict
+
+    **Default arguments:**
+
+    :param rules: rules by variable name, overriding the rule of the
+        `var_aggregation_method` of the variable
+        |br| * the default value is None
+    :type rules: Mapping[str, AggregationRule]
+
+    :returns: The rule
+    :rtype: AggregationRule
+    """
+    var_name = variable_metadata["var_name"]
+    if rules is not None and var_name in rules:
+        return rules[var_name]
+
+    method = variable_metadata.get("var_aggregation_method")
+    if method not in AGGREGATION_RULES:
+        raise ValueError(
+            f"{var_name} has no aggregation rule for var_aggregation_method {method}"
+        )
+
+    return AGGREGATION_RULES[method]
+
+
+def parent_codes(region_codes: pd.Series, spatial_resolution: str) -> pd.Series:
+    """
+    Return the code of the parent of each region at a coarser spatial resolution.
+
+    LAU codes are given as '<NUTS3>_<LAU>', and a NUTS code has one more character
+    per level than its parent.
+
+    :param region_codes: the codes of the regions
+    :type region_codes: pd.Series
+
+    :param spatial_resolution: the spatial resolution of the parents
+    :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3'}
+
+    :returns: The parent codes
+    :rtype: pd.Series
+    """
+    if spatial_resolution not in RESOLUTION_LEVELS[1:]:
+        raise ValueError(
+            "spatial_resolution should be one of NUTS0, NUTS1, NUTS2, NUTS3"
+        )
+
+    nuts_codes = region_codes.astype(str).str.split("_", n=1).str[0]
+    return nuts_codes.str[: int(spatial_resolution[-1]) + 2]
+
+
+def aggregate(
+    data_df: pd.DataFrame,
+    spatial_resolution: str,
+    rule: AggregationRule,
+    weights: Optional[pd.Series] = None,
+) -> pd.DataFrame:
+    """
+    Aggregate the values of regions to their parents at a coarser spatial resolution.
+
+    Missing values are left out, and the value of a parent none of whose regions has
+    a value is NaN.
+
+    :param data_df: the data of the regions, with 'region_code' and 'value' columns,
+        and the `KEY_COLUMNS` it has
+    :type data_df: pd.DataFrame
+
+    :param spatial_resolution: the spatial resolution of the parents
+    :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3'}
+
+    :param rule: how the values are combined
+    :type rule: AggregationRule
+
+    **Default arguments:**
+
+    :param weights: the weight of each region, indexed by region code.
+        Required by the 'weighted_mean' method
+        |br| * the default value is None
+    :type weights: pd.Series
+
+    :returns: The data of the parents, with the same columns
+    :rtype: pd.DataFrame
+    """
+    key_columns = [column for column in KEY_COLUMNS if column in data_df.columns]
+    values = data_df["value"].astype(float)
+    grouped_df = pd.DataFrame(
+        {
+            "region_code": parent_codes(data_df["region_code"], spatial_resolution),
+            **{column: data_df[column].astype(object) for column in key_columns},
+        }
+    )
+
+    group_columns = ["region_code", *key_columns]
+    if rule.method == "weighted_mean":
+        if weights is None:
+            raise ValueError("the weighted_mean method requires weights")
+
+        region_weights = data_df["region_code"].map(weights).astype(float)
+        region_weights[values.isna()] = np.nan
+        grouped_df["value"] = values * region_weights
+        grouped_df["weight"] = region_weights
+        sums = grouped_df.groupby(group_columns, dropna=False, sort=False).sum(
+            min_count=1
+        )
+        aggregated = sums["value"] / sums["weight"]
+    else:
+        grouped_df["value"] = values
+        groups = grouped_df.groupby(group_columns, dropna=False, sort=False)["value"]
+        aggregated = groups.sum(min_count=1) if rule.method == "sum" else groups.mean()
+
+    aggregated_df = aggregated.rename("value").reset_index()
+    for column in key_columns:
+        aggregated_df[column] = aggregated_df[column].astype(data_df[column].dtype)
+
+    return aggregated_df
+
+
+def compare(
+    aggregated_df: pd.DataFrame,
+    dsp_df: pd.DataFrame,
+    key_columns: Sequence[str],
+    rtol: float,
+) -> pd.DataFrame:
+    """
+    Add the values of the DSP to aggregated data, and whether both match.
+
+    :param aggregated_df: the aggregated data
+    :type aggregated_df: pd.DataFrame
+
+    :param dsp_df: the data of the DSP at the same spatial resolution
+    :type dsp_df: pd.DataFrame
+
+    :param key_columns: the columns that identify a value, with 'region_code'
+    :type key_columns: Sequence[str]
+
+    :param rtol: the relative tolerance of matching values
+    :type rtol: float
+
+    :returns: The aggregated data with 'dsp_value' and 'matches' columns
+    :rtype: pd.DataFrame
+    """
+    dsp_values = dsp_df[list(key_columns)].astype(object)
+    dsp_values = dsp_values.where(dsp_values.notna(), None)
+    dsp_values["dsp_value"] = dsp_df["value"].astype(float)
+
+    checked_df = aggregated_df.astype({column: object for column in key_columns})
+    checked_df = checked_df.where(checked_df.notna(), None).merge(
+        dsp_values, on=list(key_columns), how="left"
+    )
+    checked_df = checked_df.astype(aggregated_df.dtypes.to_dict())
+    checked_df["matches"] = np.isclose(
+        checked_df["value"], checked_df["dsp_value"], rtol=rtol, equal_nan=True
+    )
+
+    return checked_df
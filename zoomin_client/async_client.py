@@ -0,0 +1,427 @@
+"""Asynchronous data access functions, to run many queries concurrently."""
+import asyncio
+import dataclasses
+import time
+from typing import Optional, Union, Any, List, Tuple
+import pandas as pd
+from zoomin_client.client import (
+    DSP_BASE_URL,
+    PageSize,
+    ResultFormat,
+    SaveFormat,
+    _DSPClientBase,
+    _apply_page_size,
+)
+from zoomin_client.paging import AdaptivePager
+from zoomin_client.retry import CircuitBreaker, RetryPolicy
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None  # type: ignore[assignment]
+
+
+class AsyncDSPClient(_DSPClientBase):
+    """
+    Asynchronous client to query a specific version of the DSP.
+
+    The getters are coroutines, so that many queries can be awaited together, e.g. with
+    `asyncio.gather`. The number of requests in flight at any time is bounded by
+    `max_concurrency`, across all queries made through the same client.
+
+    Requires the optional dependency `httpx`.
+
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
+
+    **Default arguments:**
+
+    :param base_url: the URL under which the DSP versions are served
+        |br| * the default value is 'http://data.localised-project.eu/dsp/'
+    :type base_url: str
+
+    :param max_concurrency: the maximum number of requests in flight at any time
+        |br| * the default value is 20
+    :type max_concurrency: int
+
+    :param keep_alive: indicates whether connections are kept open between requests
+        |br| * the default value is True
+    :type keep_alive: bool
+
+    :param timeout: the request timeout in seconds, either a single value or a
+        (connect timeout, read timeout) tuple
+        |br| * the default value is 240
+    :type timeout: float/tuple
+
+    :param retry_policy: the policy of retrying transiently failed requests, used by all
+        queries that do not pass a `retry` policy of their own.
+        If None, the default `RetryPolicy` is used
+        |br| * the default value is None
+    :type retry_policy: RetryPolicy
+
+    :param circuit_breaker: the circuit breaker shared by all requests of the client.
+        If None, the client has a default `CircuitBreaker` of its own
+        |br| * the default value is None
+    :type circuit_breaker: CircuitBreaker
+    """
+
+    def __init__(
+        self,
+        version: str,
+        base_url: str = DSP_BASE_URL,
+        max_concurrency: int = 20,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float]] = 240,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        if httpx is None:
+            raise ImportError(
+                "AsyncDSPClient requires httpx. Install it with `pip install httpx`."
+            )
+
+        super().__init__(version, base_url)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+            http_timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        else:
+            http_timeout = httpx.Timeout(timeout)
+
+        self.client = httpx.AsyncClient(
+            timeout=http_timeout,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency if keep_alive else 0,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def __aenter__(self) -> "AsyncDSPClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close all pooled connections of the client."""
+        await self.client.aclose()
+
+    async def _get_page(self, request_url: str, retry: RetryPolicy) -> dict:
+        """
+        Request a single page, retrying it according to `retry`, and return its decoded body.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The decoded page
+        :rtype: dict
+        """
+        circuit_breaker = retry.circuit_breaker
+        if circuit_breaker is None:
+            raise ValueError("retry should be a policy started for the query")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            circuit_breaker.before_request()
+
+            try:
+                async with self._semaphore:
+                    response = await self.client.get(request_url)
+            except httpx.TransportError as error:
+                circuit_breaker.record_failure()
+                if not retry.retry_timeouts and isinstance(error, httpx.ReadTimeout):
+                    raise
+
+                delay = retry.next_delay(attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            # a 429 means the DSP is up, but throttling
+            if response.status_code >= 500:
+                circuit_breaker.record_failure()
+            else:
+                circuit_breaker.record_success()
+
+            if response.status_code in retry.retry_statuses:
+                delay = retry.next_delay(attempt, response.headers.get("Retry-After"))
+                if delay is not None:
+                    await asyncio.sleep(delay)
+                    continue
+
+            response.raise_for_status()
+            page: dict = response.json()
+            return page
+
+    async def _collect(
+        self,
+        request_url: str,
+        result_format: ResultFormat,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Collect the results of all pages of a paginated query.
+
+        :param request_url: the URL of the first page
+        :type request_url: str
+
+        :param result_format: the format of the resulting data
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param retry: the retry policy of the query. If None, the policy of the client is used
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page, 'adaptive' or adaptive page
+            size options. If None, the default page size of the DSP is used
+        :type page_size: int/str/AdaptivePageSize
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        retry = (retry or self.retry_policy).start(self.circuit_breaker)
+        request_url, adaptive_page_size = _apply_page_size(request_url, page_size)
+
+        if adaptive_page_size is not None:
+            pages = await self._collect_adaptive_pages(
+                AdaptivePager(request_url, adaptive_page_size), retry
+            )
+            return self._assemble(pages, result_format)
+
+        pages = []
+        next_request_url: Optional[str] = request_url
+        while next_request_url is not None:
+            response = await self._get_page(next_request_url, retry)
+
+            next_request_url = response["next"]
+            pages.append(response["results"])
+
+        return self._assemble(pages, result_format)
+
+    async def _collect_adaptive_pages(
+        self, pager: AdaptivePager, retry: RetryPolicy
+    ) -> List[list]:
+        """
+        Request the pages of a paginated query by number, adapting the page size as they arrive.
+
+        A page whose response times out is requested again at half the size, instead of
+        being retried.
+
+        :param pager: the pager of the query
+        :type pager: AdaptivePager
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The results of each page
+        :rtype: List[list]
+        """
+        retry = dataclasses.replace(retry, retry_timeouts=False)
+
+        pages = []
+        next_request_url = pager.next_url()
+        while next_request_url is not None:
+            start = time.monotonic()
+            try:
+                response = await self._get_page(next_request_url, retry)
+            except httpx.ReadTimeout:
+                if not pager.shrink():
+                    raise
+            else:
+                response_data = pager.add_page(response, time.monotonic() - start)
+                if response_data is not None:
+                    pages.append(response_data)
+
+            next_request_url = pager.next_url()
+
+        return pages
+
+    async def get_region_metadata(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        region_code: Optional[str] = None,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "region_metadata",
+        save_format: Optional[SaveFormat] = None,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Union[list, dict]:
+        """
+        Return list of regions of a specified country, at a specified spatial resolution.
+
+        The arguments are documented in :meth:`zoomin_client.client.DSPClient.get_region_metadata`.
+
+        :returns: The result
+        :rtype: list/dict
+        """
+        request_url = self._region_metadata_url(
+            country_code, spatial_resolution, region_code
+        )
+        result_collection = await self._collect(request_url, "json", retry, page_size)
+
+        # save
+        if save_result:
+            self._save(result_collection, "json", save_path, save_name, save_format)
+
+        return result_collection
+
+    async def get_region_data(
+        self,
+        country_code: str,
+        region_code: str,
+        variable: Optional[str] = None,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        mini_version: Optional[bool] = True,
+        result_format: ResultFormat = "json",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "region_data",
+        save_format: Optional[SaveFormat] = None,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Return all the data for a specified region of a specified country, at a specified spatial resolution.
+
+        The arguments are documented in :meth:`zoomin_client.client.DSPClient.get_region_data`.
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        request_url = self._region_data_url(
+            country_code,
+            region_code,
+            variable,
+            pathway_description,
+            climate_experiment,
+            mini_version,
+        )
+        result_collection = await self._collect(
+            request_url, result_format, retry, page_size
+        )
+
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
+
+        return result_collection
+
+    async def get_variable_metadata(
+        self,
+        country_code: str,
+        variable: Optional[str] = None,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "variable_metadata",
+        save_format: Optional[SaveFormat] = None,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        result_format: ResultFormat = "json",
+    ) -> Any:
+        """
+        Return the metadata of all variables, or of a specified variable, for a specified country.
+
+        The arguments are documented in :meth:`zoomin_client.client.DSPClient.get_variable_metadata`.
+
+        :returns: The result
+        :rtype: Any
+        """
+        request_url = self._variable_metadata_url(country_code, variable)
+        result_collection = await self._collect(
+            request_url, result_format, retry, page_size
+        )
+
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
+
+        return result_collection
+
+    async def get_proxy_details(
+        self,
+        country_code: str,
+        variable: str,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "proxy_details",
+        save_format: Optional[SaveFormat] = None,
+        retry: Optional[RetryPolicy] = None,
+        result_format: ResultFormat = "json",
+    ) -> Any:
+        """
+        Return proxy details for a specified variable, for a specified country.
+
+        The arguments are documented in :meth:`zoomin_client.client.DSPClient.get_proxy_details`.
+
+        :returns: The result
+        :rtype: Any
+        """
+        request_url = self._proxy_details_url(country_code, variable)
+        response = await self._get_page(
+            request_url, (retry or self.retry_policy).start(self.circuit_breaker)
+        )
+
+        response_data = self._assemble([response["results"]], result_format)
+
+        # save
+        if save_result:
+            self._save(response_data, result_format, save_path, save_name, save_format)
+
+        return response_data
+
+    async def get_variable_data(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        variable: str,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        result_format: ResultFormat = "json",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "variable_data",
+        save_format: Optional[SaveFormat] = None,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Return data for a specified variable at a specified resolution, for a specified country.
+
+        The arguments are documented in :meth:`zoomin_client.client.DSPClient.get_variable_data`.
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        request_url = self._variable_data_url(
+            country_code,
+            spatial_resolution,
+            variable,
+            pathway_description,
+            climate_experiment,
+        )
+        result_collection = await self._collect(
+            request_url, result_format, retry, page_size
+        )
+
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
+
+        return result_collection
@@ -0,0 +1,230 @@
+"""On-disk and in-memory caches of DSP responses."""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Mapping
+from urllib.parse import urlparse
+
+DAY = 24 * 60 * 60
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "ZOOMIN_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "zoomin_client"),
+)
+
+# metadata and proxy details barely change within a DSP version
+DEFAULT_TTL = {
+    "region_metadata": 30 * DAY,
+    "variable_metadata": 7 * DAY,
+    "proxy_details": 30 * DAY,
+    "region_data": DAY,
+    "variable_data": DAY,
+}
+
+
+def endpoint_of(request_url: str) -> Optional[str]:
+    """
+    Return the name of the DSP endpoint a URL belongs to.
+
+    :param request_url: the URL of a page
+    :type request_url: str
+
+    :returns: The name of the endpoint, or None if it is not a known endpoint
+    :rtype: str
+    """
+    path_parts = urlparse(request_url).path.split("/")
+    for endpoint in DEFAULT_TTL:
+        if endpoint in path_parts:
+            return endpoint
+
+    return None
+
+
+class ResponseCache:
+    """
+    Cache of decoded DSP pages on disk, content-addressed by the full URL of each page.
+
+    An entry expires after the time-to-live of its endpoint. When the cache grows beyond
+    `max_size`, the least recently used entries are removed.
+
+    :param cache_dir: the folder in which the entries are stored
+    :type cache_dir: str
+
+    **Default arguments:**
+
+    :param ttl: the time-to-live in seconds per endpoint, overriding `DEFAULT_TTL`
+        |br| * the default value is None
+    :type ttl: dict
+
+    :param max_size: the maximum size of the cache in bytes
+        |br| * the default value is 1 GB
+    :type max_size: int
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        ttl: Optional[Mapping[str, float]] = None,
+        max_size: int = 1024**3,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.ttl = {**DEFAULT_TTL, **(ttl or {})}
+        self.max_size = max_size
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    def _entries(self) -> list:
+        """Return the entries of the cache as `os.DirEntry` objects."""
+        with os.scandir(self.cache_dir) as entries:
+            return [entry for entry in entries if entry.name.endswith(".json")]
+
+    def _path(self, request_url: str) -> str:
+        """Return the file path of the entry of a URL."""
+        key = hashlib.sha256(request_url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, request_url: str) -> Optional[dict]:
+        """
+        Return the cached page of a URL, or None if it is not cached or has expired.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :returns: The decoded page
+        :rtype: dict
+        """
+        path = self._path(request_url)
+        try:
+            with open(path, "r", encoding="utf-8") as f_name:
+                entry = json.load(f_name)
+        except (OSError, ValueError):
+            return None
+
+        ttl = self.ttl.get(endpoint_of(request_url) or "", 0)
+        if time.time() - entry["stored_at"] > ttl:
+            return None
+
+        # the modification time tracks the last use, for LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+        page: dict = entry["page"]
+        return page
+
+    def set(self, request_url: str, page: dict) -> None:
+        """
+        Store the page of a URL, evicting the least recently used entries if the cache is full.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :param page: the decoded page
+        :type page: dict
+        """
+        path = self._path(request_url)
+        data = json.dumps(
+            {"url": request_url, "stored_at": time.time(), "page": page}
+        ).encode("utf-8")
+
+        # write to a temporary file first, so readers never see a partial entry
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f_name:
+            f_name.write(data)
+
+        with self._lock:
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+            self._size += len(data) - previous_size
+
+            if self._size > self.max_size:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove the least recently used entries until the cache is within `max_size`."""
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in entries)
+
+        for entry in entries:
+            if self._size <= self.max_size:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                continue
+            self._size -= size
+
+    def clear(self) -> None:
+        """Remove all entries of the cache."""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+            self._size = 0
+
+
+class MemoCache:
+    """
+    Thread-safe in-memory cache of query results, evicting the least recently used result.
+
+    :param max_entries: the maximum number of results held
+        |br| * the default value is 256
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Any:
+        """
+        Return the result stored under `key`, or None if there is none.
+
+        :param key: the key of the query
+        :type key: Hashable
+
+        :returns: The result
+        :rtype: Any
+        """
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return None
+
+            return self._entries[key]
+
+    def set(self, key: Hashable, result: Any) -> None:
+        """
+        Store the result of a query under `key`.
+
+        :param key: the key of the query
+        :type key: Hashable
+
+        :param result: the result of the query
+        :type result: Any
+        """
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all results."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,86 @@
+"""On-disk checkpoints of the pages of a query, to resume interrupted crawls."""
+import os
+import json
+import shutil
+import hashlib
+from typing import Any, List, Optional, Tuple
+
+
+def _write_json(path: str, data: Any) -> None:
+    """Write `data` to `path` through a temporary file, so readers never see a partial file."""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f_name:
+        json.dump(data, f_name)
+    os.replace(temp_path, path)
+
+
+class PageCheckpoint:
+    """
+    Checkpoint of a paginated query, holding each completed page and the `next` cursor.
+
+    The checkpoint of a query is stored in a job folder named after the URL of its first
+    page, so running the same query again with the same `checkpoint_dir` finds it.
+
+    :param checkpoint_dir: the folder in which the job folders are stored
+    :type checkpoint_dir: str
+
+    :param request_url: the URL of the first page of the query
+    :type request_url: str
+    """
+
+    def __init__(self, checkpoint_dir: str, request_url: str) -> None:
+        self.request_url = request_url
+        key = hashlib.sha256(request_url.encode("utf-8")).hexdigest()
+        self.job_dir = os.path.join(checkpoint_dir, key)
+        self._state_path = os.path.join(self.job_dir, "state.json")
+
+    def _page_path(self, page_number: int) -> str:
+        """Return the file path of a completed page."""
+        return os.path.join(self.job_dir, f"page_{page_number:06d}.json")
+
+    def load(self) -> Tuple[List[list], Optional[str]]:
+        """
+        Return the results of the completed pages and the URL of the next page to fetch.
+
+        :returns: The results of each completed page, in order, and the next URL.
+            Without a checkpoint, no pages and the URL of the first page are returned.
+        :rtype: tuple
+        """
+        try:
+            with open(self._state_path, "r", encoding="utf-8") as f_name:
+                state = json.load(f_name)
+        except (OSError, ValueError):
+            return [], self.request_url
+
+        pages = []
+        for page_number in range(1, state["n_pages"] + 1):
+            with open(self._page_path(page_number), "r", encoding="utf-8") as f_name:
+                pages.append(json.load(f_name))
+
+        return pages, state["next"]
+
+    def add(self, page_number: int, results: list, next_url: Optional[str]) -> None:
+        """
+        Store a completed page and the cursor of the page after it.
+
+        :param page_number: the number of the page, starting at 1
+        :type page_number: int
+
+        :param results: the results of the page
+        :type results: list
+
+        :param next_url: the `next` link of the page
+        :type next_url: str
+        """
+        os.makedirs(self.job_dir, exist_ok=True)
+
+        # the page is written before the state that refers to it
+        _write_json(self._page_path(page_number), results)
+        _write_json(
+            self._state_path,
+            {"url": self.request_url, "n_pages": page_number, "next": next_url},
+        )
+
+    def remove(self) -> None:
+        """Remove the job folder of the checkpoint."""
+        shutil.rmtree(self.job_dir, ignore_errors=True)
@@ -1,18 +1,122 @@
 """Data acess functions are present in this module."""
 import os
-from typing import Optional, Union, Any, Literal
+import copy
+import math
+import dataclasses
+import itertools
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from contextlib import contextmanager, nullcontext
+from functools import partial, wraps
+from typing import (
+    Optional,
+    Union,
+    Any,
+    Literal,
+    Callable,
+    ContextManager,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    TypeVar,
+    cast,
+)
 import json
 import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 import pandas as pd
+from zoomin_client.aggregation import (
+    KEY_COLUMNS,
+    AggregationRule,
+    aggregate,
+    compare,
+    rule_for,
+)
+from zoomin_client.cache import MemoCache, ResponseCache
+from zoomin_client.checkpoint import PageCheckpoint
+from zoomin_client.fixtures import FixtureArchive
+from zoomin_client.instrumentation import (
+    MetricsHook,
+    PageMetrics,
+    QueryMetrics,
+    add_normalize_time,
+    add_page,
+    logger,
+    measure_query,
+)
+from zoomin_client.paging import AdaptivePageSize, AdaptivePager, with_query_param
+from zoomin_client.planner import (
+    QueryPlan,
+    Strategy,
+    estimate_pages,
+    resolution_of,
+    select_records,
+)
+from zoomin_client.ratelimit import RateLimiter
+from zoomin_client.regions import DEFAULT_INDEX_DIR, RegionIndex, index_path
+from zoomin_client.replica import LocalReplica
+from zoomin_client.retry import CircuitBreaker, RetryPolicy
+from zoomin_client.columnar import ColumnarBuilder
+from zoomin_client.cube import CubeBuilder, xr
 from zoomin_client.utils import measure_time
 
-
-def save_json(data: dict, save_path: str, save_name: str) -> None:
+try:
+    import ijson
+except ImportError:  # pragma: no cover
+    ijson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = None
+
+DSP_BASE_URL = "http://data.localised-project.eu/dsp/"
+
+PATHWAY_OPTIONS = ["national", "with_behavioural_changes"]
+CLIMATE_EXPERIMENT_OPTIONS = ["RCP2.6", "RCP4.5", "RCP8.5", "Historical"]
+SPATIAL_RESOLUTIONS = ["NUTS0", "NUTS1", "NUTS2", "NUTS3", "LAU"]
+
+# the fields that identify a data record
+RECORD_KEY_COLUMNS = ("region_code", "var_name", *KEY_COLUMNS)
+
+CacheMode = Literal["use", "refresh", "off"]
+ResultFormat = Literal["json", "df", "arrow", "xarray"]
+SaveFormat = Literal["json", "csv", "parquet"]
+PageSize = Union[int, Literal["adaptive"], AdaptivePageSize, None]
+Source = Literal["dsp", "local"]
+# a filter on one value, or on each of several values
+FilterValues = Union[str, Sequence[str]]
+
+# the circuit breaker shared by the queries of the running batch, if the client has none
+_batch_breaker: ContextVar[Optional[CircuitBreaker]] = ContextVar(
+    "_batch_breaker", default=None
+)
+
+# the file format a result is saved in if `save_format` is None
+DEFAULT_SAVE_FORMATS = {
+    "json": "json",
+    "df": "csv",
+    "arrow": "parquet",
+    "xarray": "csv",
+}
+
+
+def save_json(data: Union[list, dict], save_path: str, save_name: str) -> None:
     """
     Save the response in a json file.
 
-    :param data: data dictionary to be saved
-    :type data: dict
+    :param data: data to be saved
+    :type data: list/dict
 
     :param save_path: the folder path in which to save
     :type save_path: str
@@ -43,332 +147,3173 @@ def save_df(data_df: pd.DataFrame, save_path: str, save_name: str) -> None:
     data_df.to_csv(file_name)
 
 
-def get_region_metadata(
-    version: str,
-    country_code: str,
-    spatial_resolution: str,
-    region_code: Optional[str] = None,
-    save_result: Optional[bool] = False,
-    save_path: Optional[str] = None,
-    save_name: Optional[str] = "region_metadata",
-) -> Union[list, dict]:
+def save_parquet(
+    data_table: Any,
+    save_path: str,
+    save_name: str,
+    partition_cols: Optional[Sequence[str]] = None,
+) -> None:
     """
-    Return list of regions of a specified country, at a specified spatial resolution.
+    Save the data in a parquet file, or in a Hive-partitioned parquet dataset.
 
-    :param version: the version of the DSP to query. E.g. v1, v2, etc.
-    :type version: str
+    :param data_table: table to be saved
+    :type data_table: pyarrow.Table
 
-    :param country_code: the code of the required country. NOTE: must be in lower case
-    :type country_code: str
+    :param save_path: the folder path in which to save
+    :type save_path: str
 
-    :param spatial_resolution: the required spatial resolution
-    :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+    :param save_name: the file name, or the name of the dataset folder if `partition_cols` is given
+    :type save_name: str
 
     **Default arguments:**
 
-    :param region_code: the code of the region to filter on
-        |br| * the default value is None. If None, all regions are returned.
-    :type region_code: str
+    :param partition_cols: the columns by which the dataset is partitioned, into
+        'column=value' folders. E.g. ['country_code', 'var_name', 'year'].
+        Partitions written by earlier calls are replaced, other partitions are kept
+        |br| * the default value is None. If None, a single file is written.
+    :type partition_cols: Sequence[str]
+    """
+    _require_pyarrow()
 
-    :param save_result: indicates whether the result should be saved.
-        The result is saved as .json if `result_format` is 'json'
-        and as .csv if `result_format` is 'df'
-        |br| * the default value is False
-    :type save_result: bool
+    file_name = os.path.join(save_path, save_name)
 
-    :param save_path: the folder path in which to save the result.
-        If None, the result is save in the same folder as this file- `client.py`
-        |br| * the default value is None
-    :type save_path: str
+    if partition_cols:
+        pq.write_to_dataset(
+            data_table,
+            file_name,
+            partition_cols=list(partition_cols),
+            existing_data_behavior="delete_matching",
+        )
+    else:
+        pq.write_table(data_table, file_name)
 
-    :param save_name: the file name of the result
-        |br| * the default value is 'region_list'
-    :type save_path: str
 
-    :returns: The result
-    :rtype: list/dict
+def _require_pyarrow() -> None:
+    """Raise an ImportError if pyarrow, needed to save parquet files, is not installed."""
+    if pa is None:
+        raise ImportError(
+            "Saving as parquet requires pyarrow. Install it with `pip install pyarrow`."
+        )
+
+
+def _check_partition_cols(
+    save_format: Optional[SaveFormat], partition_cols: Optional[Sequence[str]]
+) -> None:
+    """Raise an error if a result cannot be saved as a dataset partitioned by `partition_cols`."""
+    if not partition_cols:
+        return
+
+    if save_format not in (None, "parquet"):
+        raise ValueError("partition_cols is only supported with save_format 'parquet'")
+
+    _require_pyarrow()
+
+
+def _to_records(data: Any) -> Any:
+    """Return a result of any result format as JSON serializable records."""
+    if isinstance(data, pd.DataFrame):
+        return json.loads(data.to_json(orient="records"))
+    if pa is not None and isinstance(data, pa.Table):
+        return data.to_pylist()
+    if xr is not None and isinstance(data, xr.DataArray):
+        return _to_records(_to_df(data))
+
+    return data
+
+
+def _to_df(data: Any) -> pd.DataFrame:
+    """Return a result of any result format as a dataframe."""
+    if isinstance(data, pd.DataFrame):
+        return data
+    if pa is not None and isinstance(data, pa.Table):
+        return data.to_pandas()
+    if xr is not None and isinstance(data, xr.DataArray):
+        # the long format, without the combinations that have no value
+        return data.to_series().dropna().reset_index()
+
+    return ColumnarBuilder.from_records(data)
+
+
+def _to_table(data: Any) -> Any:
+    """Return a result of any result format as an Arrow table."""
+    _require_pyarrow()
+
+    if isinstance(data, pa.Table):
+        return data
+    if isinstance(data, pd.DataFrame):
+        return pa.Table.from_pandas(data, preserve_index=False)
+    if xr is not None and isinstance(data, xr.DataArray):
+        return _to_table(_to_df(data))
+
+    return ColumnarBuilder.from_records(data, result_format="arrow")
+
+
+def _from_records(records: list, result_format: ResultFormat) -> Any:
+    """Return records in `result_format`."""
+    if result_format == "json":
+        return records
+    if result_format == "xarray":
+        return CubeBuilder.from_records(records)
+
+    return ColumnarBuilder.from_records(records, result_format)
+
+
+def _n_records(data: Any) -> int:
+    """Return the number of records of a result of any result format."""
+    if xr is not None and isinstance(data, xr.DataArray):
+        return int(data.count())
+
+    return len(data)
+
+
+def _copy_result(data: Any) -> Any:
+    """Return a copy of a result of any result format that shares no mutable data with it."""
+    # Arrow tables are immutable
+    if pa is not None and isinstance(data, pa.Table):
+        return data
+
+    return copy.deepcopy(data)
+
+
+def _filter_values(values: Optional[FilterValues]) -> List[Optional[str]]:
+    """Return the values of a filter on one or several values."""
+    if values is None or isinstance(values, str):
+        return [values]
+
+    return list(values)
+
+
+def _is_multi_valued(*filters: Optional[FilterValues]) -> bool:
+    """Return whether any filter is given several values."""
+    return any(values is not None and not isinstance(values, str) for values in filters)
+
+
+def _check_options(
+    name: str, values: Iterable[Optional[str]], options: List[str]
+) -> None:
+    """Raise a ValueError if a filter value is not one of `options`."""
+    for value in values:
+        if value is not None and value not in options:
+            raise ValueError(f"{name} should be one of {', '.join(options)}")
+
+
+def _single(values: Optional[Sequence[str]]) -> Optional[str]:
+    """Return the value of a filter with exactly one value, or None."""
+    if values is not None and len(values) == 1:
+        return values[0]
+
+    return None
+
+
+def _add_pathway_and_climate_filters(
+    request_url: str,
+    pathway_description: Optional[str],
+    climate_experiment: Optional[str],
+) -> str:
+    """
+    Validate the pathway and climate experiment filters and append them to `request_url`.
+
+    :param request_url: the URL to extend
+    :type request_url: str
+
+    :param pathway_description: the EUCalc pathway on which to filter data
+    :type pathway_description: str
+
+    :param climate_experiment: the climate experiment on which to filter data
+    :type climate_experiment: str
+
+    :returns: The extended URL
+    :rtype: str
+    """
+    ## pathway
+    if pathway_description is not None:
+        _check_options("pathway_description", [pathway_description], PATHWAY_OPTIONS)
+
+        request_url = f"{request_url}&pathway={pathway_description}"
+
+    ## climate experiment
+    if climate_experiment is not None:
+        _check_options(
+            "climate_experiment", [climate_experiment], CLIMATE_EXPERIMENT_OPTIONS
+        )
+
+        request_url = f"{request_url}&climate_experiment={climate_experiment}"
+
+    return request_url
+
+
+def _page_url(request_url: str, page: int) -> str:
+    """
+    Return `request_url` with its `page` query parameter set to `page`.
+
+    :param request_url: the URL of any page of a paginated query
+    :type request_url: str
+
+    :param page: the number of the page, starting at 1
+    :type page: int
+
+    :returns: The URL of the page
+    :rtype: str
+    """
+    return with_query_param(request_url, "page", page)
+
+
+def _apply_page_size(
+    request_url: str, page_size: PageSize
+) -> Tuple[str, Optional[AdaptivePageSize]]:
     """
-    # request
-    next_request_url = (
-        "http://data.localised-project.eu/dsp/"
-        + version
-        + "/"
-        + country_code.lower()
-        + "/"
-        "region_metadata/?"
-        "resolution=" + spatial_resolution
+    Return `request_url` with a fixed page size set, and the options of an adaptive page size.
+
+    :param request_url: the URL of the first page of a paginated query
+    :type request_url: str
+
+    :param page_size: the number of results per page, 'adaptive', adaptive page size
+        options, or None for the default page size of the DSP
+    :type page_size: int/str/AdaptivePageSize
+
+    :returns: The URL, and the adaptive page size options if the page size is adaptive
+    :rtype: tuple
+    """
+    if page_size is None:
+        return request_url, None
+
+    if page_size == "adaptive":
+        return request_url, AdaptivePageSize()
+
+    if isinstance(page_size, AdaptivePageSize):
+        return request_url, page_size
+
+    if not isinstance(page_size, int) or page_size < 1:
+        raise ValueError("page_size should be a positive integer or 'adaptive'")
+
+    return with_query_param(request_url, "page_size", page_size), None
+
+
+def _is_read_timeout(error: Exception) -> bool:
+    """Return whether a request failed because its response, or the body of it, timed out."""
+    if isinstance(error, requests.ReadTimeout):
+        return True
+
+    # timeouts while the body is read are raised as connection errors
+    return any(
+        isinstance(arg, urllib3.exceptions.ReadTimeoutError) for arg in error.args
     )
-    print(next_request_url)
 
-    if region_code is not None:
-        next_request_url = f"{next_request_url}&region={region_code}"
 
-    result_collection = []
-    while next_request_url is not None:
-        response = requests.get(next_request_url, stream=True, timeout=240)
-        response.raise_for_status()
+class _DSPClientBase:
+    """
+    URL building and result handling shared by the synchronous and asynchronous clients.
+
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
+
+    :param base_url: the URL under which the DSP versions are served
+    :type base_url: str
+    """
+
+    def __init__(self, version: str, base_url: str = DSP_BASE_URL) -> None:
+        self.version = version
+        self.base_url = base_url.rstrip("/") + "/"
+
+    def _endpoint_url(self, country_code: str, endpoint: str) -> str:
+        """
+        Return the URL of an endpoint of the DSP for a country.
+
+        :param country_code: the code of the country
+        :type country_code: str
+
+        :param endpoint: the name of the endpoint. E.g. region_data
+        :type endpoint: str
+
+        :returns: The URL
+        :rtype: str
+        """
+        return f"{self.base_url}{self.version}/{country_code.lower()}/{endpoint}/"
+
+    def _region_metadata_url(
+        self, country_code: str, spatial_resolution: str, region_code: Optional[str]
+    ) -> str:
+        """Return the URL of the first page of a region metadata query."""
+        request_url = (
+            self._endpoint_url(country_code, "region_metadata")
+            + "?resolution="
+            + spatial_resolution
+        )
+
+        if region_code is not None:
+            request_url = f"{request_url}&region={region_code}"
+
+        return request_url
+
+    def _region_data_url(
+        self,
+        country_code: str,
+        region_code: str,
+        variable: Optional[str],
+        pathway_description: Optional[str],
+        climate_experiment: Optional[str],
+        mini_version: Optional[bool],
+    ) -> str:
+        """Return the URL of the first page of a region data query."""
+        # base URL
+        base_url = self._endpoint_url(country_code, "region_data")
+
+        # mini version
+        if mini_version:
+            base_url = f"{base_url}mini_version/"
+
+        # default URL
+        request_url = f"{base_url}?region={region_code}"
+
+        # optional filters
+        ## variable
+        if variable is not None:
+            request_url = f"{request_url}&variable={variable}"
+
+        return _add_pathway_and_climate_filters(
+            request_url, pathway_description, climate_experiment
+        )
+
+    def _variable_metadata_url(self, country_code: str, variable: Optional[str]) -> str:
+        """Return the URL of the first page of a variable metadata query."""
+        request_url = self._endpoint_url(country_code, "variable_metadata")
 
-        response = response.json()
+        # optional filter - variable
+        if variable is not None:
+            request_url = f"{request_url}?variable={variable}"
 
-        next_request_url = response["next"]
-        response_data = response["results"]
+        return request_url
 
-        result_collection.extend(response_data)
+    def _proxy_details_url(self, country_code: str, variable: str) -> str:
+        """Return the URL of a proxy details query."""
+        return (
+            self._endpoint_url(country_code, "proxy_details") + "?variable=" + variable
+        )
 
-    # save
-    if save_result:
+    def _variable_data_url(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        variable: str,
+        pathway_description: Optional[str],
+        climate_experiment: Optional[str],
+    ) -> str:
+        """Return the URL of the first page of a variable data query."""
+        # default URL
+        request_url = (
+            self._endpoint_url(country_code, "variable_data")
+            + "?resolution="
+            + spatial_resolution
+            + "&variable="
+            + variable
+        )
+
+        # optional filters
+        return _add_pathway_and_climate_filters(
+            request_url, pathway_description, climate_experiment
+        )
+
+    @staticmethod
+    def _assemble(
+        pages: Iterable[list], result_format: ResultFormat
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Combine the results of the pages of a query, in page order, into one result.
+
+        :param pages: the results of each page
+        :type pages: Iterable[list]
+
+        :param result_format: the format of the resulting data
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        builder: Any
+        if result_format == "xarray":
+            builder = CubeBuilder()
+        elif result_format in ("df", "arrow"):
+            builder = ColumnarBuilder()
+        else:
+            builder = []
+
+        # only the time spent adding the pages counts, not the time fetching them
+        normalize_time = 0.0
+        for response_data in pages:
+            start = time.perf_counter()
+            if result_format == "json":
+                builder.extend(response_data)
+            else:
+                builder.append(response_data)
+            normalize_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if result_format == "arrow":
+            result = builder.build_arrow()
+        elif result_format in ("df", "xarray"):
+            result = builder.build()
+        else:
+            result = builder
+        add_normalize_time(normalize_time + time.perf_counter() - start)
+
+        return result
+
+    @staticmethod
+    def _save(
+        data: Any,
+        result_format: ResultFormat,
+        save_path: Optional[str],
+        save_name: Optional[str],
+        save_format: Optional[SaveFormat] = None,
+        partition_cols: Optional[Sequence[str]] = None,
+    ) -> None:
+        """
+        Save a result as .json, .csv or .parquet, converting it from its result format as needed.
+
+        :param data: the result to save
+        :type data: list/pd.DataFrame/pyarrow.Table
+
+        :param result_format: the format of the result
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+        :type save_path: str
+
+        :param save_name: the file name of the result, without extension
+        :type save_name: str
+
+        :param save_format: the file format. If None, a 'json' result is saved as .json,
+            a 'df' result as .csv and an 'arrow' result as .parquet
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param partition_cols: the columns by which a parquet dataset is partitioned
+        :type partition_cols: Sequence[str]
+        """
         if save_path is None:
             save_path = os.path.dirname(__file__)
 
-        save_json(
-            data=result_collection, save_path=save_path, save_name=f"{save_name}.json"
-        )
+        if save_format is None:
+            save_format = DEFAULT_SAVE_FORMATS[result_format]  # type: ignore[assignment]
+
+        _check_partition_cols(save_format, partition_cols)
+
+        if save_format == "json":
+            save_json(
+                data=_to_records(data),
+                save_path=save_path,
+                save_name=f"{save_name}.json",
+            )
+        elif save_format == "csv":
+            save_df(
+                data_df=_to_df(data), save_path=save_path, save_name=f"{save_name}.csv"
+            )
+        elif save_format == "parquet":
+            save_parquet(
+                data_table=_to_table(data),
+                save_path=save_path,
+                save_name=f"{save_name}" if partition_cols else f"{save_name}.parquet",
+                partition_cols=partition_cols,
+            )
+        else:
+            raise ValueError("save_format should be one of json, csv, parquet")
 
-    return result_collection
 
+Getter = TypeVar("Getter", bound=Callable[..., Any])
 
-@measure_time
-def get_region_data(
-    version: str,
-    country_code: str,
-    region_code: str,
-    variable: Optional[str] = None,
-    pathway_description: Optional[str] = None,
-    climate_experiment: Optional[str] = None,
-    mini_version: Optional[bool] = True,
-    result_format: Literal["json", "df"] = "json",
-    save_result: Optional[bool] = False,
-    save_path: Optional[str] = None,
-    save_name: Optional[str] = "region_data",
-) -> Union[list, pd.DataFrame]:
+
+def _starts_query(getter: Getter) -> Getter:
+    """Wrap around a getter of `DSPClient` to forget the metrics of the last query of the thread before it runs."""
+
+    @wraps(getter)
+    def _f(self: "DSPClient", *args: Any, **kwargs: Any) -> Any:
+        self._last_query.summary = None
+        return getter(self, *args, **kwargs)
+
+    return cast(Getter, _f)
+
+
+class DSPClient(_DSPClientBase):
     """
-    Return all the data for a specified region of a specified country, at a specified spatial resolution.
+    Client to query a specific version of the DSP over a pooled, keep-alive HTTP session.
+
+    All pages of a query, and all queries made through the same client, reuse the
+    connections of one `requests.Session` instead of opening a new connection per page.
 
     :param version: the version of the DSP to query. E.g. v1, v2, etc.
     :type version: str
 
-    :param country_code: the code of the required country. NOTE: must be in lower case
-    :type country_code: str
+    **Default arguments:**
 
-    :param region_code: the code of the region to filter on
-    :type region_code: str
+    :param base_url: the URL under which the DSP versions are served
+        |br| * the default value is 'http://data.localised-project.eu/dsp/'
+    :type base_url: str
 
-    **Default arguments:**
+    :param pool_size: the maximum number of connections kept open per host
+        |br| * the default value is 10
+    :type pool_size: int
 
-    :param variable: the variable to filter on
+    :param keep_alive: indicates whether connections are kept open between requests
+        |br| * the default value is True
+    :type keep_alive: bool
+
+    :param timeout: the request timeout in seconds, either a single value or a
+        (connect timeout, read timeout) tuple
+        |br| * the default value is 240
+    :type timeout: float/tuple
+
+    :param prefetch_workers: if set, the number of pages fetched concurrently.
+        The first page of a query is read, the URLs of all remaining pages are
+        derived from its `count` and page size, and they are fetched by a pool of
+        `prefetch_workers` threads. The pages are still returned in order.
+        If None, the `next` links are followed one page at a time.
         |br| * the default value is None
-    :type variable: str
+    :type prefetch_workers: int
 
-    :param pathway_description: the EUCalc pathway on which to filter data. Options: "national" or "with_behavioural_changes".
+    :param response_cache: the on-disk cache used by getters called with `cache` 'use'
+        or 'refresh'. If None, a cache in the default folder is created on first use
         |br| * the default value is None
-    :type pathway_description: str
+    :type response_cache: ResponseCache
+
+    :param incremental_parsing: indicates whether page bodies are decoded while they
+        are downloaded, instead of after the whole body has arrived. This lowers the peak
+        memory per page. Requires the optional dependency `ijson`
+        |br| * the default value is False
+    :type incremental_parsing: bool
 
-    :param climate_experiment: the climate experiment on which to filter climate data. For example: "RCP2.6"
+    :param metadata_memo_size: the maximum number of region metadata, variable metadata
+        and proxy details results memoized in memory. Repeated queries with the same
+        arguments are answered from memory. Set to 0 to disable memoization
+        |br| * the default value is 256
+    :type metadata_memo_size: int
+
+    :param retry_policy: the policy of retrying transiently failed requests, used by all
+        queries that do not pass a `retry` policy of their own.
+        If None, the default `RetryPolicy` is used
         |br| * the default value is None
-    :type climate_experiment: str
+    :type retry_policy: RetryPolicy
 
-    :param mini_version: indicates if a reduced number of fields on data should be returned
-        |br| * the default value is True
-    :type mini_version: bool
+    :param circuit_breaker: the circuit breaker shared by all requests of the client.
+        If None, each call of a getter has a default `CircuitBreaker` of its own,
+        shared by the concurrent queries of batches such as :meth:`get_data`, so that
+        the failures of one call do not fail the unrelated calls of other callers,
+        e.g. of the module-level functions, which share one client per version
+        |br| * the default value is None
+    :type circuit_breaker: CircuitBreaker
 
-    :param result_format: the format of the resulting data
-        |br| * the default value is 'json'
-    :type result_format: str, one of {'json', 'df'}
+    :param rate_limiter: the rate limiter of all requests of the client. Pass the same
+        limiter to several clients to share its budget.
+        If None, requests are not rate limited
+        |br| * the default value is None
+    :type rate_limiter: RateLimiter
 
-    :param save_result: indicates whether the result should be saved.
-        The result is saved as .json if `result_format` is 'json'
-        and as .csv if `result_format` is 'df'
-        |br| * the default value is False
-    :type save_result: bool
+    :param replica: the local replica synced by :meth:`sync_country`, answering getters
+        called with `source` 'local'. If None, a replica in the default file is opened
+        on first use
+        |br| * the default value is None
+    :type replica: LocalReplica
 
-    :param save_path: the folder path in which to save the result.
-        If None, the result is save in the same folder as this file- `client.py`
+    :param hooks: the hooks that receive the metrics of each page and query, e.g. a
+        `LoggingHook`. Whatever the result format, the summary of the last query of
+        the calling thread is returned by :meth:`last_query_metrics`. Dataframe
+        results also carry it as `attrs['query_metrics']`
         |br| * the default value is None
-    :type save_path: str
+    :type hooks: Sequence[MetricsHook]
 
-    :param save_name: the file name of the result
-        |br| * the default value is 'region_data'
-    :type save_path: str
+    :param fixtures: the archive into which every page is recorded, or from which every
+        page is replayed without sending a request, depending on its mode
+        |br| * the default value is None
+    :type fixtures: FixtureArchive
+    """
 
-    :returns: The result
-    :rtype: list/pd.DataFrame
-    """
-    # base URL
-    base_url = (
-        "http://data.localised-project.eu/dsp/"
-        + version
-        + "/"
-        + country_code.lower()
-        + "/region_data/"
-    )
+    def __init__(
+        self,
+        version: str,
+        base_url: str = DSP_BASE_URL,
+        pool_size: int = 10,
+        keep_alive: bool = True,
+        timeout: Union[float, Tuple[float, float]] = 240,
+        prefetch_workers: Optional[int] = None,
+        response_cache: Optional[ResponseCache] = None,
+        incremental_parsing: bool = False,
+        metadata_memo_size: int = 256,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        replica: Optional[LocalReplica] = None,
+        hooks: Optional[Sequence[MetricsHook]] = None,
+        fixtures: Optional[FixtureArchive] = None,
+    ) -> None:
+        if incremental_parsing and ijson is None:
+            raise ImportError(
+                "incremental_parsing requires ijson. Install it with `pip install ijson`."
+            )
 
-    # mini version
-    if mini_version:
-        base_url = f"{base_url}mini_version/"
+        super().__init__(version, base_url)
+        self.timeout = timeout
+        self.prefetch_workers = prefetch_workers
+        self.response_cache = response_cache
+        self.incremental_parsing = incremental_parsing
+        self.metadata_memo = MemoCache(max_entries=metadata_memo_size)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.replica = replica
+        self.hooks = list(hooks or [])
+        self.fixtures = fixtures
+        # the summary of the last query collected by each thread
+        self._last_query = threading.local()
+
+        # every prefetch worker needs a connection of its own
+        pool_size = max(pool_size, prefetch_workers or 0)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        if not keep_alive:
+            self.session.headers["Connection"] = "close"
+
+    def __enter__(self) -> "DSPClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close all pooled connections of the client."""
+        self.session.close()
+
+    def last_query_metrics(self) -> Optional[dict]:
+        """
+        Return the summary of the metrics of the last query collected by the calling thread.
+
+        Results answered from memory or the local replica have a summary without pages.
+        The queries of filters given several values, and of batches such as
+        :meth:`get_data`, are collected by worker threads, so the getters running them
+        have no summary.
+
+        :returns: The number of pages, records, bytes, retries and cache hits, and the
+            seconds spent per stage, or None if the last getter collected no query
+        :rtype: dict
+        """
+        return getattr(self._last_query, "summary", None)
+
+    def _get_response_cache(self) -> ResponseCache:
+        """Return the response cache of the client, creating one in the default folder if needed."""
+        if self.response_cache is None:
+            self.response_cache = ResponseCache()
+
+        return self.response_cache
+
+    def _get_replica(self) -> LocalReplica:
+        """Return the local replica of the client, opening the one in the default file if needed."""
+        if self.replica is None:
+            self.replica = LocalReplica()
+
+        return self.replica
+
+    def _local_replica(self, country_code: str) -> LocalReplica:
+        """Return the local replica, after checking that it holds the country in the version of the client."""
+        replica = self._get_replica()
+        synced_version = replica.synced_version(country_code)
+
+        if synced_version is None:
+            raise ValueError(
+                f"{country_code} is not in the local replica {replica.store_path}. "
+                "Sync it with sync_country first."
+            )
+        if synced_version != self.version:
+            raise ValueError(
+                f"{country_code} was synced from DSP version {synced_version}, "
+                f"not {self.version}"
+            )
 
-    # default URL
-    next_request_url = f"{base_url}?region={region_code}"
+        return replica
 
-    # optional filters
-    ## variable
-    if variable is not None:
-        next_request_url = f"{next_request_url}&variable={variable}"
+    def _start_retry(self, retry: Optional[RetryPolicy]) -> RetryPolicy:
+        """Return the retry policy of a query, with its `max_total_time` counting from now."""
+        return (retry or self.retry_policy).start(
+            self.circuit_breaker or _batch_breaker.get()
+        )
 
-    ## pathway
-    if pathway_description is not None:
-        if pathway_description not in ["national", "with_behavioural_changes"]:
-            raise ValueError(
-                "pathway_description should be one of national, with_behavioural_changes"
+    @contextmanager
+    def _shared_breaker(self) -> Iterator[None]:
+        """Run the queries started within, and in threads run in copies of its context, behind one circuit breaker."""
+        if self.circuit_breaker is not None or _batch_breaker.get() is not None:
+            yield
+            return
+
+        token = _batch_breaker.set(CircuitBreaker())
+        try:
+            yield
+        finally:
+            _batch_breaker.reset(token)
+
+    def _rate_limit(self) -> ContextManager:
+        """Return a context in which a request is sent within the limits of the rate limiter."""
+        if self.rate_limiter is None:
+            return nullcontext()
+
+        return self.rate_limiter.limit()
+
+    def _send(
+        self,
+        request_url: str,
+        retry: RetryPolicy,
+        metrics: Optional[PageMetrics] = None,
+    ) -> dict:
+        """
+        Request a page, retrying it according to `retry`, and return its decoded body.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :param retry: the retry policy
+        :type retry: RetryPolicy
+
+        :param metrics: if set, the metrics in which the attempts, timings and size of
+            the page are recorded
+        :type metrics: PageMetrics
+
+        :returns: The decoded page
+        :rtype: dict
+        """
+        metrics = metrics or PageMetrics(request_url)
+        circuit_breaker = retry.circuit_breaker
+        if circuit_breaker is None:
+            raise ValueError("retry should be a policy started for the query")
+
+        attempt = 0
+        while True:
+            attempt += 1
+            metrics.attempts = attempt
+            circuit_breaker.before_request()
+
+            # the rate limiter slot is held until the body is read
+            with self._rate_limit():
+                response: Optional[requests.Response] = None
+                try:
+                    response = self.session.get(
+                        request_url, stream=True, timeout=self.timeout
+                    )
+                    metrics.status = response.status_code
+                    metrics.ttfb = response.elapsed.total_seconds()
+
+                    # a 429 means the DSP is up, but throttling
+                    if response.status_code >= 500:
+                        circuit_breaker.record_failure()
+                    else:
+                        circuit_breaker.record_success()
+
+                    delay = None
+                    if response.status_code in retry.retry_statuses:
+                        delay = retry.next_delay(
+                            attempt, response.headers.get("Retry-After")
+                        )
+
+                    if delay is None:
+                        response.raise_for_status()
+                        return self._decode(response, metrics)
+
+                    response.close()
+                except (requests.ConnectionError, requests.Timeout) as error:
+                    circuit_breaker.record_failure()
+                    if not retry.retry_timeouts and _is_read_timeout(error):
+                        raise
+
+                    response = None
+                    delay = retry.next_delay(attempt)
+                    if delay is None:
+                        raise
+
+            # throttle all requests sharing the rate limiter, not only this one
+            if response is not None and response.status_code == 429:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.pause(delay)
+            time.sleep(delay)
+
+    def _decode(self, response: requests.Response, metrics: PageMetrics) -> dict:
+        """Read and decode the body of a successful response, recording the time spent."""
+        page: dict
+        start = time.perf_counter()
+        if self.incremental_parsing:
+            # decode the top-level fields from the socket as the body arrives
+            response.raw.decode_content = True
+            page = dict(ijson.kvitems(response.raw, "", use_float=True))
+            metrics.download_time = time.perf_counter() - start
+            metrics.n_bytes = response.raw.tell()
+        else:
+            body = response.content
+            metrics.download_time = time.perf_counter() - start
+            metrics.n_bytes = len(body)
+
+            start = time.perf_counter()
+            page = json.loads(body)
+            metrics.parse_time = time.perf_counter() - start
+
+        return page
+
+    def _get_page(
+        self,
+        request_url: str,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+    ) -> dict:
+        """
+        Request a single page and return its decoded body.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy. If None, the policy of the client is used
+        :type retry: RetryPolicy
+
+        :returns: The decoded page
+        :rtype: dict
+        """
+        logger.debug("GET %s", request_url)
+        metrics = PageMetrics(request_url)
+        start = time.perf_counter()
+
+        if self.fixtures is not None and self.fixtures.mode == "replay":
+            page, latency = self.fixtures.replay(request_url)
+            if self.fixtures.replay_latency:
+                time.sleep(latency)
+        else:
+            page = self._fetch_page(request_url, cache, retry, metrics)
+
+        metrics.total_time = time.perf_counter() - start
+        if self.fixtures is not None and self.fixtures.mode == "record":
+            self.fixtures.record(request_url, page, metrics.total_time)
+        self._record_page(metrics, page)
+
+        return page
+
+    def _fetch_page(
+        self,
+        request_url: str,
+        cache: CacheMode,
+        retry: Optional[RetryPolicy],
+        metrics: PageMetrics,
+    ) -> dict:
+        """Return a page from the response cache, or else request it from the DSP."""
+        page = None
+        if cache == "use":
+            page = self._get_response_cache().get(request_url)
+            metrics.cache_hit = page is not None
+
+        if page is None:
+            page = self._send(request_url, retry or self._start_retry(None), metrics)
+
+            if cache != "off":
+                self._get_response_cache().set(request_url, page)
+
+        return page
+
+    def _record_page(self, metrics: PageMetrics, page: dict) -> None:
+        """Add the metrics of a page to the current query and pass them to the hooks."""
+        results = page.get("results") if isinstance(page, dict) else page
+        if isinstance(results, list):
+            metrics.n_records = len(results)
+
+        add_page(metrics)
+        for hook in self.hooks:
+            hook.on_page(metrics)
+
+    def _memoized(
+        self, key: Tuple[str, str], fetch: Callable[[], Any], cache: CacheMode
+    ) -> Any:
+        """
+        Return the memoized result of a metadata query, fetching it on a miss.
+
+        The result is returned as a copy, so that callers can change its records or
+        columns without changing the memoized result. A memoized result is reported as
+        a query without pages.
+
+        :param key: the URL of the first page and the format of the result
+        :type key: tuple
+
+        :param fetch: returns the result of the query
+        :type fetch: Callable
+
+        :param cache: how the on-disk response cache is used. With 'refresh',
+            the memoized result is replaced as well
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :returns: The result
+        :rtype: Any
+        """
+        result = None
+        if cache != "refresh":
+            result = self.metadata_memo.get(key)
+
+        if result is None:
+            result = fetch()
+            self.metadata_memo.set(key, result)
+            return _copy_result(result)
+
+        return self._measured(key[0], partial(_copy_result, result))
+
+    def clear_cache(self) -> None:
+        """Remove all memoized metadata results of the client."""
+        self.metadata_memo.clear()
+
+    def _iter_pages(
+        self,
+        next_request_url: Optional[str],
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+    ) -> Iterator[list]:
+        """
+        Follow the `next` links of a paginated query and yield the results of each page.
+
+        If `prefetch_workers` is set, the pages after the first are fetched concurrently,
+        unless the first page is empty.
+
+        :param next_request_url: the URL of the first page
+        :type next_request_url: str
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The results of each page
+        :rtype: Iterator[list]
+        """
+        is_first_page = True
+        while next_request_url is not None:
+            response = self._get_page(next_request_url, cache, retry)
+
+            next_request_url = response["next"]
+            yield response["results"]
+
+            # the URLs of the remaining pages are derived from the size of the first
+            # page, so after an empty first page the `next` links are followed
+            if (
+                self.prefetch_workers
+                and is_first_page
+                and next_request_url is not None
+                and response["results"]
+            ):
+                yield from self._prefetch_pages(
+                    response, next_request_url, cache, retry
+                )
+                return
+            is_first_page = False
+
+    def _prefetch_pages(
+        self,
+        first_page: dict,
+        next_request_url: str,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+    ) -> Iterator[list]:
+        """
+        Fetch the remaining pages of a query concurrently and yield their results in order.
+
+        At most `prefetch_workers` pages are fetched ahead of the page being yielded, so
+        that pages a slow consumer has not reached yet are not held in memory.
+
+        :param first_page: the decoded first page of the query
+        :type first_page: dict
+
+        :param next_request_url: the `next` link of the first page
+        :type next_request_url: str
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The results of each remaining page
+        :rtype: Iterator[list]
+        """
+        page_size = len(first_page["results"])
+        n_pages = math.ceil(first_page["count"] / page_size)
+        request_urls = (
+            _page_url(next_request_url, page) for page in range(2, n_pages + 1)
+        )
+
+        executor = ThreadPoolExecutor(max_workers=self.prefetch_workers)
+        pending: Deque[Future] = deque()
+
+        def submit(request_url: str) -> None:
+            # each page is fetched in a copy of the current context, so that it is
+            # recorded in the metrics of the query
+            pending.append(
+                executor.submit(
+                    copy_context().run, self._get_page, request_url, cache, retry
+                )
             )
 
-        next_request_url = f"{next_request_url}&pathway={pathway_description}"
+        try:
+            for request_url in itertools.islice(request_urls, self.prefetch_workers):
+                submit(request_url)
+
+            while pending:
+                response_data = pending.popleft().result()["results"]
+                next_url = next(request_urls, None)
+                if next_url is not None:
+                    submit(next_url)
+                yield response_data
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _iter_adaptive_pages(
+        self,
+        request_url: str,
+        page_size: AdaptivePageSize,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+    ) -> Iterator[list]:
+        """
+        Request the pages of a paginated query by number, adapting the page size as they arrive.
+
+        Pages are fetched one at a time, even if `prefetch_workers` is set, since the
+        size of each page depends on the latency of the page before it. A page whose
+        response times out is requested again at half the size, instead of being retried.
+
+        :param request_url: the URL of the first page
+        :type request_url: str
+
+        :param page_size: the adaptive page size options
+        :type page_size: AdaptivePageSize
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The results of each page
+        :rtype: Iterator[list]
+        """
+        pager = AdaptivePager(request_url, page_size)
+        retry = dataclasses.replace(
+            retry or self._start_retry(None), retry_timeouts=False
+        )
 
-    ## climate experiment
-    if climate_experiment is not None:
-        if climate_experiment not in ["RCP2.6", "RCP4.5", "RCP8.5", "Historical"]:
-            raise ValueError(
-                "climate_experiment should be one of RCP2.6, RCP4.5, RCP8.5, Historical"
+        next_request_url = pager.next_url()
+        while next_request_url is not None:
+            start = time.monotonic()
+            try:
+                response = self._get_page(next_request_url, cache, retry)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                if not _is_read_timeout(error) or not pager.shrink():
+                    raise
+            else:
+                response_data = pager.add_page(response, time.monotonic() - start)
+                if response_data is not None:
+                    yield response_data
+
+            next_request_url = pager.next_url()
+
+    def _iter_checkpointed_pages(
+        self,
+        request_url: str,
+        checkpoint_dir: str,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+    ) -> Iterator[list]:
+        """
+        Follow the `next` links of a paginated query, checkpointing each completed page.
+
+        The pages of an earlier, interrupted run of the same query are read from its
+        checkpoint, and fetching resumes from its `next` cursor. Once the last page is
+        yielded, the checkpoint is removed. Pages are fetched one at a time, even if
+        `prefetch_workers` is set, so that the checkpoint always ends at the last good page.
+
+        :param request_url: the URL of the first page
+        :type request_url: str
+
+        :param checkpoint_dir: the folder in which the checkpoints are stored
+        :type checkpoint_dir: str
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :returns: The results of each page
+        :rtype: Iterator[list]
+        """
+        checkpoint = PageCheckpoint(checkpoint_dir, request_url)
+        pages, next_request_url = checkpoint.load()
+        yield from pages
+
+        page_number = len(pages)
+        while next_request_url is not None:
+            response = self._get_page(next_request_url, cache, retry)
+
+            page_number += 1
+            next_request_url = response["next"]
+            checkpoint.add(page_number, response["results"], next_request_url)
+            yield response["results"]
+
+        checkpoint.remove()
+
+    def _collect(
+        self,
+        request_url: str,
+        result_format: ResultFormat,
+        cache: CacheMode = "off",
+        checkpoint_dir: Optional[str] = None,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Collect the results of all pages of a paginated query.
+
+        :param request_url: the URL of the first page
+        :type request_url: str
+
+        :param result_format: the format of the resulting data
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param checkpoint_dir: if set, the folder in which completed pages are checkpointed
+        :type checkpoint_dir: str
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page, 'adaptive' or adaptive page
+            size options. If None, the default page size of the DSP is used
+        :type page_size: int/str/AdaptivePageSize
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        request_url, adaptive_page_size = _apply_page_size(request_url, page_size)
+
+        if checkpoint_dir is not None:
+            if adaptive_page_size is not None:
+                raise ValueError(
+                    "checkpoint_dir is not supported with an adaptive page_size"
+                )
+
+            pages = self._iter_checkpointed_pages(
+                request_url, checkpoint_dir, cache, retry
+            )
+        else:
+            pages = self._iter_page_results(
+                request_url, cache, retry, adaptive_page_size
             )
 
-        next_request_url = f"{next_request_url}&climate_experiment={climate_experiment}"
+        return self._measured(
+            request_url, partial(self._assemble, pages, result_format)
+        )
 
-    result_collection = []
-    while next_request_url is not None:
-        print(next_request_url)
-        response = requests.get(next_request_url, stream=True, timeout=240)
+    def _measured(self, request_url: str, build: Callable[[], Any]) -> Any:
+        """
+        Build the result of a query, and report the metrics of the pages fetched meanwhile.
+
+        The summary of the metrics becomes the last query of the thread, and is attached
+        to dataframe results. A result built without fetching pages, e.g. from memory
+        or the local replica, is reported with the number of its records.
+
+        :param request_url: the URL of the first page of the query
+        :type request_url: str
+
+        :param build: returns the result of the query
+        :type build: Callable
+
+        :returns: The result
+        :rtype: Any
+        """
+        start = time.perf_counter()
+        with measure_query(QueryMetrics(request_url)) as query_metrics:
+            result = build()
+        query_metrics.total_time = time.perf_counter() - start
+
+        if not query_metrics.pages:
+            query_metrics.n_records = _n_records(result)
+        self._last_query.summary = query_metrics.summary()
+        if isinstance(result, pd.DataFrame):
+            result.attrs["query_metrics"] = query_metrics.summary()
+        for hook in self.hooks:
+            hook.on_query(query_metrics)
+
+        return result
+
+    def _iter_page_results(
+        self,
+        request_url: str,
+        cache: CacheMode,
+        retry: Optional[RetryPolicy],
+        adaptive_page_size: Optional[AdaptivePageSize],
+    ) -> Iterator[list]:
+        """Yield the results of each page, adapting the page size if `adaptive_page_size` is set."""
+        if adaptive_page_size is not None:
+            return self._iter_adaptive_pages(
+                request_url, adaptive_page_size, cache, retry
+            )
 
-        response.raise_for_status()
+        return self._iter_pages(request_url, cache, retry)
+
+    @_starts_query
+    def get_region_metadata(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        region_code: Optional[str] = None,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "region_metadata",
+        save_format: Optional[SaveFormat] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+    ) -> Union[list, dict]:
+        """
+        Return list of regions of a specified country, at a specified spatial resolution.
+
+        :param country_code: the code of the required country. NOTE: must be in lower case
+        :type country_code: str
+
+        :param spatial_resolution: the required spatial resolution
+        :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+
+        **Default arguments:**
+
+        :param region_code: the code of the region to filter on
+            |br| * the default value is None. If None, all regions are returned.
+        :type region_code: str
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'region_metadata'
+        :type save_path: str
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param cache: how the on-disk response cache is used. 'use' returns cached pages
+            that have not expired and stores fetched ones, 'refresh' fetches all pages
+            and stores them, 'off' bypasses the cache
+            |br| * the default value is 'off'
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of this query, overriding the policy of the client
+            |br| * the default value is None
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page. With 'adaptive', the page size
+            grows while pages arrive quickly and shrinks when they are slow or time out.
+            Pass an `AdaptivePageSize` to set its limits and target latency
+            |br| * the default value is None. If None, the default page size of the DSP is used.
+        :type page_size: int/str/AdaptivePageSize
+
+        :param source: where the query is answered. 'dsp' queries the DSP, 'local' reads
+            the local replica of the client, synced with :meth:`sync_country`.
+            With 'local', the options of DSP requests, such as `cache`, are ignored
+            |br| * the default value is 'dsp'
+        :type source: str, one of {'dsp', 'local'}
+
+        :returns: The result
+        :rtype: list/dict
+        """
+        request_url = self._region_metadata_url(
+            country_code, spatial_resolution, region_code
+        )
+        result_collection: list
+        if source == "local":
+            result_collection = self._measured(
+                request_url,
+                partial(
+                    self._local_replica(country_code).region_metadata,
+                    country_code,
+                    spatial_resolution,
+                    region_code,
+                ),
+            )
+        else:
+            result_collection = self._memoized(
+                (request_url, "json"),
+                partial(
+                    self._collect,
+                    request_url,
+                    "json",
+                    cache,
+                    retry=self._start_retry(retry),
+                    page_size=page_size,
+                ),
+                cache,
+            )
 
-        response = response.json()
+        # save
+        if save_result:
+            self._save(result_collection, "json", save_path, save_name, save_format)
+
+        return result_collection
+
+    @_starts_query
+    def get_region_data(
+        self,
+        country_code: str,
+        region_code: str,
+        variable: Optional[FilterValues] = None,
+        pathway_description: Optional[FilterValues] = None,
+        climate_experiment: Optional[FilterValues] = None,
+        mini_version: Optional[bool] = True,
+        result_format: ResultFormat = "json",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "region_data",
+        save_format: Optional[SaveFormat] = None,
+        checkpoint_dir: Optional[str] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+        max_workers: int = 8,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Return all the data for a specified region of a specified country, at a specified spatial resolution.
+
+        :param country_code: the code of the required country. NOTE: must be in lower case
+        :type country_code: str
+
+        :param region_code: the code of the region to filter on
+        :type region_code: str
+
+        **Default arguments:**
+
+        :param variable: the variable, or the list of variables, to filter on
+            |br| * the default value is None
+        :type variable: str/Sequence[str]
+
+        :param pathway_description: the EUCalc pathway, or the list of pathways, on which to filter data. Options: "national" or "with_behavioural_changes".
+            |br| * the default value is None
+        :type pathway_description: str/Sequence[str]
+
+        :param climate_experiment: the climate experiment, or the list of climate experiments, on which to filter climate data. For example: "RCP2.6"
+            |br| * the default value is None
+        :type climate_experiment: str/Sequence[str]
+
+        :param mini_version: indicates if a reduced number of fields on data should be returned
+            |br| * the default value is True
+        :type mini_version: bool
+
+        :param result_format: the format of the resulting data. 'xarray' returns a dense
+            cube with a dimension per field among 'region_code', 'var_name', 'year',
+            'climate_experiment' and 'pathway', and NaN for combinations without a value.
+            Requires `xarray`
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow', 'xarray'}
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'region_data'
+        :type save_path: str
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param checkpoint_dir: if set, each completed page and the `next` cursor are
+            saved in a job folder under `checkpoint_dir`. If the query fails, running it
+            again with the same arguments resumes from the last completed page. The job
+            folder is removed once all pages are fetched
+            |br| * the default value is None
+        :type checkpoint_dir: str
+
+        :param cache: how the on-disk response cache is used. 'use' returns cached pages
+            that have not expired and stores fetched ones, 'refresh' fetches all pages
+            and stores them, 'off' bypasses the cache
+            |br| * the default value is 'off'
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of this query, overriding the policy of the client
+            |br| * the default value is None
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page. With 'adaptive', the page size
+            grows while pages arrive quickly and shrinks when they are slow or time out.
+            Pass an `AdaptivePageSize` to set its limits and target latency
+            |br| * the default value is None. If None, the default page size of the DSP is used.
+        :type page_size: int/str/AdaptivePageSize
+
+        :param source: where the query is answered. 'dsp' queries the DSP, 'local' reads
+            the local replica of the client, synced with :meth:`sync_country`.
+            With 'local', the options of DSP requests, such as `cache`, are ignored
+            |br| * the default value is 'dsp'
+        :type source: str, one of {'dsp', 'local'}
+
+        :param max_workers: if filters are given several values, one query is run per
+            combination of values, with `max_workers` queries run concurrently.
+            The records returned by several queries are kept once
+            |br| * the default value is 8
+        :type max_workers: int
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table/xarray.DataArray
+        """
+        if _is_multi_valued(variable, pathway_description, climate_experiment):
+            result_collection = self._merge_filter_values(
+                partial(
+                    self.get_region_data,
+                    country_code=country_code,
+                    region_code=region_code,
+                    mini_version=mini_version,
+                    checkpoint_dir=checkpoint_dir,
+                    cache=cache,
+                    retry=retry,
+                    page_size=page_size,
+                    source=source,
+                ),
+                dict(
+                    variable=variable,
+                    pathway_description=pathway_description,
+                    climate_experiment=climate_experiment,
+                ),
+                result_format,
+                max_workers,
+            )
+        elif source == "local":
+            replica = self._local_replica(country_code)
+            result_collection = self._measured(
+                self._region_data_url(
+                    country_code,
+                    region_code,
+                    cast(Optional[str], variable),
+                    cast(Optional[str], pathway_description),
+                    cast(Optional[str], climate_experiment),
+                    mini_version,
+                ),
+                lambda: _from_records(
+                    replica.region_data(
+                        country_code,
+                        region_code,
+                        cast(Optional[str], variable),
+                        cast(Optional[str], pathway_description),
+                        cast(Optional[str], climate_experiment),
+                        mini_version,
+                    ),
+                    result_format,
+                ),
+            )
+        else:
+            request_url = self._region_data_url(
+                country_code,
+                region_code,
+                cast(Optional[str], variable),
+                cast(Optional[str], pathway_description),
+                cast(Optional[str], climate_experiment),
+                mini_version,
+            )
+            result_collection = self._collect(
+                request_url,
+                result_format,
+                cache,
+                checkpoint_dir,
+                self._start_retry(retry),
+                page_size,
+            )
 
-        next_request_url = response["next"]
-        response_data = response["results"]
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
 
-        if result_format == "json":
-            result_collection.extend(response_data)
-        elif result_format == "df":
-            result_collection.append(pd.json_normalize(response_data))
+        return result_collection
+
+    @_starts_query
+    def get_variable_metadata(
+        self,
+        country_code: str,
+        variable: Optional[str] = None,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "variable_metadata",
+        result_format: ResultFormat = "json",
+        save_format: Optional[SaveFormat] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+    ) -> Any:
+        """
+        Return the metadata of all variables, or of a specified variable, for a specified country.
+
+        :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
+        :type country_code: str
+
+        **Default arguments:**
+
+        :param variable: the variable to filter on.
+            |br| * the default value is None
+        :type variable: str
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'variable_metadata'
+        :type save_path: str
+
+        :param result_format: the format of the resulting data
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param cache: how the on-disk response cache is used. 'use' returns cached pages
+            that have not expired and stores fetched ones, 'refresh' fetches all pages
+            and stores them, 'off' bypasses the cache
+            |br| * the default value is 'off'
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of this query, overriding the policy of the client
+            |br| * the default value is None
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page. With 'adaptive', the page size
+            grows while pages arrive quickly and shrinks when they are slow or time out.
+            Pass an `AdaptivePageSize` to set its limits and target latency
+            |br| * the default value is None. If None, the default page size of the DSP is used.
+        :type page_size: int/str/AdaptivePageSize
+
+        :param source: where the query is answered. 'dsp' queries the DSP, 'local' reads
+            the local replica of the client, synced with :meth:`sync_country`.
+            With 'local', the options of DSP requests, such as `cache`, are ignored
+            |br| * the default value is 'dsp'
+        :type source: str, one of {'dsp', 'local'}
+
+        :returns: The result
+        :rtype: Any
+        """
+        request_url = self._variable_metadata_url(country_code, variable)
+        if source == "local":
+            replica = self._local_replica(country_code)
+            result_collection = self._measured(
+                request_url,
+                lambda: _from_records(
+                    replica.variable_metadata(country_code, variable), result_format
+                ),
+            )
+        else:
+            result_collection = self._memoized(
+                (request_url, result_format),
+                partial(
+                    self._collect,
+                    request_url,
+                    result_format,
+                    cache,
+                    retry=self._start_retry(retry),
+                    page_size=page_size,
+                ),
+                cache,
+            )
 
-    if result_format == "df":
-        result_collection = pd.concat(result_collection)
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
 
-    # save
-    if save_result:
-        if save_path is None:
-            save_path = os.path.dirname(__file__)
+        return result_collection
+
+    @_starts_query
+    def get_proxy_details(
+        self,
+        country_code: str,
+        variable: str,
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "proxy_details",
+        result_format: ResultFormat = "json",
+        save_format: Optional[SaveFormat] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        source: Source = "dsp",
+    ) -> Any:
+        """
+        Return proxy details for a specified variable, for a specified country.
+
+        Since there is a possibility to have different proxies for different years (present and future data), information for each year is returned.
+
+        :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
+        :type country_code: str
+
+        :param variable: the variable to filter on.
+        :type variable: str
+
+        **Default arguments:**
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'proxy_details'
+        :type save_path: str
+
+        :param result_format: the format of the resulting data
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param cache: how the on-disk response cache is used. 'use' returns cached pages
+            that have not expired and stores fetched ones, 'refresh' fetches all pages
+            and stores them, 'off' bypasses the cache
+            |br| * the default value is 'off'
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of this query, overriding the policy of the client
+            |br| * the default value is None
+        :type retry: RetryPolicy
+
+        :param source: where the query is answered. 'dsp' queries the DSP, 'local' reads
+            the local replica of the client, synced with :meth:`sync_country`.
+            With 'local', the options of DSP requests, such as `cache`, are ignored
+            |br| * the default value is 'dsp'
+        :type source: str, one of {'dsp', 'local'}
+
+        :returns: The result
+        :rtype: Any
+        """
+        request_url = self._proxy_details_url(country_code, variable)
+
+        def fetch_proxy_details() -> Any:
+            response_data: Any = self._get_page(
+                request_url, cache, self._start_retry(retry)
+            )["results"]
+
+            return _from_records(response_data, result_format)
+
+        if source == "local":
+            replica = self._local_replica(country_code)
+            response_data = self._measured(
+                request_url,
+                lambda: _from_records(
+                    replica.proxy_details(country_code, variable), result_format
+                ),
+            )
+        else:
+            response_data = self._memoized(
+                (request_url, result_format),
+                partial(self._measured, request_url, fetch_proxy_details),
+                cache,
+            )
 
-        if result_format == "json":
-            save_json(
-                data=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.json",
+        # save
+        if save_result:
+            self._save(response_data, result_format, save_path, save_name, save_format)
+
+        return response_data
+
+    @_starts_query
+    def get_variable_data(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        variable: FilterValues,
+        pathway_description: Optional[FilterValues] = None,
+        climate_experiment: Optional[FilterValues] = None,
+        result_format: ResultFormat = "json",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "variable_data",
+        save_format: Optional[SaveFormat] = None,
+        partition_cols: Optional[Sequence[str]] = None,
+        checkpoint_dir: Optional[str] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+        max_workers: int = 8,
+    ) -> Union[list, pd.DataFrame]:
+        """
+        Return data for a specified variable at a specified resolution, for a specified country.
+
+        :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
+        :type country_code: str
+
+        :param spatial_resolution: the required spatial resolution
+        :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+
+        :param variable: the required variable, or list of variables. The records of
+            several variables have a 'var_name' column
+        :type variable: str/Sequence[str]
+
+        **Default arguments:**
+
+        :param pathway_description: the EUCalc pathway, or the list of pathways, on which to filter data. Options: "national" or "with_behavioural_changes".
+            |br| * the default value is None
+        :type pathway_description: str/Sequence[str]
+
+        :param climate_experiment: the climate experiment, or the list of climate experiments, on which to filter data. For example: "RCP2.6"
+            |br| * the default value is None
+        :type climate_experiment: str/Sequence[str]
+
+        :param result_format: the format of the resulting data. 'xarray' returns a dense
+            cube with a dimension per field among 'region_code', 'var_name', 'year',
+            'climate_experiment' and 'pathway', and NaN for combinations without a value.
+            Requires `xarray`
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow', 'xarray'}
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'variable_data'
+        :type save_path: str
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param partition_cols: if set, the result is saved as a Hive-partitioned parquet
+            dataset in the folder `save_name`, partitioned by these columns. E.g.
+            ['country_code', 'var_name', 'year']. 'country_code' and 'var_name' columns
+            are added to the saved data. Requires `save_format` 'parquet' or None: the
+            dataset is saved as parquet whatever the `result_format`
+            |br| * the default value is None
+        :type partition_cols: Sequence[str]
+
+        :param checkpoint_dir: if set, each completed page and the `next` cursor are
+            saved in a job folder under `checkpoint_dir`. If the query fails, running it
+            again with the same arguments resumes from the last completed page. The job
+            folder is removed once all pages are fetched
+            |br| * the default value is None
+        :type checkpoint_dir: str
+
+        :param cache: how the on-disk response cache is used. 'use' returns cached pages
+            that have not expired and stores fetched ones, 'refresh' fetches all pages
+            and stores them, 'off' bypasses the cache
+            |br| * the default value is 'off'
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of this query, overriding the policy of the client
+            |br| * the default value is None
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page. With 'adaptive', the page size
+            grows while pages arrive quickly and shrinks when they are slow or time out.
+            Pass an `AdaptivePageSize` to set its limits and target latency
+            |br| * the default value is None. If None, the default page size of the DSP is used.
+        :type page_size: int/str/AdaptivePageSize
+
+        :param source: where the query is answered. 'dsp' queries the DSP, 'local' reads
+            the local replica of the client, synced with :meth:`sync_country`.
+            With 'local', the options of DSP requests, such as `cache`, are ignored
+            |br| * the default value is 'dsp'
+        :type source: str, one of {'dsp', 'local'}
+
+        :param max_workers: if filters are given several values, one query is run per
+            combination of values, with `max_workers` queries run concurrently.
+            The records returned by several queries are kept once
+            |br| * the default value is 8
+        :type max_workers: int
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table/xarray.DataArray
+        """
+        if save_result:
+            # fail before the query, not after all pages are fetched
+            _check_partition_cols(save_format, partition_cols)
+
+        if _is_multi_valued(variable, pathway_description, climate_experiment):
+            result_collection = self._merge_filter_values(
+                partial(
+                    self.get_variable_data,
+                    country_code=country_code,
+                    spatial_resolution=spatial_resolution,
+                    checkpoint_dir=checkpoint_dir,
+                    cache=cache,
+                    retry=retry,
+                    page_size=page_size,
+                    source=source,
+                ),
+                dict(
+                    variable=variable,
+                    pathway_description=pathway_description,
+                    climate_experiment=climate_experiment,
+                ),
+                result_format,
+                max_workers,
+            )
+        elif source == "local":
+            replica = self._local_replica(country_code)
+            result_collection = self._measured(
+                self._variable_data_url(
+                    country_code,
+                    spatial_resolution,
+                    cast(str, variable),
+                    cast(Optional[str], pathway_description),
+                    cast(Optional[str], climate_experiment),
+                ),
+                lambda: _from_records(
+                    replica.variable_data(
+                        country_code,
+                        spatial_resolution,
+                        cast(str, variable),
+                        cast(Optional[str], pathway_description),
+                        cast(Optional[str], climate_experiment),
+                    ),
+                    result_format,
+                ),
             )
         else:
-            save_df(
-                data_df=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.csv",
+            request_url = self._variable_data_url(
+                country_code,
+                spatial_resolution,
+                cast(str, variable),
+                cast(Optional[str], pathway_description),
+                cast(Optional[str], climate_experiment),
+            )
+            result_collection = self._collect(
+                request_url,
+                result_format,
+                cache,
+                checkpoint_dir,
+                self._start_retry(retry),
+                page_size,
             )
 
-    return result_collection
+        # save
+        if save_result and partition_cols:
+            ## partitions by country and variable need their values in the data
+            data_table = _to_table(result_collection)
+            for column_name, column_value in [
+                ("country_code", country_code.lower()),
+                ("var_name", variable),
+            ]:
+                if column_name not in data_table.column_names:
+                    data_table = data_table.append_column(
+                        column_name,
+                        pa.array([column_value] * data_table.num_rows, pa.string()),
+                    )
+
+            self._save(
+                data_table, "arrow", save_path, save_name, save_format, partition_cols
+            )
+        elif save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
 
+        return result_collection
+
+    def _iter_results(
+        self,
+        request_url: str,
+        result_format: ResultFormat,
+        cache: CacheMode,
+        retry: RetryPolicy,
+        page_size: PageSize = None,
+    ) -> Iterator[Union[dict, pd.DataFrame]]:
+        """
+        Yield the records of a paginated query one by one, or as one dataframe per page.
+
+        :param request_url: the URL of the first page
+        :type request_url: str
+
+        :param result_format: 'json' to yield records, 'df' to yield a dataframe per page,
+            'arrow' to yield an Arrow table per page
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param cache: how the on-disk response cache is used
+        :type cache: str, one of {'use', 'refresh', 'off'}
+
+        :param retry: the retry policy of the query
+        :type retry: RetryPolicy
+
+        :param page_size: the number of results per page, 'adaptive' or adaptive page
+            size options. If None, the default page size of the DSP is used
+        :type page_size: int/str/AdaptivePageSize
+
+        :returns: The records, dataframes or tables
+        :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+        """
+        request_url, adaptive_page_size = _apply_page_size(request_url, page_size)
+        pages = self._iter_page_results(request_url, cache, retry, adaptive_page_size)
+
+        for response_data in pages:
+            if result_format == "json":
+                yield from response_data
+            else:
+                yield _from_records(response_data, result_format)
+
+    @_starts_query
+    def iter_region_metadata(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        region_code: Optional[str] = None,
+        result_format: ResultFormat = "json",
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Iterator[Union[dict, pd.DataFrame]]:
+        """
+        Yield the regions of a specified country, at a specified spatial resolution, as each page arrives.
+
+        Unlike :meth:`get_region_metadata`, the result is never held in memory as a whole.
+
+        :param result_format: 'json' to yield one record at a time,
+            'df' to yield one dataframe per page, 'arrow' to yield one Arrow table per page
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        The remaining arguments are documented in :meth:`get_region_metadata`.
+
+        :returns: The records, dataframes or tables
+        :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+        """
+        request_url = self._region_metadata_url(
+            country_code, spatial_resolution, region_code
+        )
+        return self._iter_results(
+            request_url, result_format, cache, self._start_retry(retry), page_size
+        )
 
-def get_variable_metadata(
+    @_starts_query
+    def iter_region_data(
+        self,
+        country_code: str,
+        region_code: str,
+        variable: Optional[str] = None,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        mini_version: Optional[bool] = True,
+        result_format: ResultFormat = "json",
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Iterator[Union[dict, pd.DataFrame]]:
+        """
+        Yield all the data for a specified region of a specified country as each page arrives.
+
+        Unlike :meth:`get_region_data`, the result is never held in memory as a whole.
+
+        :param result_format: 'json' to yield one record at a time,
+            'df' to yield one dataframe per page, 'arrow' to yield one Arrow table per page
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        The remaining arguments are documented in :meth:`get_region_data`.
+
+        :returns: The records, dataframes or tables
+        :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+        """
+        request_url = self._region_data_url(
+            country_code,
+            region_code,
+            variable,
+            pathway_description,
+            climate_experiment,
+            mini_version,
+        )
+        return self._iter_results(
+            request_url, result_format, cache, self._start_retry(retry), page_size
+        )
+
+    @_starts_query
+    def iter_variable_data(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        variable: str,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        result_format: ResultFormat = "json",
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Iterator[Union[dict, pd.DataFrame]]:
+        """
+        Yield data for a specified variable at a specified resolution as each page arrives.
+
+        Unlike :meth:`get_variable_data`, the result is never held in memory as a whole.
+
+        :param result_format: 'json' to yield one record at a time,
+            'df' to yield one dataframe per page, 'arrow' to yield one Arrow table per page
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        The remaining arguments are documented in :meth:`get_variable_data`.
+
+        :returns: The records, dataframes or tables
+        :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+        """
+        request_url = self._variable_data_url(
+            country_code,
+            spatial_resolution,
+            variable,
+            pathway_description,
+            climate_experiment,
+        )
+        return self._iter_results(
+            request_url, result_format, cache, self._start_retry(retry), page_size
+        )
+
+    def _merge_filter_values(
+        self,
+        getter: Callable[..., list],
+        filters: Dict[str, Optional[FilterValues]],
+        result_format: ResultFormat,
+        max_workers: int,
+    ) -> Any:
+        """
+        Query each combination of filter values concurrently and merge the records.
+
+        Records returned by several queries, such as the records without a pathway,
+        which match every pathway filter, are kept once. Such overlaps only occur if
+        the pathway or climate experiment is filtered on several values; records are
+        told apart by their `RECORD_KEY_COLUMNS`. If variables are filtered on several
+        values, the records get a 'var_name' column.
+
+        :param getter: the getter of one query, called with one value of each filter
+        :type getter: Callable
+
+        :param filters: the value or values of each filter, by argument name
+        :type filters: dict
+
+        :param result_format: the format of the merged result
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param max_workers: the number of queries run concurrently
+        :type max_workers: int
+
+        :returns: The merged result
+        :rtype: list/pd.DataFrame/pyarrow.Table
+        """
+        add_var_name = _is_multi_valued(filters.get("variable"))
+        calls = {
+            combination: partial(
+                getter, **dict(zip(filters, combination)), result_format="json"
+            )
+            for combination in itertools.product(*map(_filter_values, filters.values()))
+        }
+        results, errors = self._fan_out(calls, "json", False, [], max_workers)
+        if errors:
+            raise next(iter(errors.values()))
+
+        # the queries of different variables never return the same record
+        deduplicate = _is_multi_valued(
+            *(values for name, values in filters.items() if name != "variable")
+        )
+
+        records: List[dict] = []
+        seen = set()
+        for combination in calls:
+            query_filters = dict(zip(filters, combination))
+            for record in results[combination]:
+                if add_var_name and "var_name" not in record:
+                    record = {**record, "var_name": query_filters["variable"]}
+                if deduplicate:
+                    key = tuple(map(record.get, RECORD_KEY_COLUMNS))
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                records.append(record)
+
+        return _from_records(records, result_format)
+
+    def _fan_out(
+        self,
+        calls: Mapping[Any, Callable[[], Any]],
+        result_format: ResultFormat,
+        concat: bool,
+        key_columns: Sequence[str],
+        max_workers: int,
+    ) -> Tuple[Union[dict, pd.DataFrame], dict]:
+        """
+        Run queries on a thread pool and collect their results and errors by key.
+
+        :param calls: the queries to run, by key
+        :type calls: Mapping
+
+        :param result_format: the format of the result of each query
+        :type result_format: str, one of {'json', 'df', 'arrow'}
+
+        :param concat: indicates whether the results are concatenated into one dataframe,
+            with the key of each query in `key_columns`
+        :type concat: bool
+
+        :param key_columns: the names of the columns holding the key, if `concat` is True
+        :type key_columns: Sequence[str]
+
+        :param max_workers: the number of queries run concurrently
+        :type max_workers: int
+
+        :returns: The results by key, or their concatenation, and the errors by key
+        :rtype: tuple
+        """
+        if concat and result_format != "df":
+            raise ValueError("concat is only supported with result_format 'df'")
+
+        with self._shared_breaker(), ThreadPoolExecutor(max_workers) as executor:
+            futures = {
+                key: executor.submit(copy_context().run, call)
+                for key, call in calls.items()
+            }
+
+        results = {}
+        errors = {}
+        for key, future in futures.items():
+            error = future.exception()
+            if error is None:
+                results[key] = future.result()
+            else:
+                errors[key] = error
+
+        if not concat:
+            return results, errors
+
+        result_dfs = []
+        for key, result_df in results.items():
+            key_values = key if isinstance(key, tuple) else (key,)
+            result_dfs.append(result_df.assign(**dict(zip(key_columns, key_values))))
+        concat_df = pd.concat(result_dfs) if result_dfs else pd.DataFrame()
+
+        return concat_df, errors
+
+    @_starts_query
+    def get_region_data_many(
+        self,
+        region_codes: Iterable[str],
+        country_code: Optional[str] = None,
+        variable: Optional[str] = None,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        mini_version: Optional[bool] = True,
+        result_format: ResultFormat = "json",
+        concat: bool = False,
+        max_workers: int = 8,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Tuple[Union[dict, pd.DataFrame], dict]:
+        """
+        Return all the data for each of several regions, querying the regions concurrently.
+
+        A failing region does not abort the batch. Its error is returned instead.
+
+        :param region_codes: the codes of the regions
+        :type region_codes: Iterable[str]
+
+        **Default arguments:**
+
+        :param country_code: the code of the country of the regions.
+            If None, the first two letters of each region code are used
+            |br| * the default value is None
+        :type country_code: str
+
+        :param concat: indicates whether the results should be concatenated into one
+            dataframe with a 'region_code' column. Requires `result_format` 'df'
+            |br| * the default value is False
+        :type concat: bool
+
+        :param max_workers: the number of regions queried concurrently
+            |br| * the default value is 8
+        :type max_workers: int
+
+        The remaining arguments are documented in :meth:`get_region_data`.
+
+        :returns: The results by region code, or their concatenation,
+            and the errors by region code
+        :rtype: tuple
+        """
+        calls = {
+            region_code: partial(
+                self.get_region_data,
+                country_code=country_code or region_code[:2].lower(),
+                region_code=region_code,
+                variable=variable,
+                pathway_description=pathway_description,
+                climate_experiment=climate_experiment,
+                mini_version=mini_version,
+                result_format=result_format,
+                cache=cache,
+                retry=retry,
+                page_size=page_size,
+            )
+            for region_code in region_codes
+        }
+
+        return self._fan_out(calls, result_format, concat, ["region_code"], max_workers)
+
+    @_starts_query
+    def get_variable_data_many(
+        self,
+        country_codes: Iterable[str],
+        variables: Iterable[str],
+        spatial_resolution: str,
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        result_format: ResultFormat = "json",
+        concat: bool = False,
+        max_workers: int = 8,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Tuple[Union[dict, pd.DataFrame], dict]:
+        """
+        Return data for each of several variables and countries, querying them concurrently.
+
+        A failing query does not abort the batch. Its error is returned instead.
+
+        :param country_codes: the codes of the countries
+        :type country_codes: Iterable[str]
+
+        :param variables: the required variables
+        :type variables: Iterable[str]
+
+        :param spatial_resolution: the required spatial resolution
+        :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+
+        **Default arguments:**
+
+        :param concat: indicates whether the results should be concatenated into one
+            dataframe with 'country_code' and 'var_name' columns. Requires `result_format` 'df'
+            |br| * the default value is False
+        :type concat: bool
+
+        :param max_workers: the number of queries run concurrently
+            |br| * the default value is 8
+        :type max_workers: int
+
+        The remaining arguments are documented in :meth:`get_variable_data`.
+
+        :returns: The results by (country code, variable), or their concatenation,
+            and the errors by (country code, variable)
+        :rtype: tuple
+        """
+        variables = list(variables)
+        calls = {
+            (country_code, variable): partial(
+                self.get_variable_data,
+                country_code=country_code,
+                spatial_resolution=spatial_resolution,
+                variable=variable,
+                pathway_description=pathway_description,
+                climate_experiment=climate_experiment,
+                result_format=result_format,
+                cache=cache,
+                retry=retry,
+                page_size=page_size,
+            )
+            for country_code in country_codes
+            for variable in variables
+        }
+
+        return self._fan_out(
+            calls, result_format, concat, ["country_code", "var_name"], max_workers
+        )
+
+    def plan_data(
+        self,
+        country_code: str,
+        regions: Optional[Iterable[str]] = None,
+        variables: Optional[Iterable[str]] = None,
+        spatial_resolution: Optional[str] = None,
+        pathways: Optional[Iterable[str]] = None,
+        climate_experiments: Optional[Iterable[str]] = None,
+        strategy: Optional[Strategy] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> QueryPlan:
+        """
+        Plan the queries of a slice of regions and variables, choosing the strategy with the fewest pages.
+
+        The slice is either queried per region, from the region data endpoint, or per
+        variable and spatial resolution, from the variable data endpoint. The first page
+        of one query of each strategy is requested, and the `count` of the probe is
+        extrapolated to all queries of the strategy.
+
+        The arguments are documented in :meth:`get_data`.
+
+        :returns: The plan
+        :rtype: QueryPlan
+        """
+        if regions is not None:
+            region_codes = list(regions)
+        elif spatial_resolution is not None:
+            region_codes = [
+                region["region_code"]
+                for region in self.get_region_metadata(
+                    country_code, spatial_resolution, cache=cache, retry=retry
+                )
+            ]
+        else:
+            raise ValueError("either regions or spatial_resolution should be given")
+
+        if variables is not None:
+            var_names = list(variables)
+        else:
+            var_names = [
+                variable["var_name"]
+                for variable in self.get_variable_metadata(
+                    country_code, cache=cache, retry=retry
+                )
+            ]
+
+        if not region_codes or not var_names:
+            return QueryPlan(strategy or "region", [], 0)
+
+        pathways = None if pathways is None else list(pathways)
+        _check_options("pathways", pathways or [], PATHWAY_OPTIONS)
+
+        climate_experiments = (
+            None if climate_experiments is None else list(climate_experiments)
+        )
+        _check_options(
+            "climate_experiments", climate_experiments or [], CLIMATE_EXPERIMENT_OPTIONS
+        )
+
+        # single filters are applied by the DSP, the others when the records are selected
+        variable = _single(var_names)
+        pathway_description = _single(pathways)
+        climate_experiment = _single(climate_experiments)
+
+        region_queries = [
+            {"region_code": region_code, "variable": variable}
+            for region_code in region_codes
+        ]
+        variable_queries = [
+            {"spatial_resolution": resolution, "variable": var_name}
+            for var_name in var_names
+            for resolution in dict.fromkeys(map(resolution_of, region_codes))
+        ]
+
+        if strategy is not None:
+            queries = region_queries if strategy == "region" else variable_queries
+            return QueryPlan(strategy, queries)
+
+        probe_urls = [
+            self._region_data_url(
+                country_code,
+                region_codes[0],
+                variable,
+                pathway_description,
+                climate_experiment,
+                True,
+            ),
+            self._variable_data_url(
+                country_code,
+                variable_queries[0]["spatial_resolution"],
+                var_names[0],
+                pathway_description,
+                climate_experiment,
+            ),
+        ]
+        region_pages, variable_pages = [
+            n_queries
+            * estimate_pages(
+                self._get_page(
+                    _apply_page_size(probe_url, page_size)[0],
+                    cache,
+                    self._start_retry(retry),
+                )
+            )
+            for n_queries, probe_url in zip(
+                (len(region_queries), len(variable_queries)), probe_urls
+            )
+        ]
+
+        if region_pages <= variable_pages:
+            return QueryPlan("region", region_queries, region_pages, variable_pages)
+
+        return QueryPlan("variable", variable_queries, variable_pages, region_pages)
+
+    @_starts_query
+    def get_data(
+        self,
+        country_code: str,
+        regions: Optional[Iterable[str]] = None,
+        variables: Optional[Iterable[str]] = None,
+        spatial_resolution: Optional[str] = None,
+        years: Optional[Iterable[int]] = None,
+        pathways: Optional[Iterable[str]] = None,
+        climate_experiments: Optional[Iterable[str]] = None,
+        result_format: ResultFormat = "json",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "data",
+        save_format: Optional[SaveFormat] = None,
+        strategy: Optional[Strategy] = None,
+        max_workers: int = 8,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+    ) -> Any:
+        """
+        Return the data of a slice of regions and variables, querying it with the cheapest plan.
+
+        The queries of the plan chosen by :meth:`plan_data` run concurrently. The result
+        has the same columns whichever strategy is chosen: 'region_code', 'var_name',
+        'year', 'pathway', 'climate_experiment' and 'value'.
+
+        :param country_code: the code of the country. NOTE: must be in lower case
+        :type country_code: str
+
+        **Default arguments:**
+
+        :param regions: the codes of the regions of the slice, at any spatial resolutions
+            |br| * the default value is None. If None, all regions at `spatial_resolution` are used.
+        :type regions: Iterable[str]
+
+        :param variables: the variables of the slice
+            |br| * the default value is None. If None, all variables are used.
+        :type variables: Iterable[str]
+
+        :param spatial_resolution: the spatial resolution of the regions, if `regions` is None
+            |br| * the default value is None
+        :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+
+        :param years: the years of the slice
+            |br| * the default value is None. If None, all years are returned.
+        :type years: Iterable[int]
+
+        :param pathways: the EUCalc pathways of the slice. Like the DSP, the filter only
+            applies to data with a pathway
+            |br| * the default value is None. If None, all pathways are returned.
+        :type pathways: Iterable[str]
+
+        :param climate_experiments: the climate experiments of the slice. Like the DSP,
+            the filter only applies to data with a climate experiment
+            |br| * the default value is None. If None, all climate experiments are returned.
+        :type climate_experiments: Iterable[str]
+
+        :param result_format: the format of the resulting data. 'xarray' returns a dense
+            cube with a dimension per field among 'region_code', 'var_name', 'year',
+            'climate_experiment' and 'pathway', and NaN for combinations without a value.
+            Requires `xarray`
+            |br| * the default value is 'json'
+        :type result_format: str, one of {'json', 'df', 'arrow', 'xarray'}
+
+        :param save_result: indicates whether the result should be saved.
+            The result is saved in `save_format`
+            |br| * the default value is False
+        :type save_result: bool
+
+        :param save_path: the folder path in which to save the result.
+            If None, the result is save in the same folder as this file- `client.py`
+            |br| * the default value is None
+        :type save_path: str
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'data'
+        :type save_path: str
+
+        :param save_format: the file format in which the result is saved.
+            If None, a 'json' result is saved as .json, a 'df' or 'xarray' result
+            as .csv and an 'arrow' result as .parquet
+            |br| * the default value is None
+        :type save_format: str, one of {'json', 'csv', 'parquet'}
+
+        :param strategy: 'region' to query the data of each region, 'variable' to query
+            the data of each variable at each spatial resolution of the regions
+            |br| * the default value is None. If None, the strategy with the fewest pages is chosen.
+        :type strategy: str, one of {'region', 'variable'}
+
+        :param max_workers: the number of queries run concurrently
+            |br| * the default value is 8
+        :type max_workers: int
+
+        The remaining arguments are documented in :meth:`get_variable_data`.
+
+        :returns: The result
+        :rtype: list/pd.DataFrame/pyarrow.Table/xarray.DataArray
+        """
+        # in the order given, so that the order of the result is deterministic
+        region_codes = None if regions is None else list(dict.fromkeys(regions))
+        var_names = None if variables is None else list(variables)
+        pathways = None if pathways is None else list(pathways)
+        climate_experiments = (
+            None if climate_experiments is None else list(climate_experiments)
+        )
+
+        plan = self.plan_data(
+            country_code,
+            region_codes,
+            var_names,
+            spatial_resolution,
+            pathways,
+            climate_experiments,
+            strategy,
+            cache,
+            retry,
+            page_size,
+        )
+
+        query_options: Dict[str, Any] = dict(
+            country_code=country_code,
+            pathway_description=_single(pathways),
+            climate_experiment=_single(climate_experiments),
+            cache=cache,
+            retry=retry,
+            page_size=page_size,
+        )
+        getter = (
+            self.get_region_data
+            if plan.strategy == "region"
+            else self.get_variable_data
+        )
+        calls = {
+            index: partial(getter, **query, **query_options)
+            for index, query in enumerate(plan.queries)
+        }
+        results, errors = self._fan_out(calls, "json", False, [], max_workers)
+        if errors:
+            raise next(iter(errors.values()))
+
+        region_set = None if region_codes is None else set(region_codes)
+        records = []
+        for index, query in enumerate(plan.queries):
+            records.extend(
+                select_records(
+                    results[index],
+                    {
+                        "region_code": query.get("region_code"),
+                        "var_name": query["variable"],
+                    },
+                    region_set,
+                    var_names,
+                    None if years is None else set(years),
+                    pathways,
+                    climate_experiments,
+                )
+            )
+
+        result_collection = _from_records(records, result_format)
+
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
+
+        return result_collection
+
+    def aggregate_variable_data(
+        self,
+        country_code: str,
+        variable: str,
+        spatial_resolutions: Sequence[str] = ("NUTS3", "NUTS2", "NUTS0"),
+        pathway_description: Optional[str] = None,
+        climate_experiment: Optional[str] = None,
+        rules: Optional[Mapping[str, AggregationRule]] = None,
+        check: bool = False,
+        rtol: float = 1e-6,
+        result_format: ResultFormat = "df",
+        save_result: Optional[bool] = False,
+        save_path: Optional[str] = None,
+        save_name: Optional[str] = "aggregated_data",
+        save_format: Optional[SaveFormat] = None,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+    ) -> Any:
+        """
+        Return the data of a variable at coarser spatial resolutions, aggregated locally from its LAU data.
+
+        Only the LAU data is queried, instead of the data at each spatial resolution.
+        The values of the LAU regions within each parent region are combined by the
+        aggregation rule of the variable, which follows its `var_aggregation_method`
+        ('SUM' or 'AVG') unless it is set in `rules`.
+
+        :param country_code: the code of the country. NOTE: must be in lower case
+        :type country_code: str
+
+        :param variable: the variable to aggregate
+        :type variable: str
+
+        **Default arguments:**
+
+        :param spatial_resolutions: the spatial resolutions to aggregate to
+            |br| * the default value is ('NUTS3', 'NUTS2', 'NUTS0')
+        :type spatial_resolutions: Sequence[str]
+
+        :param rules: aggregation rules by variable name, overriding the rules of
+            `zoomin_client.aggregation.AGGREGATION_RULES`. E.g.
+            {'cproj_annual_mean_temperature': AggregationRule('weighted_mean', 'population')}.
+            The weight of a region is the latest value of the weight variable
+            |br| * the default value is None
+        :type rules: Mapping[str, AggregationRule]
+
+        :param check: indicates whether the aggregated values are compared against the
+            values of the DSP at the same spatial resolutions. If True, the result has
+            'dsp_value' and 'matches' columns
+            |br| * the default value is False
+        :type check: bool
+
+        :param rtol: the relative tolerance within which aggregated values match the
+            values of the DSP
+            |br| * the default value is 1e-6
+        :type rtol: float
+
+        :param result_format: the format of the resulting data
+            |br| * the default value is 'df'
+        :type result_format: str, one of {'json', 'df', 'arrow', 'xarray'}
+
+        :param save_name: the file name of the result
+            |br| * the default value is 'aggregated_data'
+        :type save_path: str
+
+        The remaining arguments are documented in :meth:`get_variable_data`.
+
+        :returns: The aggregated data, with a 'resolution' column
+        :rtype: list/pd.DataFrame/pyarrow.Table/xarray.DataArray
+        """
+        variable_metadata = self.get_variable_metadata(
+            country_code, variable, cache=cache, retry=retry, source=source
+        )
+        if not variable_metadata:
+            raise ValueError(f"{variable} is not a variable of {country_code}")
+        rule = rule_for(variable_metadata[0], rules)
+
+        query: Dict[str, Any] = dict(
+            country_code=country_code,
+            spatial_resolution="LAU",
+            pathway_description=pathway_description,
+            climate_experiment=climate_experiment,
+            result_format="df",
+            cache=cache,
+            retry=retry,
+            page_size=page_size,
+        )
+        lau_df: pd.DataFrame = self.get_variable_data(
+            variable=variable, **query, source=source
+        )
+        if lau_df.empty:
+            raise ValueError(f"{variable} has no LAU data in {country_code}")
+
+        weights = None
+        if rule.weight_variable is not None:
+            weight_df: pd.DataFrame = self.get_variable_data(
+                variable=rule.weight_variable, **query, source=source
+            )
+            weights = (
+                weight_df.sort_values("year").groupby("region_code")["value"].last()
+            )
+
+        aggregated_dfs = []
+        for spatial_resolution in spatial_resolutions:
+            aggregated_df = aggregate(lau_df, spatial_resolution, rule, weights)
+
+            if check:
+                dsp_df = self.get_variable_data(
+                    variable=variable,
+                    **{**query, "spatial_resolution": spatial_resolution},
+                )
+                key_columns = [
+                    column for column in KEY_COLUMNS if column in aggregated_df.columns
+                ]
+                aggregated_df = compare(
+                    aggregated_df, dsp_df, ["region_code", *key_columns], rtol
+                )
+
+            aggregated_dfs.append(aggregated_df.assign(resolution=spatial_resolution))
+
+        result_collection: Any = pd.concat(aggregated_dfs, ignore_index=True)
+        if result_format != "df":
+            result_collection = _from_records(
+                _to_records(result_collection), result_format
+            )
+
+        # save
+        if save_result:
+            self._save(
+                result_collection, result_format, save_path, save_name, save_format
+            )
+
+        return result_collection
+
+    def get_region_index(
+        self,
+        country_code: str,
+        index_dir: Optional[str] = None,
+        refresh: bool = False,
+        max_workers: int = 5,
+        cache: CacheMode = "off",
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        source: Source = "dsp",
+    ) -> RegionIndex:
+        """
+        Return the index of the region tree of a country, from NUTS0 down to LAU.
+
+        The region metadata of all spatial resolutions is queried concurrently, and the
+        index is saved to a file per DSP version and country. Later calls load the file
+        instead of querying the region metadata.
+
+        :param country_code: the code of the country. NOTE: must be in lower case
+        :type country_code: str
+
+        **Default arguments:**
+
+        :param index_dir: the folder of the index files
+            |br| * the default value is '~/.cache/zoomin_client/regions',
+            or the `ZOOMIN_INDEX_DIR` environment variable if set
+        :type index_dir: str
+
+        :param refresh: indicates whether the index is built again, even if its file exists
+            |br| * the default value is False
+        :type refresh: bool
+
+        :param max_workers: the number of spatial resolutions queried concurrently
+            |br| * the default value is 5
+        :type max_workers: int
+
+        The remaining arguments are documented in :meth:`get_region_metadata`.
+
+        :returns: The index
+        :rtype: RegionIndex
+        """
+        path = index_path(self.version, country_code, index_dir or DEFAULT_INDEX_DIR)
+        if not refresh and os.path.exists(path):
+            return RegionIndex.load(path)
+
+        calls = {
+            spatial_resolution: partial(
+                self.get_region_metadata,
+                country_code=country_code,
+                spatial_resolution=spatial_resolution,
+                cache=cache,
+                retry=retry,
+                page_size=page_size,
+                source=source,
+            )
+            for spatial_resolution in SPATIAL_RESOLUTIONS
+        }
+        results, errors = self._fan_out(calls, "json", False, [], max_workers)
+        if errors:
+            raise next(iter(errors.values()))
+
+        region_index = RegionIndex.from_metadata(
+            record
+            for spatial_resolution in SPATIAL_RESOLUTIONS
+            for record in results[spatial_resolution]
+        )
+        region_index.save(path)
+
+        return region_index
+
+    def sync_country(
+        self,
+        country_code: str,
+        store_path: Optional[str] = None,
+        max_workers: int = 8,
+        retry: Optional[RetryPolicy] = None,
+        page_size: PageSize = None,
+        incremental: bool = True,
+    ) -> List[str]:
+        """
+        Mirror the region metadata, variable metadata, proxy details and all variable data of a country into the local replica.
+
+        The variable data of every variable is queried at every spatial resolution the
+        country has regions at. The data synced before is replaced once all queries
+        succeeded, and is kept if one fails. Afterwards, the getters called with
+        `source` 'local' answer queries on the country from the replica.
+
+        If the country was synced before, from the same DSP version, the variable
+        metadata serves as the index of changes: only variables whose `data_last_update`
+        differs from the last sync, or that are new, are queried again. Variables that
+        are no longer listed are removed. The metadata is always replaced.
+
+        :param country_code: the code of the country
+        :type country_code: str
+
+        **Default arguments:**
+
+        :param store_path: the path of the SQLite file of the replica. If set, it
+            becomes the replica of the client.
+            If None, the replica of the client is used
+            |br| * the default value is None
+        :type store_path: str
+
+        :param max_workers: the number of queries run concurrently
+            |br| * the default value is 8
+        :type max_workers: int
+
+        :param incremental: indicates whether only changed variables are queried, if the
+            country was synced before. If False, all data of the country is queried
+            |br| * the default value is True
+        :type incremental: bool
+
+        The remaining arguments are documented in :meth:`get_variable_data`.
+
+        :returns: The names of the variables whose data was queried
+        :rtype: List[str]
+        """
+        if store_path is not None:
+            self.replica = LocalReplica(store_path)
+        replica = self._get_replica()
+
+        data_last_updates = None
+        if incremental and replica.synced_version(country_code) == self.version:
+            data_last_updates = replica.data_last_updates(country_code)
+
+        def collect(request_url: str) -> Any:
+            return self._collect(
+                request_url, "json", retry=self._start_retry(retry), page_size=page_size
+            )
+
+        def fetch_proxy_details(variable: str) -> list:
+            page = self._get_page(
+                self._proxy_details_url(country_code, variable),
+                retry=self._start_retry(retry),
+            )
+            results: list = page["results"]
+            return results
+
+        with self._shared_breaker(), ThreadPoolExecutor(max_workers) as executor:
+            region_futures = {
+                spatial_resolution: executor.submit(
+                    copy_context().run,
+                    collect,
+                    self._region_metadata_url(country_code, spatial_resolution, None),
+                )
+                for spatial_resolution in SPATIAL_RESOLUTIONS
+            }
+            variable_metadata = collect(self._variable_metadata_url(country_code, None))
+
+            changed_variables = None
+            if data_last_updates is not None:
+                # variables without a data_last_update cannot be compared
+                changed_variables = [
+                    record["var_name"]
+                    for record in variable_metadata
+                    if record.get("data_last_update") is None
+                    or record["var_name"] not in data_last_updates
+                    or data_last_updates[record["var_name"]]
+                    != record["data_last_update"]
+                ]
+
+            variables = changed_variables
+            if variables is None:
+                variables = [record["var_name"] for record in variable_metadata]
+
+            proxy_futures = {
+                variable: executor.submit(
+                    copy_context().run, fetch_proxy_details, variable
+                )
+                for variable in variables
+            }
+
+            regions = {
+                spatial_resolution: future.result()
+                for spatial_resolution, future in region_futures.items()
+            }
+            proxy_details = {
+                variable: future.result() for variable, future in proxy_futures.items()
+            }
+
+            data_futures = [
+                (
+                    variable,
+                    spatial_resolution,
+                    executor.submit(
+                        copy_context().run,
+                        collect,
+                        self._variable_data_url(
+                            country_code, spatial_resolution, variable, None, None
+                        ),
+                    ),
+                )
+                for variable in variables
+                for spatial_resolution in SPATIAL_RESOLUTIONS
+                if regions[spatial_resolution]
+            ]
+
+            # written in query order while the remaining queries run
+            try:
+                replica.replace_country(
+                    self.version,
+                    country_code,
+                    [record for records in regions.values() for record in records],
+                    variable_metadata,
+                    proxy_details,
+                    (
+                        (variable, spatial_resolution, future.result())
+                        for variable, spatial_resolution, future in data_futures
+                    ),
+                    changed_variables,
+                )
+            except BaseException:
+                for _, _, future in data_futures:
+                    future.cancel()
+                raise
+
+        return variables
+
+
+_shared_clients: Dict[str, DSPClient] = {}
+_shared_clients_lock = threading.Lock()
+
+
+def get_client(version: str) -> DSPClient:
+    """
+    Return the shared client used by the module-level functions for a DSP version.
+
+    The client is created on first use, so that consecutive calls of the module-level
+    functions reuse its pooled connections and memoized metadata.
+
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
+
+    :returns: The shared client
+    :rtype: DSPClient
+    """
+    with _shared_clients_lock:
+        if version not in _shared_clients:
+            _shared_clients[version] = DSPClient(
+                version, fixtures=FixtureArchive.from_env()
+            )
+
+        return _shared_clients[version]
+
+
+def clear_cache() -> None:
+    """Remove all memoized metadata results of the shared clients."""
+    with _shared_clients_lock:
+        for dsp_client in _shared_clients.values():
+            dsp_client.clear_cache()
+
+
+def sync_country(
     version: str,
     country_code: str,
-    variable: Optional[str] = None,
-    save_result: Optional[bool] = False,
-    save_path: Optional[str] = None,
-    save_name: Optional[str] = "variable_metadata",
-    result_format: Literal["json", "df"] = "json",
-) -> Any:
+    store_path: Optional[str] = None,
+    max_workers: int = 8,
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    incremental: bool = True,
+) -> List[str]:
     """
-    Return data for a specified variable at a specified resolution, for a specified country.
+    Mirror the region metadata, variable metadata, proxy details and all variable data of a country into a local replica.
+
+    The module-level getters of the same `version` called with `source` 'local' then
+    answer queries on the country from the replica.
 
     :param version: the version of the DSP to query. E.g. v1, v2, etc.
     :type version: str
 
-    :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
-    :type country_code: str
+    The remaining arguments are documented in :meth:`DSPClient.sync_country`.
 
-    **Default arguments:**
+    :returns: The names of the variables whose data was queried
+    :rtype: List[str]
+    """
+    return get_client(version).sync_country(
+        country_code=country_code,
+        store_path=store_path,
+        max_workers=max_workers,
+        retry=retry,
+        page_size=page_size,
+        incremental=incremental,
+    )
 
-    :param variable: the variable to filter on.
-        |br| * the default value is None
-    :type variable: str
 
-    :param save_result: indicates whether the result should be saved.
-        The result is saved as .json
-        |br| * the default value is False
-    :type save_result: bool
+@measure_time
+def get_region_metadata(
+    version: str,
+    country_code: str,
+    spatial_resolution: str,
+    region_code: Optional[str] = None,
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = None,
+    save_name: Optional[str] = "region_metadata",
+    save_format: Optional[SaveFormat] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+) -> Union[list, dict]:
+    """
+    Return list of regions of a specified country, at a specified spatial resolution.
 
-    :param save_path: the folder path in which to save the result.
-        If None, the result is save in the same folder as this file- `client.py`
-        |br| * the default value is None
-    :type save_path: str
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-    :param save_name: the file name of the result
-        |br| * the default value is 'variable_metadata'
-    :type save_path: str
+    The remaining arguments are documented in :meth:`DSPClient.get_region_metadata`.
 
     :returns: The result
-    :rtype: Any
+    :rtype: list/dict
     """
-    # request
-    next_request_url = (
-        "http://data.localised-project.eu/dsp/"
-        + version
-        + "/"
-        + country_code.lower()
-        + "/"
-        "variable_metadata/"
+    return get_client(version).get_region_metadata(
+        country_code=country_code,
+        spatial_resolution=spatial_resolution,
+        region_code=region_code,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        save_format=save_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
     )
 
-    # optional filter - variable
-    if variable is not None:
-        next_request_url = f"{next_request_url}?variable={variable}"
 
-    result_collection = []
-    while next_request_url is not None:
-        print(next_request_url)
-        response = requests.get(next_request_url, stream=True, timeout=240)
+@measure_time
+def get_region_data(
+    version: str,
+    country_code: str,
+    region_code: str,
+    variable: Optional[FilterValues] = None,
+    pathway_description: Optional[FilterValues] = None,
+    climate_experiment: Optional[FilterValues] = None,
+    mini_version: Optional[bool] = True,
+    result_format: ResultFormat = "json",
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = None,
+    save_name: Optional[str] = "region_data",
+    save_format: Optional[SaveFormat] = None,
+    checkpoint_dir: Optional[str] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+    max_workers: int = 8,
+) -> Union[list, pd.DataFrame]:
+    """
+    Return all the data for a specified region of a specified country, at a specified spatial resolution.
 
-        response.raise_for_status()
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-        response = response.json()
+    The remaining arguments are documented in :meth:`DSPClient.get_region_data`.
 
-        next_request_url = response["next"]
-        response_data = response["results"]
+    :returns: The result
+    :rtype: list/pd.DataFrame/pyarrow.Table
+    """
+    return get_client(version).get_region_data(
+        country_code=country_code,
+        region_code=region_code,
+        variable=variable,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        mini_version=mini_version,
+        result_format=result_format,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        save_format=save_format,
+        checkpoint_dir=checkpoint_dir,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
+        max_workers=max_workers,
+    )
 
-        if result_format == "json":
-            result_collection.extend(response_data)
-        elif result_format == "df":
-            result_collection.append(pd.json_normalize(response_data))
 
-    if result_format == "df":
-        result_collection = pd.concat(result_collection)
+@measure_time
+def get_variable_metadata(
+    version: str,
+    country_code: str,
+    variable: Optional[str] = None,
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = None,
+    save_name: Optional[str] = "variable_metadata",
+    result_format: ResultFormat = "json",
+    save_format: Optional[SaveFormat] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+) -> Any:
+    """
+    Return the metadata of all variables, or of a specified variable, for a specified country.
 
-    # save
-    if save_result:
-        if save_path is None:
-            save_path = os.path.dirname(__file__)
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-        if result_format == "json":
-            save_json(
-                data=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.json",
-            )
-        else:
-            save_df(
-                data_df=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.csv",
-            )
+    The remaining arguments are documented in :meth:`DSPClient.get_variable_metadata`.
 
-    return result_collection
+    :returns: The result
+    :rtype: Any
+    """
+    return get_client(version).get_variable_metadata(
+        country_code=country_code,
+        variable=variable,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        result_format=result_format,
+        save_format=save_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
+    )
 
 
+@measure_time
 def get_proxy_details(
     version: str,
     country_code: str,
@@ -376,208 +3321,413 @@ def get_proxy_details(
     save_result: Optional[bool] = False,
     save_path: Optional[str] = None,
     save_name: Optional[str] = "proxy_details",
-    result_format: Literal["json", "df"] = "json",
+    result_format: ResultFormat = "json",
+    save_format: Optional[SaveFormat] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    source: Source = "dsp",
 ) -> Any:
     """
     Return proxy details for a specified variable, for a specified country.
 
-    Since there is a possibility to have different proxies for different years (present and future data), information for each year is returned.
-
     :param version: the version of the DSP to query. E.g. v1, v2, etc.
     :type version: str
 
-    :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
-    :type country_code: str
+    The remaining arguments are documented in :meth:`DSPClient.get_proxy_details`.
 
-    :param variable: the variable to filter on.
-    :type variable: str
+    :returns: The result
+    :rtype: Any
+    """
+    return get_client(version).get_proxy_details(
+        country_code=country_code,
+        variable=variable,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        result_format=result_format,
+        save_format=save_format,
+        cache=cache,
+        retry=retry,
+        source=source,
+    )
 
-    **Default arguments:**
 
-    :param save_result: indicates whether the result should be saved.
-        The result is saved as .json
-        |br| * the default value is False
-    :type save_result: bool
+@measure_time
+def get_variable_data(
+    version: str,
+    country_code: str,
+    spatial_resolution: str,
+    variable: FilterValues,
+    pathway_description: Optional[FilterValues] = None,
+    climate_experiment: Optional[FilterValues] = None,
+    result_format: ResultFormat = "json",
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = os.path.dirname(__file__),
+    save_name: Optional[str] = "variable_data",
+    save_format: Optional[SaveFormat] = None,
+    partition_cols: Optional[Sequence[str]] = None,
+    checkpoint_dir: Optional[str] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+    max_workers: int = 8,
+) -> Union[list, pd.DataFrame]:
+    """
+    Return data for a specified variable at a specified resolution, for a specified country.
 
-    :param save_path: the folder path in which to save the result.
-        If None, the result is save in the same folder as this file- `client.py`
-        |br| * the default value is None
-    :type save_path: str
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-    :param save_name: the file name of the result
-        |br| * the default value is 'variable_metadata'
-    :type save_path: str
+    The remaining arguments are documented in :meth:`DSPClient.get_variable_data`.
 
     :returns: The result
-    :rtype: Any
+    :rtype: list/pd.DataFrame/pyarrow.Table
     """
-    # request
-    request_url = (
-        "http://data.localised-project.eu/dsp/"
-        + version
-        + "/"
-        + country_code.lower()
-        + "/"
-        "proxy_details/?"
-        "variable=" + variable
+    return get_client(version).get_variable_data(
+        country_code=country_code,
+        spatial_resolution=spatial_resolution,
+        variable=variable,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        result_format=result_format,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        save_format=save_format,
+        partition_cols=partition_cols,
+        checkpoint_dir=checkpoint_dir,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
+        max_workers=max_workers,
     )
 
-    response = requests.get(request_url, stream=True, timeout=240)
 
-    response.raise_for_status()
+def iter_region_metadata(
+    version: str,
+    country_code: str,
+    spatial_resolution: str,
+    region_code: Optional[str] = None,
+    result_format: ResultFormat = "json",
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Iterator[Union[dict, pd.DataFrame]]:
+    """
+    Yield the regions of a specified country, at a specified spatial resolution, as each page arrives.
 
-    response = response.json()
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-    response_data = response["results"]
+    The remaining arguments are documented in :meth:`DSPClient.iter_region_metadata`.
 
-    if result_format == "df":
-        response_data = pd.json_normalize(response_data)
+    :returns: The records, dataframes or tables
+    :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+    """
+    return get_client(version).iter_region_metadata(
+        country_code=country_code,
+        spatial_resolution=spatial_resolution,
+        region_code=region_code,
+        result_format=result_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+    )
 
-    # save
-    if save_result:
-        if save_path is None:
-            save_path = os.path.dirname(__file__)
 
-        if result_format == "json":
-            save_json(
-                data=response_data,
-                save_path=save_path,
-                save_name=f"{save_name}.json",
-            )
-        else:
-            save_df(
-                data_df=response_data,
-                save_path=save_path,
-                save_name=f"{save_name}.csv",
-            )
+def iter_region_data(
+    version: str,
+    country_code: str,
+    region_code: str,
+    variable: Optional[str] = None,
+    pathway_description: Optional[str] = None,
+    climate_experiment: Optional[str] = None,
+    mini_version: Optional[bool] = True,
+    result_format: ResultFormat = "json",
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Iterator[Union[dict, pd.DataFrame]]:
+    """
+    Yield all the data for a specified region of a specified country as each page arrives.
 
-    return response_data
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
+    The remaining arguments are documented in :meth:`DSPClient.iter_region_data`.
 
-@measure_time
-def get_variable_data(
+    :returns: The records, dataframes or tables
+    :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+    """
+    return get_client(version).iter_region_data(
+        country_code=country_code,
+        region_code=region_code,
+        variable=variable,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        mini_version=mini_version,
+        result_format=result_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+    )
+
+
+def iter_variable_data(
     version: str,
     country_code: str,
     spatial_resolution: str,
     variable: str,
     pathway_description: Optional[str] = None,
     climate_experiment: Optional[str] = None,
-    result_format: Literal["json", "df"] = "json",
-    save_result: Optional[bool] = False,
-    save_path: Optional[str] = os.path.dirname(__file__),
-    save_name: Optional[str] = "variable_data",
-) -> Union[list, pd.DataFrame]:
+    result_format: ResultFormat = "json",
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Iterator[Union[dict, pd.DataFrame]]:
     """
-    Return data for a specified variable at LAU level.
+    Yield data for a specified variable at a specified resolution as each page arrives.
 
     :param version: the version of the DSP to query. E.g. v1, v2, etc.
     :type version: str
 
-    :param country_code: the code of the country for which data should be returned. NOTE: must be in lower case
-    :type country_code: str
+    The remaining arguments are documented in :meth:`DSPClient.iter_variable_data`.
 
-    :param spatial_resolution: the required spatial resolution
-    :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+    :returns: The records, dataframes or tables
+    :rtype: Iterator[dict/pd.DataFrame/pyarrow.Table]
+    """
+    return get_client(version).iter_variable_data(
+        country_code=country_code,
+        spatial_resolution=spatial_resolution,
+        variable=variable,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        result_format=result_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+    )
 
-    :param variable: the required variable
-    :type variable: str
 
-    **Default arguments:**
+def get_region_data_many(
+    version: str,
+    region_codes: Iterable[str],
+    country_code: Optional[str] = None,
+    variable: Optional[str] = None,
+    pathway_description: Optional[str] = None,
+    climate_experiment: Optional[str] = None,
+    mini_version: Optional[bool] = True,
+    result_format: ResultFormat = "json",
+    concat: bool = False,
+    max_workers: int = 8,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Tuple[Union[dict, pd.DataFrame], dict]:
+    """
+    Return all the data for each of several regions, querying the regions concurrently.
 
-    :param pathway_description: the EUCalc pathway on which to filter data. Options: "national" or "with_behavioural_changes".
-        |br| * the default value is None
-    :type pathway_description: str
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-    :param climate_experiment: the climate experiment on which to filter data. For example: "RCP2.6"
-        |br| * the default value is None
-    :type climate_experiment: str
+    The remaining arguments are documented in :meth:`DSPClient.get_region_data_many`.
 
-    :param result_format: the format of the resulting data
-        |br| * the default value is 'json'
-    :type result_format: str, one of {'json', 'df'}
+    :returns: The results by region code, or their concatenation,
+        and the errors by region code
+    :rtype: tuple
+    """
+    return get_client(version).get_region_data_many(
+        region_codes=region_codes,
+        country_code=country_code,
+        variable=variable,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        mini_version=mini_version,
+        result_format=result_format,
+        concat=concat,
+        max_workers=max_workers,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+    )
 
-    :param save_result: indicates whether the result should be saved.
-        The result is saved as .json if `result_format` is 'json'
-        and as .csv if `result_format` is 'df'
-        |br| * the default value is False
-    :type save_result: bool
 
-    :param save_path: the folder path in which to save the result.
-        If None, the result is save in the same folder as this file- `client.py`
-        |br| * the default value is None
-    :type save_path: str
+def get_variable_data_many(
+    version: str,
+    country_codes: Iterable[str],
+    variables: Iterable[str],
+    spatial_resolution: str,
+    pathway_description: Optional[str] = None,
+    climate_experiment: Optional[str] = None,
+    result_format: ResultFormat = "json",
+    concat: bool = False,
+    max_workers: int = 8,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Tuple[Union[dict, pd.DataFrame], dict]:
+    """
+    Return data for each of several variables and countries, querying them concurrently.
 
-    :param save_name: the file name of the result
-        |br| * the default value is 'variable_data'
-    :type save_path: str
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-    :returns: The result
-    :rtype: list/pd.DataFrame
-    """
-    # default URL
-    next_request_url = (
-        "http://data.localised-project.eu/dsp/"
-        + version
-        + "/"
-        + country_code.lower()
-        + "/"
-        "variable_data/?"
-        "resolution=" + spatial_resolution + "&"
-        "variable=" + variable
+    The remaining arguments are documented in :meth:`DSPClient.get_variable_data_many`.
+
+    :returns: The results by (country code, variable), or their concatenation,
+        and the errors by (country code, variable)
+    :rtype: tuple
+    """
+    return get_client(version).get_variable_data_many(
+        country_codes=country_codes,
+        variables=variables,
+        spatial_resolution=spatial_resolution,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        result_format=result_format,
+        concat=concat,
+        max_workers=max_workers,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
     )
 
-    # optional filters
-    ## pathway
-    if pathway_description is not None:
-        if pathway_description not in ["national", "with_behavioural_changes"]:
-            raise ValueError(
-                "pathway_description should be one of national, with_behavioural_changes"
-            )
 
-        next_request_url = f"{next_request_url}&pathway={pathway_description}"
+def get_data(
+    version: str,
+    country_code: str,
+    regions: Optional[Iterable[str]] = None,
+    variables: Optional[Iterable[str]] = None,
+    spatial_resolution: Optional[str] = None,
+    years: Optional[Iterable[int]] = None,
+    pathways: Optional[Iterable[str]] = None,
+    climate_experiments: Optional[Iterable[str]] = None,
+    result_format: ResultFormat = "json",
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = os.path.dirname(__file__),
+    save_name: Optional[str] = "data",
+    save_format: Optional[SaveFormat] = None,
+    strategy: Optional[Strategy] = None,
+    max_workers: int = 8,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+) -> Any:
+    """
+    Return the data of a slice of regions and variables, querying it with the cheapest plan.
 
-    ## climate experiment
-    if climate_experiment is not None:
-        if climate_experiment not in ["RCP2.6", "RCP4.5", "RCP8.5", "Historical"]:
-            raise ValueError(
-                "climate_experiment should be one of RCP2.6, RCP4.5, RCP8.5, Historical"
-            )
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-        next_request_url = f"{next_request_url}&climate_experiment={climate_experiment}"
+    The remaining arguments are documented in :meth:`DSPClient.get_data`.
 
-    result_collection = []
-    while next_request_url is not None:
-        print(next_request_url)
-        response = requests.get(next_request_url, stream=True, timeout=240)
+    :returns: The result
+    :rtype: list/pd.DataFrame/pyarrow.Table
+    """
+    return get_client(version).get_data(
+        country_code=country_code,
+        regions=regions,
+        variables=variables,
+        spatial_resolution=spatial_resolution,
+        years=years,
+        pathways=pathways,
+        climate_experiments=climate_experiments,
+        result_format=result_format,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        save_format=save_format,
+        strategy=strategy,
+        max_workers=max_workers,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+    )
 
-        response.raise_for_status()
 
-        response = response.json()
+def aggregate_variable_data(
+    version: str,
+    country_code: str,
+    variable: str,
+    spatial_resolutions: Sequence[str] = ("NUTS3", "NUTS2", "NUTS0"),
+    pathway_description: Optional[str] = None,
+    climate_experiment: Optional[str] = None,
+    rules: Optional[Mapping[str, AggregationRule]] = None,
+    check: bool = False,
+    rtol: float = 1e-6,
+    result_format: ResultFormat = "df",
+    save_result: Optional[bool] = False,
+    save_path: Optional[str] = os.path.dirname(__file__),
+    save_name: Optional[str] = "aggregated_data",
+    save_format: Optional[SaveFormat] = None,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+) -> Any:
+    """
+    Return the data of a variable at coarser spatial resolutions, aggregated locally from its LAU data.
 
-        next_request_url = response["next"]
-        response_data = response["results"]
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
 
-        if result_format == "json":
-            result_collection.extend(response_data)
-        elif result_format == "df":
-            result_collection.append(pd.json_normalize(response_data))
+    The remaining arguments are documented in :meth:`DSPClient.aggregate_variable_data`.
 
-    if result_format == "df":
-        result_collection = pd.concat(result_collection)
+    :returns: The aggregated data, with a 'resolution' column
+    :rtype: list/pd.DataFrame/pyarrow.Table/xarray.DataArray
+    """
+    return get_client(version).aggregate_variable_data(
+        country_code=country_code,
+        variable=variable,
+        spatial_resolutions=spatial_resolutions,
+        pathway_description=pathway_description,
+        climate_experiment=climate_experiment,
+        rules=rules,
+        check=check,
+        rtol=rtol,
+        result_format=result_format,
+        save_result=save_result,
+        save_path=save_path,
+        save_name=save_name,
+        save_format=save_format,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
+    )
 
-    # save
-    if save_result:
-        if result_format == "json":
-            save_json(
-                data=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.json",
-            )
-        else:
-            save_df(
-                data_df=result_collection,
-                save_path=save_path,
-                save_name=f"{save_name}.csv",
-            )
 
-    return result_collection
+def get_region_index(
+    version: str,
+    country_code: str,
+    index_dir: Optional[str] = None,
+    refresh: bool = False,
+    max_workers: int = 5,
+    cache: CacheMode = "off",
+    retry: Optional[RetryPolicy] = None,
+    page_size: PageSize = None,
+    source: Source = "dsp",
+) -> RegionIndex:
+    """
+    Return the index of the region tree of a country, from NUTS0 down to LAU.
+
+    :param version: the version of the DSP to query. E.g. v1, v2, etc.
+    :type version: str
+
+    The remaining arguments are documented in :meth:`DSPClient.get_region_index`.
+
+    :returns: The index
+    :rtype: RegionIndex
+    """
+    return get_client(version).get_region_index(
+        country_code=country_code,
+        index_dir=index_dir,
+        refresh=refresh,
+        max_workers=max_workers,
+        cache=cache,
+        retry=retry,
+        page_size=page_size,
+        source=source,
+    )
@@ -0,0 +1,281 @@
+"""Columnar assembly of DSP records into a dataframe."""
+import math
+from array import array
+from itertools import repeat
+from typing import Any, Dict, Iterable, List
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover
+    pa = None
+
+
+class _ObjectColumn:
+    """Column buffer of arbitrary values, whose dtype is inferred by pandas."""
+
+    def __init__(self, values: Iterable = ()) -> None:
+        self.values: List[Any] = list(values)
+
+    def extend(self, values: List[Any]) -> None:
+        """Append values to the column."""
+        self.values.extend(values)
+
+    def to_list(self) -> List[Any]:
+        """Return the values of the column."""
+        return self.values
+
+    def to_array(self) -> Any:
+        """Return the column, to be passed to `pd.DataFrame`."""
+        return self.values
+
+    def to_arrow(self) -> Any:
+        """Return the column as an Arrow array."""
+        return pa.array(pd.Series(self.values, dtype=object), from_pandas=True)
+
+
+class _FloatColumn:
+    """Column buffer of floats, with missing values stored as NaN."""
+
+    typecode = "d"
+
+    def __init__(self, values: Iterable = ()) -> None:
+        self.values = array(self.typecode, values)
+
+    def extend(self, values: List[Any]) -> None:
+        """Append values to the column. Raises TypeError if a value is not a number."""
+        self.values.extend(array("d", [math.nan if v is None else v for v in values]))
+
+    def to_list(self) -> List[Any]:
+        """Return the values of the column."""
+        return self.values.tolist()
+
+    def to_array(self) -> Any:
+        """Return the column, to be passed to `pd.DataFrame`."""
+        return np.frombuffer(self.values, dtype=np.float64).copy()
+
+    def to_arrow(self) -> Any:
+        """Return the column as an Arrow array, with NaN as null."""
+        values = np.frombuffer(self.values, dtype=np.float64)
+        return pa.array(values, mask=np.isnan(values))
+
+
+class _IntColumn(_FloatColumn):
+    """Column buffer of integers. Raises TypeError on a missing value or a non-integer."""
+
+    typecode = "q"
+
+    def extend(self, values: List[Any]) -> None:
+        """Append values to the column."""
+        if any(type(v) is not int for v in values):
+            raise TypeError("not an integer column")
+        self.values.extend(array(self.typecode, values))
+
+    def to_array(self) -> Any:
+        """Return the column, to be passed to `pd.DataFrame`."""
+        return np.frombuffer(self.values, dtype=np.int64).copy()
+
+    def to_arrow(self) -> Any:
+        """Return the column as an Arrow array."""
+        return pa.array(np.frombuffer(self.values, dtype=np.int64))
+
+
+class _CategoryColumn:
+    """Column buffer of repeated strings, stored as integer codes of the distinct values."""
+
+    def __init__(self, values: Iterable = ()) -> None:
+        self.codes = array("i")
+        self.categories: Dict[Any, int] = {}
+        # the codes of the categories, and -1 for missing values
+        self._lookup: Dict[Any, int] = {None: -1}
+        self.extend(list(values))
+
+    def extend(self, values: List[Any]) -> None:
+        """Append values to the column. Raises TypeError if a value is not a string."""
+        codes = list(map(self._lookup.get, values, repeat(-2)))
+
+        # values not seen before
+        if -2 in codes:
+            for i, value in enumerate(values):
+                if codes[i] != -2:
+                    continue
+                if type(value) is not str:
+                    raise TypeError("not a string column")
+                code = self._lookup.get(value)
+                if code is None:
+                    code = self._lookup[value] = self.categories[value] = len(
+                        self.categories
+                    )
+                codes[i] = code
+
+        self.codes.extend(array("i", codes))
+
+    def to_list(self) -> List[Any]:
+        """Return the values of the column."""
+        names = list(self.categories)
+        return [None if code == -1 else names[code] for code in self.codes]
+
+    def to_array(self) -> Any:
+        """Return the column, to be passed to `pd.DataFrame`."""
+        return pd.Categorical.from_codes(
+            np.frombuffer(self.codes, dtype=np.int32), categories=list(self.categories)
+        )
+
+    def to_arrow(self) -> Any:
+        """Return the column as an Arrow dictionary array, with missing values as null."""
+        codes = np.frombuffer(self.codes, dtype=np.int32)
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes == -1),
+            pa.array(list(self.categories), type=pa.string()),
+        )
+
+
+# typed buffers of the fields of data records. Other fields are inferred by pandas
+COLUMN_TYPES = {
+    "value": _FloatColumn,
+    "year": _IntColumn,
+    "var_name": _CategoryColumn,
+    "climate_experiment": _CategoryColumn,
+    "pathway": _CategoryColumn,
+}
+
+# the buffer a typed column falls back to when a value does not fit its type
+FALLBACK_TYPES = {_IntColumn: _FloatColumn, _FloatColumn: _ObjectColumn}
+
+
+def _flatten(record: dict, prefix: str = "") -> dict:
+    """
+    Flatten nested dictionaries of a record into 'parent.child' keys, like `pd.json_normalize`.
+
+    :param record: the record to flatten
+    :type record: dict
+
+    :param prefix: the key of the parent of the record
+    :type prefix: str
+
+    :returns: The flat record
+    :rtype: dict
+    """
+    flat_record = {}
+    for key, value in record.items():
+        if isinstance(value, dict):
+            flat_record.update(_flatten(value, prefix=f"{prefix}{key}."))
+        else:
+            flat_record[f"{prefix}{key}"] = value
+    return flat_record
+
+
+class ColumnarBuilder:
+    """
+    Accumulate records page by page into typed column buffers and build one dataframe.
+
+    `value` is stored as float, `year` as int (float if a year is missing), and
+    `var_name`, `climate_experiment` and `pathway` as categoricals. A field that does not
+    fit its type falls back to a more general buffer. Nested dictionaries are flattened
+    as `pd.json_normalize` does.
+    """
+
+    def __init__(self) -> None:
+        self._columns: Dict[str, Any] = {}
+        self._n_rows = 0
+
+    def __len__(self) -> int:
+        return self._n_rows
+
+    @classmethod
+    def from_records(cls, records: List[dict], result_format: str = "df") -> Any:
+        """
+        Return the dataframe, or Arrow table, of a list of records.
+
+        :param records: the records
+        :type records: list
+
+        :param result_format: 'df' for a dataframe, 'arrow' for an Arrow table
+        :type result_format: str, one of {'df', 'arrow'}
+
+        :returns: The dataframe or table
+        :rtype: pd.DataFrame/pyarrow.Table
+        """
+        builder = cls()
+        builder.append(records)
+        return builder.build_arrow() if result_format == "arrow" else builder.build()
+
+    def _new_column(self, name: str) -> Any:
+        """Return an empty buffer for a column, padded with missing values for the rows so far."""
+        column = COLUMN_TYPES.get(name, _ObjectColumn)()
+        self._extend(name, column, [None] * self._n_rows)
+        return self._columns[name]
+
+    def _extend(self, name: str, column: Any, values: List[Any]) -> None:
+        """Append values to a column, falling back to more general buffers as needed."""
+        while True:
+            try:
+                column.extend(values)
+                break
+            except TypeError:
+                fallback_type = FALLBACK_TYPES.get(type(column), _ObjectColumn)
+                column = fallback_type(column.to_list())
+        self._columns[name] = column
+
+    def append(self, records: List[dict]) -> None:
+        """
+        Append the records of a page.
+
+        :param records: the records
+        :type records: list
+        """
+        if not records:
+            return
+
+        columns = self._split(records)
+        if any(dict in set(map(type, values)) for values in columns.values()):
+            columns = self._split([_flatten(record) for record in records])
+
+        for name in self._columns:
+            if name not in columns:
+                columns[name] = [None] * len(records)
+
+        for name, values in columns.items():
+            column = self._columns.get(name)
+            if column is None:
+                column = self._new_column(name)
+            self._extend(name, column, values)
+
+        self._n_rows += len(records)
+
+    @staticmethod
+    def _split(records: List[dict]) -> Dict[str, List[Any]]:
+        """Return the values of each field of the records, in order of first appearance of the fields."""
+        names = dict.fromkeys(records[0])
+        if set().union(*records).difference(names):
+            names = dict.fromkeys(name for record in records for name in record)
+
+        return {name: list(map(dict.get, records, repeat(name))) for name in names}
+
+    def build(self) -> pd.DataFrame:
+        """
+        Return the dataframe of all appended records.
+
+        :returns: The dataframe
+        :rtype: pd.DataFrame
+        """
+        return pd.DataFrame(
+            {name: column.to_array() for name, column in self._columns.items()}
+        )
+
+    def build_arrow(self) -> Any:
+        """
+        Return an Arrow table of all appended records. Requires the optional dependency `pyarrow`.
+
+        :returns: The table
+        :rtype: pyarrow.Table
+        """
+        if pa is None:
+            raise ImportError(
+                "Arrow output requires pyarrow. Install it with `pip install pyarrow`."
+            )
+
+        return pa.table(
+            {name: column.to_arrow() for name, column in self._columns.items()}
+        )
@@ -0,0 +1,132 @@
+"""Dense N-dimensional assembly of DSP data records into a labelled cube."""
+from array import array
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+try:
+    import xarray as xr
+except ImportError:  # pragma: no cover
+    xr = None  # type: ignore[assignment]
+
+# the fields of data records that become dimensions of the cube, in order
+CUBE_DIMS = ("region_code", "var_name", "year", "climate_experiment", "pathway")
+
+
+class _Coordinate:
+    """Integer codes of the values of one dimension, in order of first appearance."""
+
+    def __init__(self, n_rows: int = 0) -> None:
+        self.codes = array("i")
+        self.labels: Dict[Any, int] = {}
+        self.extend([None] * n_rows)
+
+    def extend(self, values: List[Any]) -> None:
+        """Append the values of a page."""
+        labels = self.labels
+        codes = list(map(labels.get, values, repeat(-1)))
+
+        # values not seen before
+        if -1 in codes:
+            for i, value in enumerate(values):
+                if codes[i] == -1:
+                    codes[i] = labels.setdefault(value, len(labels))
+
+        self.codes.extend(array("i", codes))
+
+    def to_codes(self) -> np.ndarray:
+        """Return the code of each row."""
+        return np.frombuffer(self.codes, dtype=np.int32)
+
+
+class CubeBuilder:
+    """
+    Accumulate data records page by page into a dense cube, without pivoting a table.
+
+    The dimensions are those of `CUBE_DIMS` the records have values for. Each page is
+    reduced to one integer code per dimension and a float value per record, and the
+    cube is filled from them in one pass. Combinations without a record are NaN. If
+    several records have the same coordinates, the last one is kept.
+    """
+
+    def __init__(self) -> None:
+        self._coordinates: Dict[str, _Coordinate] = {}
+        self._values = array("d")
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @classmethod
+    def from_records(cls, records: List[dict]) -> Any:
+        """
+        Return the cube of a list of records.
+
+        :param records: the records
+        :type records: list
+
+        :returns: The cube
+        :rtype: xarray.DataArray
+        """
+        builder = cls()
+        builder.append(records)
+        return builder.build()
+
+    def append(self, records: List[dict]) -> None:
+        """
+        Append the records of a page.
+
+        :param records: the records
+        :type records: list
+        """
+        if not records:
+            return
+
+        for dim in CUBE_DIMS:
+            values = list(map(dict.get, records, repeat(dim)))
+            coordinate = self._coordinates.get(dim)
+            if coordinate is None:
+                if not any(value is not None for value in values):
+                    continue
+                coordinate = self._coordinates[dim] = _Coordinate(len(self))
+            coordinate.extend(values)
+
+        values = [record.get("value") for record in records]
+        self._values.extend(
+            array("d", [np.nan if value is None else value for value in values])
+        )
+
+    def build_numpy(self) -> Tuple[np.ndarray, Dict[str, List[Any]]]:
+        """
+        Return the cube as a NumPy array, and the labels of each of its dimensions.
+
+        :returns: The array, with one axis per dimension, and the labels by dimension
+        :rtype: tuple
+        """
+        dims = [dim for dim in CUBE_DIMS if dim in self._coordinates]
+        coords = {dim: list(self._coordinates[dim].labels) for dim in dims}
+
+        cube = np.full([len(labels) for labels in coords.values()], np.nan)
+        if len(self):
+            cube[
+                tuple(self._coordinates[dim].to_codes() for dim in dims)
+            ] = np.frombuffer(self._values, dtype=np.float64)
+
+        return cube, coords
+
+    def build(self, name: Optional[str] = "value") -> Any:
+        """
+        Return the cube as a labelled array. Requires the optional dependency `xarray`.
+
+        :param name: the name of the array
+        :type name: str
+
+        :returns: The cube
+        :rtype: xarray.DataArray
+        """
+        if xr is None:
+            raise ImportError(
+                "xarray output requires xarray. Install it with `pip install xarray`."
+            )
+
+        cube, coords = self.build_numpy()
+        return xr.DataArray(cube, coords=coords, dims=list(coords), name=name)
@@ -0,0 +1,139 @@
+"""Recording of DSP responses into a compressed fixture archive, and their replay without network."""
+import os
+import gzip
+import json
+import threading
+from typing import Dict, Literal, Optional, Tuple, cast
+
+FixtureMode = Literal["record", "replay"]
+
+# the archives set by the environment, shared so that concurrent clients append in turn
+_env_archives: Dict[Tuple[str, str, bool], "FixtureArchive"] = {}
+_env_archives_lock = threading.Lock()
+
+
+class FixtureNotFoundError(LookupError):
+    """Raised when a page is replayed that is not in the fixture archive."""
+
+
+class FixtureArchive:
+    """
+    Decoded DSP pages recorded into a gzip-compressed JSON lines file, keyed by the full URL of each page.
+
+    In 'record' mode, every page a client returns is appended to the archive together
+    with the seconds it took, so that a crashed run keeps the pages recorded until then.
+    If a URL is recorded again, the last recording is replayed. In 'replay' mode, pages
+    are served from the archive and no request is sent.
+
+    :param path: the path of the archive. E.g. 'tests/fixtures/dsp.jsonl.gz'
+    :type path: str
+
+    **Default arguments:**
+
+    :param mode: 'record' to append pages to the archive, 'replay' to serve them from it
+        |br| * the default value is 'replay'
+    :type mode: str, one of {'record', 'replay'}
+
+    :param replay_latency: indicates whether a replayed page is returned only after the
+        seconds it took when it was recorded, so that performance runs stay realistic
+        |br| * the default value is False
+    :type replay_latency: bool
+    """
+
+    def __init__(
+        self, path: str, mode: FixtureMode = "replay", replay_latency: bool = False
+    ) -> None:
+        if mode not in ("record", "replay"):
+            raise ValueError("mode should be one of record, replay")
+
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        # the recorded line of each URL, decoded on every replay so that callers
+        # can change the pages they are given
+        self._entries: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["FixtureArchive"]:
+        """
+        Return the archive set by the environment variables ZOOMIN_FIXTURES (the path),
+        ZOOMIN_FIXTURE_MODE and ZOOMIN_FIXTURE_LATENCY (1 to replay latencies).
+
+        :returns: The archive, or None if ZOOMIN_FIXTURES is not set
+        :rtype: FixtureArchive
+        """
+        path = os.environ.get("ZOOMIN_FIXTURES")
+        if not path:
+            return None
+
+        key = (
+            path,
+            os.environ.get("ZOOMIN_FIXTURE_MODE", "replay"),
+            os.environ.get("ZOOMIN_FIXTURE_LATENCY", "0") != "0",
+        )
+        with _env_archives_lock:
+            if key not in _env_archives:
+                _env_archives[key] = cls(path, cast(FixtureMode, key[1]), key[2])
+
+            return _env_archives[key]
+
+    def record(self, request_url: str, page: dict, latency: float) -> None:
+        """
+        Append the page of a URL to the archive.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :param page: the decoded page
+        :type page: dict
+
+        :param latency: the seconds it took to fetch the page
+        :type latency: float
+        """
+        line = json.dumps({"url": request_url, "latency": latency, "page": page})
+
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            # each append is a complete gzip member, and members are read as one stream
+            with gzip.open(self.path, "at", encoding="utf-8") as f_name:
+                f_name.write(line + "\n")
+
+            if self._entries is not None:
+                self._entries[request_url] = line
+
+    def _load(self) -> Dict[str, str]:
+        """Return the recorded line of each URL, reading the archive on first use."""
+        with self._lock:
+            if self._entries is None:
+                entries = {}
+                if os.path.exists(self.path):
+                    with gzip.open(self.path, "rt", encoding="utf-8") as f_name:
+                        for line in f_name:
+                            entries[json.loads(line)["url"]] = line
+                self._entries = entries
+
+            return self._entries
+
+    def replay(self, request_url: str) -> Tuple[dict, float]:
+        """
+        Return the recorded page of a URL, and the seconds it took when it was recorded.
+
+        :param request_url: the URL of the page
+        :type request_url: str
+
+        :returns: The decoded page and its latency
+        :rtype: tuple
+        """
+        try:
+            line = self._load()[request_url]
+        except KeyError:
+            raise FixtureNotFoundError(
+                f"{request_url} is not recorded in {self.path}"
+            ) from None
+
+        entry = json.loads(line)
+        return entry["page"], entry["latency"]
+
+    def __len__(self) -> int:
+        return len(self._load())
@@ -0,0 +1,162 @@
+"""Per-page and per-query metrics of DSP requests, reported to hooks."""
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("zoomin_client")
+
+
+@dataclass
+class PageMetrics:
+    """
+    Timings and sizes of the request of one page.
+
+    The time to the first byte includes resolving the host and connecting, if the
+    request opened a new connection, since `requests` does not time them apart.
+
+    :param url: the URL of the page
+    :type url: str
+    """
+
+    url: str
+    # the HTTP status of the last attempt, None for a cache hit
+    status: Optional[int] = None
+    # the number of requests sent, 1 if the page was not retried
+    attempts: int = 0
+    cache_hit: bool = False
+    # seconds from sending the request to receiving the response headers
+    ttfb: float = 0.0
+    # seconds spent reading the body. With incremental parsing, decoding is included
+    download_time: float = 0.0
+    # seconds spent decoding the body, None with incremental parsing
+    parse_time: Optional[float] = None
+    # the number of bytes of the body, as received
+    n_bytes: int = 0
+    n_records: int = 0
+    # seconds from requesting the page to returning it decoded, including retries
+    total_time: float = 0.0
+
+    @property
+    def retries(self) -> int:
+        """Return the number of times the page was requested again."""
+        return max(self.attempts - 1, 0)
+
+
+@dataclass
+class QueryMetrics:
+    """
+    The metrics of the pages of one query, and the time spent building its result.
+
+    :param url: the URL of the first page
+    :type url: str
+    """
+
+    url: str
+    pages: List[PageMetrics] = field(default_factory=list)
+    # the number of records of a result answered without requests, e.g. from memory
+    # or the local replica. If None, the records of the pages are counted
+    n_records: Optional[int] = None
+    # seconds spent turning the records of the pages into the result
+    normalize_time: float = 0.0
+    # seconds from requesting the first page to returning the result
+    total_time: float = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the totals over all pages of the query.
+
+        :returns: The number of pages, records, bytes, retries and cache hits, and the
+            seconds spent per stage
+        :rtype: dict
+        """
+        return {
+            "n_pages": len(self.pages),
+            "n_records": (
+                self.n_records
+                if self.n_records is not None
+                else sum(page.n_records for page in self.pages)
+            ),
+            "n_bytes": sum(page.n_bytes for page in self.pages),
+            "retries": sum(page.retries for page in self.pages),
+            "cache_hits": sum(page.cache_hit for page in self.pages),
+            "ttfb": sum(page.ttfb for page in self.pages),
+            "download_time": sum(page.download_time for page in self.pages),
+            "parse_time": sum(page.parse_time or 0.0 for page in self.pages),
+            "normalize_time": self.normalize_time,
+            "total_time": self.total_time,
+        }
+
+
+class MetricsHook:
+    """
+    Receives the metrics of the requests of a client. Subclass it and override the
+    methods of interest; hooks are called from the thread that fetched the page.
+    """
+
+    def on_page(self, page: PageMetrics) -> None:
+        """Called after each page is fetched or read from the response cache."""
+
+    def on_query(self, query: QueryMetrics) -> None:
+        """Called after the result of a query is built."""
+
+
+class LoggingHook(MetricsHook):
+    """
+    Log the metrics of each page and query to the 'zoomin_client' logger.
+
+    **Default arguments:**
+
+    :param level: the level of the log records
+        |br| * the default value is logging.INFO
+    :type level: int
+    """
+
+    def __init__(self, level: int = logging.INFO) -> None:
+        self.level = level
+
+    def on_page(self, page: PageMetrics) -> None:
+        logger.log(
+            self.level,
+            "%s: %d records, %d bytes, %d attempts, cache hit %s, %.3fs",
+            page.url,
+            page.n_records,
+            page.n_bytes,
+            page.attempts,
+            page.cache_hit,
+            page.total_time,
+        )
+
+    def on_query(self, query: QueryMetrics) -> None:
+        logger.log(self.level, "%s: %s", query.url, query.summary())
+
+
+# the metrics of the query being collected in the current context
+_current_query: ContextVar[Optional[QueryMetrics]] = ContextVar(
+    "current_query", default=None
+)
+
+
+@contextmanager
+def measure_query(query: QueryMetrics) -> Iterator[QueryMetrics]:
+    """Add the pages fetched and the normalize time spent within the context to `query`."""
+    token = _current_query.set(query)
+    try:
+        yield query
+    finally:
+        _current_query.reset(token)
+
+
+def add_page(page: PageMetrics) -> None:
+    """Add a page to the query being collected, if any."""
+    query = _current_query.get()
+    if query is not None:
+        query.pages.append(page)
+
+
+def add_normalize_time(seconds: float) -> None:
+    """Add to the normalize time of the query being collected, if any."""
+    query = _current_query.get()
+    if query is not None:
+        query.normalize_time += seconds
@@ -0,0 +1,232 @@
+"""Page size options of paginated DSP queries."""
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+
+def with_query_param(request_url: str, key: str, value: object) -> str:
+    """
+    Return `request_url` with its query parameter `key` set to `value`.
+
+    :param request_url: the URL
+    :type request_url: str
+
+    :param key: the name of the query parameter
+    :type key: str
+
+    :param value: the value of the query parameter
+    :type value: object
+
+    :returns: The URL
+    :rtype: str
+    """
+    parsed_url = urlparse(request_url)
+    query = [
+        (query_key, query_value)
+        for query_key, query_value in parse_qsl(
+            parsed_url.query, keep_blank_values=True
+        )
+        if query_key != key
+    ]
+    query.append((key, str(value)))
+    return parsed_url._replace(query=urlencode(query)).geturl()
+
+
+def _is_power_of_two(number: int) -> bool:
+    """Return whether `number` is a positive power of two."""
+    return number > 0 and number & (number - 1) == 0
+
+
+def aligned_size(n_results: int, offset: int) -> int:
+    """
+    Return the largest power of two up to `n_results` that divides `offset`.
+
+    A page of that size can be requested by its page number, `offset / size + 1`.
+
+    :param n_results: the upper bound of the size
+    :type n_results: int
+
+    :param offset: the number of results before the page
+    :type offset: int
+
+    :returns: The page size
+    :rtype: int
+    """
+    page_size = 1
+    while page_size * 2 <= n_results and offset % (page_size * 2) == 0:
+        page_size *= 2
+    return page_size
+
+
+@dataclass
+class AdaptivePageSize:
+    """
+    Adaptive page size, growing while pages arrive quickly and shrinking when they do not.
+
+    The page size is a power of two. After each page, it is doubled if the page took
+    less than half of `target_latency`, and halved if it took longer than
+    `target_latency`. If a page times out, it is requested again at half the size, and
+    the page size does not grow beyond that size anymore.
+    Since pages are requested by number, the page size only grows when the number of
+    results fetched so far is a multiple of the doubled size.
+
+    `max_size` should not exceed the maximum page size of the DSP. If the DSP returns
+    fewer results than requested, the page is requested again at a size it serves, and
+    the page size does not grow beyond that size anymore.
+
+    **Default arguments:**
+
+    :param initial_size: the size of the first page
+        |br| * the default value is 1024
+    :type initial_size: int
+
+    :param min_size: the smallest page size
+        |br| * the default value is 64
+    :type min_size: int
+
+    :param max_size: the largest page size
+        |br| * the default value is 16384
+    :type max_size: int
+
+    :param target_latency: the time in seconds a page should take, including its download
+        |br| * the default value is 30
+    :type target_latency: float
+    """
+
+    initial_size: int = 1024
+    min_size: int = 64
+    max_size: int = 16384
+    target_latency: float = 30
+
+    def __post_init__(self) -> None:
+        for size in (self.initial_size, self.min_size, self.max_size):
+            if not _is_power_of_two(size):
+                raise ValueError("page sizes should be powers of two")
+
+        if not self.min_size <= self.initial_size <= self.max_size:
+            raise ValueError("initial_size should be between min_size and max_size")
+
+    def next_size(
+        self, page_size: int, latency: float, offset: int, max_size: int
+    ) -> int:
+        """
+        Return the size of the next page.
+
+        :param page_size: the size of the last page
+        :type page_size: int
+
+        :param latency: the time in seconds the last page took
+        :type latency: float
+
+        :param offset: the number of results fetched so far
+        :type offset: int
+
+        :param max_size: the largest page size, at most `self.max_size`
+        :type max_size: int
+
+        :returns: The page size
+        :rtype: int
+        """
+        if latency > self.target_latency and page_size > self.min_size:
+            return page_size // 2
+
+        if (
+            latency * 2 < self.target_latency
+            and page_size * 2 <= max_size
+            and offset % (page_size * 2) == 0
+        ):
+            return page_size * 2
+
+        return page_size
+
+
+class PagingError(RuntimeError):
+    """Raised when the DSP serves a page that makes no progress through the results."""
+
+
+class AdaptivePager:
+    """
+    Page requests of one query with an adaptive page size.
+
+    The pager builds the URL of each page from the number of results fetched so far
+    and adapts the page size to the latency of the pages, according to `page_size`.
+
+    :param request_url: the URL of the first page of the query
+    :type request_url: str
+
+    :param page_size: the adaptive page size options
+    :type page_size: AdaptivePageSize
+    """
+
+    def __init__(self, request_url: str, page_size: AdaptivePageSize) -> None:
+        self.request_url = request_url
+        self.options = page_size
+        self.page_size = page_size.initial_size
+        self.max_size = page_size.max_size
+        self.offset = 0
+        self.done = False
+
+    def next_url(self) -> Optional[str]:
+        """
+        Return the URL of the next page, or None once all pages are fetched.
+
+        :returns: The URL
+        :rtype: str
+        """
+        if self.done:
+            return None
+
+        request_url = with_query_param(self.request_url, "page_size", self.page_size)
+        return with_query_param(request_url, "page", self.offset // self.page_size + 1)
+
+    def shrink(self) -> bool:
+        """
+        Halve the page size after the next page timed out, and keep it at most that size.
+
+        :returns: False if the page size is already `min_size`, True otherwise
+        :rtype: bool
+        """
+        if self.page_size <= self.options.min_size:
+            return False
+
+        self.page_size //= 2
+        self.max_size = self.page_size
+        return True
+
+    def add_page(self, page: dict, latency: float) -> Optional[list]:
+        """
+        Record a fetched page and return its results.
+
+        :param page: the decoded page
+        :type page: dict
+
+        :param latency: the time in seconds the page took
+        :type latency: float
+
+        :returns: The results of the page, or None if the DSP served a smaller page
+            than requested and the page has to be requested again
+        :rtype: list
+        """
+        results: list = page["results"]
+
+        # the same offset would be requested again, forever
+        if not results and page["next"] is not None:
+            raise PagingError(
+                f"the DSP served an empty page with a next link at offset {self.offset}"
+            )
+
+        # the DSP caps the page size, so the page holds results of another offset
+        if 0 < len(results) < min(self.page_size, page["count"] - self.offset):
+            self.max_size = 1 << (len(results).bit_length() - 1)
+            self.page_size = aligned_size(self.max_size, self.offset)
+            return None
+
+        self.offset += len(results)
+        if page["next"] is None:
+            self.done = True
+        else:
+            self.page_size = self.options.next_size(
+                self.page_size, latency, self.offset, self.max_size
+            )
+
+        return results
@@ -0,0 +1,150 @@
+"""Planning of the queries of a slice of regions and variables."""
+import math
+from dataclasses import dataclass, field
+from typing import Any, Collection, Dict, Iterable, List, Literal, Optional
+
+Strategy = Literal["region", "variable"]
+
+# the columns of the records of a slice, whichever endpoint they were queried from
+SLICE_COLUMNS = (
+    "region_code",
+    "var_name",
+    "year",
+    "pathway",
+    "climate_experiment",
+    "value",
+)
+
+
+def resolution_of(region_code: str) -> str:
+    """
+    Return the spatial resolution of a region code.
+
+    NUTS codes have 2 to 5 characters, one more per level. LAU codes are given as
+    '<NUTS3>_<LAU>'.
+
+    :param region_code: the code of the region
+    :type region_code: str
+
+    :returns: The spatial resolution
+    :rtype: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+    """
+    if "_" in region_code:
+        return "LAU"
+
+    if not 2 <= len(region_code) <= 5:
+        raise ValueError(f"{region_code} is not a NUTS or LAU region code")
+
+    return f"NUTS{len(region_code) - 2}"
+
+
+def estimate_pages(first_page: dict) -> int:
+    """
+    Return the number of pages of a query, from its first page.
+
+    :param first_page: the decoded first page of the query
+    :type first_page: dict
+
+    :returns: The number of pages
+    :rtype: int
+    """
+    if first_page["next"] is None:
+        return 1
+
+    n_records: int = first_page["count"]
+    return math.ceil(n_records / len(first_page["results"]))
+
+
+@dataclass
+class QueryPlan:
+    """
+    Plan of the queries of a slice of regions and variables.
+
+    :param strategy: 'region' to query the data of each region, 'variable' to query the
+        data of each variable at each spatial resolution of the regions
+    :type strategy: str, one of {'region', 'variable'}
+
+    :param queries: the arguments of each query, either `region_code` and `variable`,
+        or `spatial_resolution` and `variable`
+    :type queries: List[dict]
+
+    :param estimated_pages: the estimated number of pages of all queries, or None if
+        the strategy was not chosen by cost
+    :type estimated_pages: int
+
+    :param alternative_pages: the estimated number of pages of the other strategy
+    :type alternative_pages: int
+    """
+
+    strategy: Strategy
+    queries: List[dict] = field(default_factory=list)
+    estimated_pages: Optional[int] = None
+    alternative_pages: Optional[int] = None
+
+
+def select_records(
+    records: Iterable[dict],
+    defaults: Dict[str, Any],
+    region_codes: Optional[Collection[str]] = None,
+    variables: Optional[Collection[str]] = None,
+    years: Optional[Collection[int]] = None,
+    pathways: Optional[Collection[str]] = None,
+    climate_experiments: Optional[Collection[str]] = None,
+) -> List[dict]:
+    """
+    Return the records within a slice, with the `SLICE_COLUMNS`.
+
+    Like the DSP, the pathway and climate experiment filters only apply to records that
+    have a pathway or a climate experiment.
+
+    :param records: the records of a query
+    :type records: Iterable[dict]
+
+    :param defaults: the values of the columns the records of the query do not have.
+        E.g. the region code of a region data query
+    :type defaults: dict
+
+    **Default arguments:**
+
+    :param region_codes: the regions of the slice. If None, all regions are kept
+    :type region_codes: Collection[str]
+
+    :param variables: the variables of the slice. If None, all variables are kept
+    :type variables: Collection[str]
+
+    :param years: the years of the slice. If None, all years are kept
+    :type years: Collection[int]
+
+    :param pathways: the pathways of the slice. If None, all pathways are kept
+    :type pathways: Collection[str]
+
+    :param climate_experiments: the climate experiments of the slice.
+        If None, all climate experiments are kept
+    :type climate_experiments: Collection[str]
+
+    :returns: The records
+    :rtype: List[dict]
+    """
+    selected_records = []
+    for record in records:
+        row = {
+            column: record.get(column, defaults.get(column)) for column in SLICE_COLUMNS
+        }
+
+        if region_codes is not None and row["region_code"] not in region_codes:
+            continue
+        if variables is not None and row["var_name"] not in variables:
+            continue
+        if years is not None and row["year"] not in years:
+            continue
+        if pathways is not None and row["pathway"] not in (None, *pathways):
+            continue
+        if climate_experiments is not None and row["climate_experiment"] not in (
+            None,
+            *climate_experiments,
+        ):
+            continue
+
+        selected_records.append(row)
+
+    return selected_records
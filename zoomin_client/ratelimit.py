@@ -0,0 +1,259 @@
+"""Client-side rate limiting of requests to the DSP, shared by threads and, optionally, processes."""
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator, Optional
+
+if sys.platform == "win32":
+    import msvcrt
+
+    def _try_lock(file: IO) -> bool:
+        """Try to lock a file exclusively, without waiting."""
+        file.seek(0)
+        try:
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(file: IO) -> None:
+        """Unlock a file locked with `_try_lock`."""
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+else:
+    import fcntl
+
+    def _try_lock(file: IO) -> bool:
+        """Try to lock a file exclusively, without waiting."""
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return False
+        return True
+
+    def _unlock(file: IO) -> None:
+        """Unlock a file locked with `_try_lock`."""
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+# how long to wait before trying a file lock again
+LOCK_POLL_INTERVAL = 0.005
+
+
+def _lock(file: IO) -> None:
+    """Lock a file exclusively, waiting until it is unlocked by other processes."""
+    while not _try_lock(file):
+        time.sleep(LOCK_POLL_INTERVAL)
+
+
+def _open_lock_file(path: str) -> IO:
+    """Open a file for reading and writing, creating it if it does not exist."""
+    return os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT), "r+")
+
+
+class RateLimiter:
+    """
+    Token bucket limiting the rate of requests, and cap of the requests in flight.
+
+    Every request takes a token from a bucket that holds up to `burst` tokens and is
+    refilled at `rate` tokens per second, and holds one of `max_in_flight` slots until
+    its response is read. Requests wait until both are available.
+
+    The limiter is shared by all threads using it. If `lock_dir` is given, the bucket
+    and the slots are kept in lock files in that folder, so that all processes on a
+    node using the same folder share one budget.
+
+    **Default arguments:**
+
+    :param rate: the sustained number of requests per second.
+        If None, the rate is not limited
+        |br| * the default value is None
+    :type rate: float
+
+    :param burst: the maximum number of requests sent at once after an idle period
+        |br| * the default value is 1
+    :type burst: int
+
+    :param max_in_flight: the maximum number of requests in flight at any time.
+        If None, the number is not limited
+        |br| * the default value is None
+    :type max_in_flight: int
+
+    :param lock_dir: the folder of the lock files shared by processes.
+        If None, the limiter is shared by the threads of this process only
+        |br| * the default value is None
+    :type lock_dir: str
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 1,
+        max_in_flight: Optional[int] = None,
+        lock_dir: Optional[str] = None,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.max_in_flight = max_in_flight
+        self.lock_dir = lock_dir
+
+        self._lock = threading.Lock()
+        self._slots = (
+            threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+        )
+
+        # processes only share the wall clock
+        self._clock = time.time if lock_dir is not None else time.monotonic
+        self._tokens = float(burst)
+        self._updated_at = self._clock()
+        self._paused_until = 0.0
+
+        if lock_dir is not None:
+            os.makedirs(lock_dir, exist_ok=True)
+            self._bucket_path = os.path.join(lock_dir, "bucket.json")
+
+    @contextmanager
+    def limit(self) -> Iterator[None]:
+        """Wait for a slot and a token, and hold the slot until the block is left."""
+        slot = self._acquire_slot()
+        try:
+            self._take_token()
+            yield
+        finally:
+            self._release_slot(slot)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for a time, e.g. after the DSP answered with 429.
+
+        :param seconds: the time in seconds until the next token
+        :type seconds: float
+        """
+        with self._lock:
+            if self.lock_dir is None:
+                self._paused_until = max(self._paused_until, self._clock() + seconds)
+                return
+
+            with self._open_bucket() as bucket_file:
+                state = self._read_bucket(bucket_file)
+                state["paused_until"] = max(
+                    state["paused_until"], self._clock() + seconds
+                )
+                self._write_bucket(bucket_file, state)
+
+    def _acquire_slot(self) -> Optional[IO]:
+        """Wait for a slot, and return its lock file in the shared mode."""
+        if self._slots is None:
+            return None
+
+        self._slots.acquire()
+        if self.lock_dir is None:
+            return None
+
+        try:
+            while True:
+                for i in range(self.max_in_flight or 0):
+                    slot_file = _open_lock_file(
+                        os.path.join(self.lock_dir, f"slot_{i}.lock")
+                    )
+                    if _try_lock(slot_file):
+                        return slot_file
+                    slot_file.close()
+                time.sleep(LOCK_POLL_INTERVAL)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release_slot(self, slot_file: Optional[IO]) -> None:
+        """Release a slot taken with `_acquire_slot`."""
+        if self._slots is None:
+            return
+
+        if slot_file is not None:
+            _unlock(slot_file)
+            slot_file.close()
+        self._slots.release()
+
+    def _take_token(self) -> None:
+        """Wait until a token is available and take it, or only until a pause ends if `rate` is None."""
+        while True:
+            with self._lock:
+                if self.lock_dir is None:
+                    wait_time = self._refill_and_take()
+                else:
+                    with self._open_bucket() as bucket_file:
+                        state = self._read_bucket(bucket_file)
+                        self._tokens = state["tokens"]
+                        self._updated_at = state["updated_at"]
+                        self._paused_until = state["paused_until"]
+
+                        wait_time = self._refill_and_take()
+                        self._write_bucket(
+                            bucket_file,
+                            {
+                                "tokens": self._tokens,
+                                "updated_at": self._updated_at,
+                                "paused_until": self._paused_until,
+                            },
+                        )
+
+            if wait_time <= 0:
+                return
+            time.sleep(wait_time)
+
+    def _refill_and_take(self) -> float:
+        """Refill the bucket, take a token if there is one, and return the time to wait otherwise."""
+        now = self._clock()
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        # only in-flight requests are limited, but a pause still applies
+        rate = self.rate
+        if rate is None:
+            return 0
+
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated_at) * rate
+        )
+        self._updated_at = now
+
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0
+
+        return (1 - self._tokens) / rate
+
+    @contextmanager
+    def _open_bucket(self) -> Iterator[IO]:
+        """Open and lock the bucket file shared by processes."""
+        with _open_lock_file(self._bucket_path) as bucket_file:
+            _lock(bucket_file)
+            try:
+                yield bucket_file
+            finally:
+                _unlock(bucket_file)
+
+    def _read_bucket(self, bucket_file: IO) -> dict:
+        """Return the state of the shared bucket, or of a full bucket if there is none yet."""
+        bucket_file.seek(0)
+        try:
+            state: dict = json.loads(bucket_file.read())
+        except ValueError:
+            state = {
+                "tokens": float(self.burst),
+                "updated_at": self._clock(),
+                "paused_until": 0.0,
+            }
+        return state
+
+    @staticmethod
+    def _write_bucket(bucket_file: IO, state: dict) -> None:
+        """Replace the state of the shared bucket."""
+        bucket_file.seek(0)
+        bucket_file.truncate()
+        bucket_file.write(json.dumps(state))
+        bucket_file.flush()
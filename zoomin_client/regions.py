@@ -0,0 +1,273 @@
+"""Index of the region tree of a country, from NUTS0 down to LAU."""
+import os
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from zoomin_client.planner import resolution_of
+
+DEFAULT_INDEX_DIR = os.environ.get(
+    "ZOOMIN_INDEX_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "zoomin_client", "regions"),
+)
+
+# the spatial resolutions from the coarsest to the finest
+RESOLUTION_LEVELS = ("NUTS0", "NUTS1", "NUTS2", "NUTS3", "LAU")
+
+
+def parent_code(region_code: str) -> Optional[str]:
+    """
+    Return the code of the parent of a region, one spatial resolution coarser.
+
+    The parent of a LAU region '<NUTS3>_<LAU>' is its NUTS3 region, and a NUTS code
+    is the code of its parent followed by one character.
+
+    :param region_code: the code of the region
+    :type region_code: str
+
+    :returns: The code of the parent, or None for a NUTS0 region
+    :rtype: str
+    """
+    if "_" in region_code:
+        return region_code.split("_", 1)[0]
+
+    if resolution_of(region_code) == "NUTS0":
+        return None
+
+    return region_code[:-1]
+
+
+class RegionIndex:
+    """
+    Parent and child links of the regions of a country, stored in compact arrays.
+
+    Regions are stored in depth-first order, so that the descendants of a region are
+    the regions that follow it up to the end of its subtree. Children, ancestors and
+    descendants are looked up without walking the tree. A region whose parent is not in
+    the index is a root.
+
+    :param region_codes: the codes of the regions, at any spatial resolutions
+    :type region_codes: Iterable[str]
+    """
+
+    def __init__(self, region_codes: Iterable[str]) -> None:
+        codes = list(dict.fromkeys(region_codes))
+        positions: Dict[Optional[str], int] = {code: i for i, code in enumerate(codes)}
+        parent_ids = [positions.get(parent_code(code), -1) for code in codes]
+
+        # depth-first order, with the children of each region in the given order
+        children: Dict[int, List[int]] = {}
+        for i, parent_id in enumerate(parent_ids):
+            children.setdefault(parent_id, []).append(i)
+
+        order: List[int] = []
+        stack = list(reversed(children.get(-1, [])))
+        while stack:
+            i = stack.pop()
+            order.append(i)
+            stack.extend(reversed(children.get(i, [])))
+
+        new_ids = np.empty(len(codes), dtype=np.int32)
+        new_ids[order] = np.arange(len(codes), dtype=np.int32)
+        old_parents = np.array(parent_ids, dtype=np.int32)[order]
+
+        self._set_arrays(
+            np.array([codes[i] for i in order], dtype=str),
+            np.array(
+                [RESOLUTION_LEVELS.index(resolution_of(codes[i])) for i in order],
+                dtype=np.int8,
+            ),
+            np.where(old_parents < 0, -1, new_ids[old_parents]).astype(np.int32),
+        )
+
+    def _set_arrays(
+        self, codes: np.ndarray, levels: np.ndarray, parents: np.ndarray
+    ) -> None:
+        """Derive the lookup arrays from the regions in depth-first order."""
+        self.codes = codes
+        self.levels = levels
+        self.parents = parents
+        self._positions = {code: i for i, code in enumerate(codes.tolist())}
+        n_regions = len(codes)
+
+        # the children of region i are child_ids[child_offsets[i]:child_offsets[i + 1]]
+        self.child_ids = np.argsort(parents, kind="stable").astype(np.int32)
+        self.child_ids = self.child_ids[parents[self.child_ids] >= 0]
+        self.child_offsets = np.searchsorted(
+            parents[self.child_ids], np.arange(n_regions + 1)
+        ).astype(np.int32)
+
+        # the ancestor of region i at each level, or -1, from the coarsest level down
+        self.ancestor_ids = np.full((n_regions, len(RESOLUTION_LEVELS)), -1, np.int32)
+        self.ancestor_ids[np.arange(n_regions), levels] = np.arange(n_regions)
+        for level in range(1, len(RESOLUTION_LEVELS)):
+            rows = np.flatnonzero((levels == level) & (parents >= 0))
+            self.ancestor_ids[rows, :level] = self.ancestor_ids[parents[rows], :level]
+
+        # the descendants of region i are the regions i + 1 to subtree_ends[i] - 1,
+        # from the finest level up
+        self.subtree_ends = np.arange(1, n_regions + 1, dtype=np.int32)
+        for level in range(len(RESOLUTION_LEVELS) - 1, 0, -1):
+            rows = np.flatnonzero((levels == level) & (parents >= 0))
+            np.maximum.at(self.subtree_ends, parents[rows], self.subtree_ends[rows])
+
+    @classmethod
+    def from_metadata(cls, region_metadata: Iterable[dict]) -> "RegionIndex":
+        """
+        Return the index of region metadata records.
+
+        :param region_metadata: the region metadata records, at any spatial resolutions
+        :type region_metadata: Iterable[dict]
+
+        :returns: The index
+        :rtype: RegionIndex
+        """
+        return cls(record["region_code"] for record in region_metadata)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __contains__(self, region_code: object) -> bool:
+        return region_code in self._positions
+
+    def _position(self, region_code: str) -> int:
+        """Return the position of a region. Raises KeyError if it is not in the index."""
+        try:
+            return self._positions[region_code]
+        except KeyError:
+            raise KeyError(f"{region_code} is not in the region index") from None
+
+    def _codes(self, positions: np.ndarray) -> List[str]:
+        """Return the codes of the regions at `positions`."""
+        codes: List[str] = self.codes[positions].tolist()
+        return codes
+
+    def resolution(self, region_code: str) -> str:
+        """
+        Return the spatial resolution of a region.
+
+        :param region_code: the code of the region
+        :type region_code: str
+
+        :returns: The spatial resolution
+        :rtype: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+        """
+        return RESOLUTION_LEVELS[self.levels[self._position(region_code)]]
+
+    def parent(self, region_code: str) -> Optional[str]:
+        """
+        Return the parent of a region.
+
+        :param region_code: the code of the region
+        :type region_code: str
+
+        :returns: The code of the parent, or None if the region is a root
+        :rtype: str
+        """
+        parent_id = self.parents[self._position(region_code)]
+        return None if parent_id < 0 else str(self.codes[parent_id])
+
+    def children(self, region_code: str) -> List[str]:
+        """
+        Return the children of a region, one spatial resolution finer.
+
+        :param region_code: the code of the region
+        :type region_code: str
+
+        :returns: The codes of the children
+        :rtype: List[str]
+        """
+        i = self._position(region_code)
+        return self._codes(
+            self.child_ids[self.child_offsets[i] : self.child_offsets[i + 1]]
+        )
+
+    def ancestors(self, region_code: str) -> List[str]:
+        """
+        Return the ancestors of a region, from the coarsest spatial resolution.
+
+        :param region_code: the code of the region
+        :type region_code: str
+
+        :returns: The codes of the ancestors
+        :rtype: List[str]
+        """
+        i = self._position(region_code)
+        ancestor_ids = self.ancestor_ids[i, : self.levels[i]]
+        return self._codes(ancestor_ids[ancestor_ids >= 0])
+
+    def descendants(
+        self, region_code: str, spatial_resolution: Optional[str] = None
+    ) -> List[str]:
+        """
+        Return the descendants of a region, in depth-first order.
+
+        :param region_code: the code of the region
+        :type region_code: str
+
+        **Default arguments:**
+
+        :param spatial_resolution: if set, only the descendants at this spatial
+            resolution are returned. E.g. 'LAU'
+            |br| * the default value is None
+        :type spatial_resolution: str
+
+        :returns: The codes of the descendants
+        :rtype: List[str]
+        """
+        i = self._position(region_code)
+        descendant_ids = np.arange(i + 1, self.subtree_ends[i])
+        if spatial_resolution is not None:
+            level = RESOLUTION_LEVELS.index(spatial_resolution)
+            descendant_ids = descendant_ids[self.levels[descendant_ids] == level]
+
+        return self._codes(descendant_ids)
+
+    def regions(self, spatial_resolution: str) -> List[str]:
+        """
+        Return the regions at a spatial resolution, in depth-first order.
+
+        :param spatial_resolution: the spatial resolution
+        :type spatial_resolution: str, one of {'NUTS0', 'NUTS1', 'NUTS2', 'NUTS3', 'LAU'}
+
+        :returns: The codes of the regions
+        :rtype: List[str]
+        """
+        level = RESOLUTION_LEVELS.index(spatial_resolution)
+        return self._codes(np.flatnonzero(self.levels == level))
+
+    def save(self, path: str) -> None:
+        """
+        Save the index as a compressed NumPy archive.
+
+        :param path: the path of the file. NOTE: must end with '.npz'
+        :type path: str
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        # written to a temporary file first, so that readers never see a partial file
+        temp_path = f"{path[: -len('.npz')]}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            temp_path, codes=self.codes, levels=self.levels, parents=self.parents
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "RegionIndex":
+        """
+        Return an index saved with :meth:`save`.
+
+        :param path: the path of the file
+        :type path: str
+
+        :returns: The index
+        :rtype: RegionIndex
+        """
+        index = cls.__new__(cls)
+        with np.load(path, allow_pickle=False) as arrays:
+            index._set_arrays(arrays["codes"], arrays["levels"], arrays["parents"])
+
+        return index
+
+
+def index_path(version: str, country_code: str, index_dir: str) -> str:
+    """Return the path of the index file of a country, for a DSP version."""
+    return os.path.join(index_dir, f"{version}_{country_code.lower()}.npz")
@@ -0,0 +1,389 @@
+"""Local replica of the DSP data of whole countries, stored in an embedded SQLite file."""
+import os
+import json
+import time
+import sqlite3
+from contextlib import closing
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "ZOOMIN_STORE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "zoomin_client", "replica.sqlite3"),
+)
+
+# the variable metadata fields region data records carry with `mini_version`
+MINI_VERSION_FIELDS = ("var_unit", "taggings")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS syncs (
+    country_code TEXT PRIMARY KEY, version TEXT NOT NULL, synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS region_metadata (
+    country_code TEXT, resolution TEXT, region_code TEXT, record TEXT
+);
+CREATE INDEX IF NOT EXISTS region_metadata_by_resolution
+    ON region_metadata (country_code, resolution, region_code);
+CREATE TABLE IF NOT EXISTS variable_metadata (
+    country_code TEXT, var_name TEXT, record TEXT
+);
+CREATE INDEX IF NOT EXISTS variable_metadata_by_variable
+    ON variable_metadata (country_code, var_name);
+CREATE TABLE IF NOT EXISTS proxy_details (
+    country_code TEXT, var_name TEXT, record TEXT
+);
+CREATE INDEX IF NOT EXISTS proxy_details_by_variable
+    ON proxy_details (country_code, var_name);
+CREATE TABLE IF NOT EXISTS variable_data (
+    country_code TEXT, var_name TEXT, resolution TEXT, region_code TEXT,
+    pathway TEXT, climate_experiment TEXT, record TEXT
+);
+CREATE INDEX IF NOT EXISTS variable_data_by_variable
+    ON variable_data (country_code, var_name, resolution);
+CREATE INDEX IF NOT EXISTS variable_data_by_region
+    ON variable_data (country_code, region_code, var_name);
+"""
+
+_METADATA_TABLES = ("region_metadata", "variable_metadata")
+_VARIABLE_TABLES = ("proxy_details", "variable_data")
+
+
+def _scenario_filters(
+    pathway_description: Optional[str], climate_experiment: Optional[str]
+) -> Tuple[str, list]:
+    """
+    Return the SQL conditions and parameters of the pathway and climate experiment filters.
+
+    Like the DSP, the filters only apply to records that have a pathway or a climate
+    experiment.
+    """
+    conditions = ""
+    params: list = []
+
+    if pathway_description is not None:
+        conditions += " AND (pathway IS NULL OR pathway = ?)"
+        params.append(pathway_description)
+
+    if climate_experiment is not None:
+        conditions += " AND (climate_experiment IS NULL OR climate_experiment = ?)"
+        params.append(climate_experiment)
+
+    return conditions, params
+
+
+class LocalReplica:
+    """
+    Replica of the region metadata, variable metadata, proxy details and variable data of countries.
+
+    The replica is filled by :meth:`zoomin_client.client.DSPClient.sync_country`, and
+    answers the getters called with `source` 'local'. Records are stored as they are
+    returned by the DSP, with indexed columns for the lookups of each getter.
+
+    **Default arguments:**
+
+    :param store_path: the path of the SQLite file
+        |br| * the default value is '~/.cache/zoomin_client/replica.sqlite3',
+        or the `ZOOMIN_STORE_PATH` environment variable if set
+    :type store_path: str
+    """
+
+    def __init__(self, store_path: str = DEFAULT_STORE_PATH) -> None:
+        self.store_path = store_path
+
+        store_dir = os.path.dirname(os.path.abspath(store_path))
+        os.makedirs(store_dir, exist_ok=True)
+
+        with closing(self._connect()) as connection:
+            # readers are not blocked while a sync writes
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return a new connection to the store, so that each thread uses its own."""
+        return sqlite3.connect(self.store_path, timeout=60)
+
+    def _records(self, query: str, params: Sequence) -> List[dict]:
+        """Return the decoded records selected by `query`."""
+        with closing(self._connect()) as connection:
+            return [
+                json.loads(record) for (record,) in connection.execute(query, params)
+            ]
+
+    def synced_version(self, country_code: str) -> Optional[str]:
+        """
+        Return the DSP version a country was synced from.
+
+        :param country_code: the code of the country
+        :type country_code: str
+
+        :returns: The version, or None if the country was never synced
+        :rtype: str
+        """
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT version FROM syncs WHERE country_code = ?",
+                (country_code.lower(),),
+            ).fetchone()
+
+        return None if row is None else row[0]
+
+    def data_last_updates(self, country_code: str) -> Dict[str, Any]:
+        """
+        Return the `data_last_update` of each variable of a country, as of its last sync.
+
+        :param country_code: the code of the country
+        :type country_code: str
+
+        :returns: The `data_last_update` by variable name
+        :rtype: dict
+        """
+        return {
+            record["var_name"]: record.get("data_last_update")
+            for record in self.variable_metadata(country_code, None)
+        }
+
+    def replace_country(
+        self,
+        version: str,
+        country_code: str,
+        region_metadata: Iterable[dict],
+        variable_metadata: Iterable[dict],
+        proxy_details: Mapping[str, list],
+        variable_data: Iterable[Tuple[str, str, list]],
+        changed_variables: Optional[Collection[str]] = None,
+    ) -> None:
+        """
+        Replace the data of a country in one transaction.
+
+        If writing fails, for example because `variable_data` raises, the data synced
+        before is kept.
+
+        :param version: the DSP version the data was queried from
+        :type version: str
+
+        :param country_code: the code of the country
+        :type country_code: str
+
+        :param region_metadata: the region metadata records at all spatial resolutions
+        :type region_metadata: Iterable[dict]
+
+        :param variable_metadata: the variable metadata records
+        :type variable_metadata: Iterable[dict]
+
+        :param proxy_details: the proxy details records by variable
+        :type proxy_details: Mapping[str, list]
+
+        :param variable_data: the variable, the spatial resolution and the records of
+            each variable data query
+        :type variable_data: Iterable[tuple]
+
+        **Default arguments:**
+
+        :param changed_variables: if set, only the proxy details and variable data of
+            these variables are replaced. Those of other variables in `variable_metadata`
+            are kept, those of variables no longer in it are removed
+            |br| * the default value is None. If None, all data of the country is replaced.
+        :type changed_variables: Collection[str]
+        """
+        country_code = country_code.lower()
+        variable_metadata = list(variable_metadata)
+
+        with closing(self._connect()) as connection, connection:
+            replaced_tables: Tuple[str, ...] = _METADATA_TABLES
+            if changed_variables is None:
+                replaced_tables += _VARIABLE_TABLES
+
+            for table in replaced_tables:
+                connection.execute(
+                    f"DELETE FROM {table} WHERE country_code = ?", (country_code,)
+                )
+
+            if changed_variables is not None:
+                variables = {record["var_name"] for record in variable_metadata}
+                for table in _VARIABLE_TABLES:
+                    stale_variables = [
+                        var_name
+                        for (var_name,) in connection.execute(
+                            f"SELECT DISTINCT var_name FROM {table} WHERE country_code = ?",
+                            (country_code,),
+                        )
+                        if var_name in changed_variables or var_name not in variables
+                    ]
+                    connection.executemany(
+                        f"DELETE FROM {table} WHERE country_code = ? AND var_name = ?",
+                        ((country_code, var_name) for var_name in stale_variables),
+                    )
+
+            connection.executemany(
+                "INSERT INTO region_metadata VALUES (?, ?, ?, ?)",
+                (
+                    (
+                        country_code,
+                        record["resolution"],
+                        record["region_code"],
+                        json.dumps(record),
+                    )
+                    for record in region_metadata
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO variable_metadata VALUES (?, ?, ?)",
+                (
+                    (country_code, record["var_name"], json.dumps(record))
+                    for record in variable_metadata
+                ),
+            )
+            connection.executemany(
+                "INSERT INTO proxy_details VALUES (?, ?, ?)",
+                (
+                    (country_code, var_name, json.dumps(record))
+                    for var_name, records in proxy_details.items()
+                    for record in records
+                ),
+            )
+
+            for var_name, spatial_resolution, records in variable_data:
+                connection.executemany(
+                    "INSERT INTO variable_data VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        (
+                            country_code,
+                            var_name,
+                            spatial_resolution,
+                            record["region_code"],
+                            record.get("pathway"),
+                            record.get("climate_experiment"),
+                            json.dumps(record),
+                        )
+                        for record in records
+                    ),
+                )
+
+            connection.execute(
+                "INSERT OR REPLACE INTO syncs VALUES (?, ?, ?)",
+                (country_code, version, time.time()),
+            )
+
+    def region_metadata(
+        self, country_code: str, spatial_resolution: str, region_code: Optional[str]
+    ) -> List[dict]:
+        """Return the region metadata records, as :meth:`DSPClient.get_region_metadata` does."""
+        query = (
+            "SELECT record FROM region_metadata"
+            " WHERE country_code = ? AND resolution = ?"
+        )
+        params = [country_code.lower(), spatial_resolution]
+
+        if region_code is not None:
+            query += " AND region_code = ?"
+            params.append(region_code)
+
+        return self._records(query + " ORDER BY rowid", params)
+
+    def variable_metadata(
+        self, country_code: str, variable: Optional[str]
+    ) -> List[dict]:
+        """Return the variable metadata records, as :meth:`DSPClient.get_variable_metadata` does."""
+        query = "SELECT record FROM variable_metadata WHERE country_code = ?"
+        params = [country_code.lower()]
+
+        if variable is not None:
+            query += " AND var_name = ?"
+            params.append(variable)
+
+        return self._records(query + " ORDER BY rowid", params)
+
+    def proxy_details(self, country_code: str, variable: str) -> List[dict]:
+        """Return the proxy details records, as :meth:`DSPClient.get_proxy_details` does."""
+        return self._records(
+            "SELECT record FROM proxy_details"
+            " WHERE country_code = ? AND var_name = ? ORDER BY rowid",
+            (country_code.lower(), variable),
+        )
+
+    def variable_data(
+        self,
+        country_code: str,
+        spatial_resolution: str,
+        variable: str,
+        pathway_description: Optional[str],
+        climate_experiment: Optional[str],
+    ) -> List[dict]:
+        """Return the variable data records, as :meth:`DSPClient.get_variable_data` does."""
+        conditions, params = _scenario_filters(pathway_description, climate_experiment)
+
+        return self._records(
+            "SELECT record FROM variable_data"
+            " WHERE country_code = ? AND var_name = ? AND resolution = ?"
+            f"{conditions} ORDER BY rowid",
+            [country_code.lower(), variable, spatial_resolution, *params],
+        )
+
+    def region_data(
+        self,
+        country_code: str,
+        region_code: str,
+        variable: Optional[str],
+        pathway_description: Optional[str],
+        climate_experiment: Optional[str],
+        mini_version: Optional[bool],
+    ) -> List[dict]:
+        """
+        Return the data records of a region, as :meth:`DSPClient.get_region_data` does.
+
+        The records are the variable data of the region, with the fields of the
+        variable metadata. With `mini_version`, only `MINI_VERSION_FIELDS` are added.
+        """
+        # variables in the order of the variable metadata, as in the records of the DSP
+        query = (
+            "SELECT data.var_name, data.record, metadata.record"
+            " FROM variable_data AS data JOIN variable_metadata AS metadata"
+            " ON metadata.country_code = data.country_code"
+            " AND metadata.var_name = data.var_name"
+            " WHERE data.country_code = ? AND data.region_code = ?"
+        )
+        params = [country_code.lower(), region_code]
+
+        if variable is not None:
+            query += " AND data.var_name = ?"
+            params.append(variable)
+
+        conditions, scenario_params = _scenario_filters(
+            pathway_description, climate_experiment
+        )
+
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                f"{query}{conditions} ORDER BY metadata.rowid, data.rowid",
+                [*params, *scenario_params],
+            ).fetchall()
+
+        result_collection = []
+        for var_name, record, metadata_record in rows:
+            result = {
+                key: value
+                for key, value in json.loads(record).items()
+                if key not in ("region_code", "value_confidence_level")
+            }
+            result["var_name"] = var_name
+
+            # the unit comes first, as in the records of the DSP
+            variable_metadata = json.loads(metadata_record)
+            for key in ("var_unit", *variable_metadata):
+                if key == "var_name" or key not in variable_metadata:
+                    continue
+                if not mini_version or key in MINI_VERSION_FIELDS:
+                    result[key] = variable_metadata[key]
+
+            result_collection.append(result)
+
+        return result_collection
@@ -0,0 +1,233 @@
+"""Retry policy and circuit breaker for requests to the DSP."""
+import copy
+import time
+import random
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised instead of sending a request while the circuit breaker is open."""
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Policy of retrying requests that failed transiently.
+
+    A request is retried if the DSP answers with one of `retry_statuses`, or if the
+    connection fails or times out. The n-th retry waits `backoff_factor * 2 ** (n - 1)`
+    seconds, at most `max_backoff`, shortened by a random fraction of up to `jitter`,
+    so that concurrent workers do not retry in lockstep. If the DSP sends a
+    `Retry-After` header, its delay is used instead.
+
+    **Default arguments:**
+
+    :param max_attempts: the maximum number of attempts per request, including the
+        first. Set to 1 to disable retries
+        |br| * the default value is 5
+    :type max_attempts: int
+
+    :param backoff_factor: the delay before the first retry, in seconds
+        |br| * the default value is 0.5
+    :type backoff_factor: float
+
+    :param max_backoff: the maximum delay between two attempts, in seconds
+        |br| * the default value is 60
+    :type max_backoff: float
+
+    :param jitter: the maximum fraction by which a delay is randomly shortened
+        |br| * the default value is 0.5
+    :type jitter: float
+
+    :param retry_statuses: the HTTP status codes that are retried
+        |br| * the default value is (429, 502, 503, 504)
+    :type retry_statuses: tuple
+
+    :param retry_timeouts: indicates whether requests whose response timed out are retried
+        |br| * the default value is True
+    :type retry_timeouts: bool
+
+    :param respect_retry_after: indicates whether the `Retry-After` header is honoured
+        |br| * the default value is True
+    :type respect_retry_after: bool
+
+    :param max_total_time: the maximum time in seconds a query may spend, across all
+        its pages. No retry is made that would end after this time.
+        If None, the time is not limited
+        |br| * the default value is 600
+    :type max_total_time: float
+    """
+
+    max_attempts: int = 5
+    backoff_factor: float = 0.5
+    max_backoff: float = 60
+    jitter: float = 0.5
+    retry_statuses: Tuple[int, ...] = (429, 502, 503, 504)
+    retry_timeouts: bool = True
+    respect_retry_after: bool = True
+    max_total_time: Optional[float] = 600
+    started_at: Optional[float] = field(default=None, compare=False, repr=False)
+    circuit_breaker: Optional["CircuitBreaker"] = field(
+        default=None, compare=False, repr=False
+    )
+
+    def start(
+        self, circuit_breaker: Optional["CircuitBreaker"] = None
+    ) -> "RetryPolicy":
+        """
+        Return a copy of the policy whose `max_total_time` counts from now, for one query.
+
+        **Default arguments:**
+
+        :param circuit_breaker: the circuit breaker of the requests of the query
+            |br| * the default value is None. If None, the query has a breaker of its own.
+        :type circuit_breaker: CircuitBreaker
+
+        :returns: The started policy
+        :rtype: RetryPolicy
+        """
+        policy = copy.copy(self)
+        policy.started_at = time.monotonic()
+        policy.circuit_breaker = circuit_breaker or CircuitBreaker()
+        return policy
+
+    def next_delay(
+        self, attempt: int, retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        Return the delay before the next attempt of a request, or None if it should not be retried.
+
+        :param attempt: the number of the attempt that failed, starting at 1
+        :type attempt: int
+
+        :param retry_after: the `Retry-After` header of the failed response
+        :type retry_after: str
+
+        :returns: The delay in seconds
+        :rtype: float
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        delay = None
+        if self.respect_retry_after and retry_after is not None:
+            delay = parse_retry_after(retry_after)
+
+        if delay is None:
+            delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+            delay *= 1 - self.jitter * random.random()
+
+        if self.max_total_time is not None and self.started_at is not None:
+            remaining_time = self.started_at + self.max_total_time - time.monotonic()
+            if delay > remaining_time:
+                return None
+
+        return delay
+
+
+def parse_retry_after(retry_after: str) -> Optional[float]:
+    """
+    Return the delay of a `Retry-After` header, given either in seconds or as an HTTP date.
+
+    :param retry_after: the value of the header
+    :type retry_after: str
+
+    :returns: The delay in seconds, or None if the value cannot be parsed
+    :rtype: float
+    """
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class CircuitBreaker:
+    """
+    Thread-safe circuit breaker, failing requests fast once the DSP is clearly down.
+
+    After `failure_threshold` consecutive failures (server errors, failed connections
+    and timeouts), the breaker opens and requests raise `CircuitOpenError` without
+    being sent. After `reset_timeout` seconds, a single trial request is let through:
+    if it succeeds, the breaker closes again, otherwise it stays open for another
+    `reset_timeout`.
+
+    Queries share a breaker if it is given to their client, or if they are run by the
+    same batch, e.g. :meth:`DSPClient.get_region_data_many`. As the default
+    `RetryPolicy` makes as many attempts per request as the default
+    `failure_threshold`, the breaker of a single query only opens once the query has
+    given up; it stops the other queries sharing it.
+
+    **Default arguments:**
+
+    :param failure_threshold: the number of consecutive failures that open the breaker
+        |br| * the default value is 5
+    :type failure_threshold: int
+
+    :param reset_timeout: the time in seconds after which a trial request is let through
+        |br| * the default value is 30
+    :type reset_timeout: float
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Return the state of the breaker, one of 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def before_request(self) -> None:
+        """Raise `CircuitOpenError` if a request may not be sent now."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+
+            elapsed_time = time.monotonic() - self._opened_at
+            if elapsed_time < self.reset_timeout or self._trial_in_flight:
+                raise CircuitOpenError(
+                    f"The DSP failed {self._failures} times in a row. "
+                    f"Requests are paused for {self.reset_timeout} seconds."
+                )
+
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a request answered by the DSP, closing the breaker."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a failed request, opening the breaker after `failure_threshold` failures."""
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
@@ -1,33 +1,292 @@
-"""utils file."""
+"""Profiling of functions: latency histograms, and cProfile and tracemalloc captures."""
+import bisect
+import cProfile
+import json
+import math
+import os
+import pstats
+import threading
 import time
+import tracemalloc
 from functools import wraps
-from typing import Any, Callable
-import logging
+from typing import Any, Callable, Dict, List, Optional
 
-utils_log = logging.getLogger("utils")
-logging.basicConfig(level=logging.INFO)
+# upper bounds of the latency buckets in seconds, 4 per doubling from 0.1 ms to ~28 min
+LATENCY_BUCKETS = tuple(1e-4 * 2 ** (i / 4) for i in range(4 * 24))
 
 
-def measure_time(func_call: Callable) -> Any:
+class LatencyHistogram:
+    """Counts of the latencies of a function per bucket, from which percentiles are estimated."""
+
+    def __init__(self) -> None:
+        # the last count is of the latencies above the last bucket
+        self.counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        """Add a latency."""
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """
+        Return an estimate of a percentile of the latencies, interpolated within its bucket.
+
+        :param q: the percentile, between 0 and 1. E.g. 0.95
+        :type q: float
+
+        :returns: The latency in seconds, or NaN if there are none
+        :rtype: float
+        """
+        if not self.count:
+            return math.nan
+
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                value = lower + (upper - lower) * (rank - cumulative) / count
+                return min(max(value, self.min), self.max)
+            cumulative += count
+
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """Return the count, total, extremes and p50/p95/p99 of the latencies, in seconds."""
+        return {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min if self.count else math.nan,
+            "max": self.max if self.count else math.nan,
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class Profiler:
     """
-    Wrap around a function to track the time taken by the function.
+    Records the latency of each call of the functions wrapped with :meth:`wrap`.
 
-    :param func: Function
+    While disabled, a wrapped function costs one attribute lookup per call. The cProfile
+    and tracemalloc captures are global to the interpreter, so they are made around one
+    call at a time: calls made while another is captured, e.g. nested or concurrent
+    ones, only have their latency recorded.
 
-    .. note:: Usage as a decorator before a function -> @timer
+    **Default arguments:**
 
+    :param enabled: indicates whether calls are recorded
+        |br| * the default value is False
+    :type enabled: bool
+
+    :param cprofile: indicates whether calls are run under cProfile. The statistics of
+        each function are returned by :meth:`stats`
+        |br| * the default value is False
+    :type cprofile: bool
+
+    :param trace_memory: indicates whether the peak memory allocated during each call
+        is traced with tracemalloc
+        |br| * the default value is False
+    :type trace_memory: bool
     """
 
-    @wraps(
-        func_call
-    )  # Required to get documentation for functions using this decorator
-    def _f(*args: Any, **kwargs: Any) -> Any:
+    def __init__(
+        self, enabled: bool = False, cprofile: bool = False, trace_memory: bool = False
+    ) -> None:
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._profiles: Dict[str, pstats.Stats] = {}
+        self._peak_memory: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._capture_lock = threading.Lock()
+
+    def configure(
+        self, enabled: bool = True, cprofile: bool = False, trace_memory: bool = False
+    ) -> None:
+        """Enable or disable the profiler and its captures. See :class:`Profiler`."""
+        self.enabled = enabled
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+
+    def reset(self) -> None:
+        """Remove all recorded latencies and captures."""
+        with self._lock:
+            self._histograms.clear()
+            self._profiles.clear()
+            self._peak_memory.clear()
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add the latency of a call of the function `name`."""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.add(seconds)
+
+    def wrap(self, func_call: Callable) -> Callable:
+        """
+        Return a wrapper of a function that records its calls while the profiler is enabled.
+
+        :param func_call: the function
+        :type func_call: Callable
+
+        :returns: The wrapper
+        :rtype: Callable
+        """
+        name = f"{func_call.__module__}.{func_call.__qualname__}"
+
+        @wraps(func_call)
+        def _f(*args: Any, **kwargs: Any) -> Any:
+            if not self.enabled:
+                return func_call(*args, **kwargs)
+
+            return self._measure(name, func_call, args, kwargs)
+
+        return _f
+
+    def _measure(
+        self, name: str, func_call: Callable, args: tuple, kwargs: dict
+    ) -> Any:
+        """Call a function, recording its latency and, if no other call is captured, capturing it."""
+        capture = (self.cprofile or self.trace_memory) and self._capture_lock.acquire(
+            blocking=False
+        )
+        if not capture:
+            before = time.perf_counter()
+            try:
+                return func_call(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - before)
+
+        profile = cProfile.Profile() if self.cprofile else None
+        trace_memory = self.trace_memory
+        started_tracing = trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if trace_memory:
+            tracemalloc.reset_peak()
+
         before = time.perf_counter()
-        r_v = func_call(*args, **kwargs)
-        after = time.perf_counter()
+        try:
+            if profile is not None:
+                return profile.runcall(func_call, *args, **kwargs)
+            return func_call(*args, **kwargs)
+        finally:
+            self.record(name, time.perf_counter() - before)
+            try:
+                self._add_capture(name, profile, trace_memory)
+                if started_tracing:
+                    tracemalloc.stop()
+            finally:
+                self._capture_lock.release()
+
+    def _add_capture(
+        self, name: str, profile: Optional[cProfile.Profile], trace_memory: bool
+    ) -> None:
+        """Add the cProfile statistics and the traced peak memory of a call."""
+        with self._lock:
+            if profile is not None:
+                if name in self._profiles:
+                    self._profiles[name].add(profile)
+                else:
+                    self._profiles[name] = pstats.Stats(profile)
+
+            if trace_memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                self._peak_memory[name] = max(self._peak_memory.get(name, 0), peak)
+
+    def stats(self, name: str) -> Optional[pstats.Stats]:
+        """
+        Return the cProfile statistics of the captured calls of a function.
+
+        :param name: the module and qualified name of the function.
+            E.g. 'zoomin_client.client.get_region_data'
+        :type name: str
+
+        :returns: The statistics, or None if no call was captured
+        :rtype: pstats.Stats
+        """
+        return self._profiles.get(name)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Return the latency summary of each recorded function, and its peak memory if traced.
+
+        :returns: The count, total, min, max, p50, p95 and p99 in seconds, and
+            'peak_memory' in bytes, by function name
+        :rtype: dict
+        """
+        with self._lock:
+            summaries = {
+                name: histogram.summary()
+                for name, histogram in sorted(self._histograms.items())
+            }
+            for name, peak in self._peak_memory.items():
+                summaries[name]["peak_memory"] = peak
+
+        return summaries
+
+    def to_json(self) -> str:
+        """Return :meth:`summary` as JSON."""
+        return json.dumps(self.summary(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """
+        Return the latency histograms in the Prometheus text exposition format.
 
-        time_taken = round((after - before) / 60, 2)
-        utils_log.info(f"Elapsed time for {func_call}: {time_taken} minutes")
-        return r_v
+        :returns: The 'zoomin_client_call_seconds' histogram, labelled by function
+        :rtype: str
+        """
+        lines = [
+            "# HELP zoomin_client_call_seconds Latency of profiled function calls.",
+            "# TYPE zoomin_client_call_seconds histogram",
+        ]
+        with self._lock:
+            for name, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                bounds = [*map(repr, LATENCY_BUCKETS), "+Inf"]
+                for bound, count in zip(bounds, histogram.counts):
+                    cumulative += count
+                    lines.append(
+                        f'zoomin_client_call_seconds_bucket{{function="{name}",'
+                        f'le="{bound}"}} {cumulative}'
+                    )
+                lines.append(
+                    f'zoomin_client_call_seconds_sum{{function="{name}"}} '
+                    f"{histogram.total!r}"
+                )
+                lines.append(
+                    f'zoomin_client_call_seconds_count{{function="{name}"}} '
+                    f"{histogram.count}"
+                )
 
-    return _f
+        return "\n".join(lines) + "\n"
+
+
+# the profiler of the functions wrapped with `measure_time`
+profiler = Profiler(enabled=os.environ.get("ZOOMIN_PROFILE", "0") not in ("", "0"))
+
+
+def measure_time(func_call: Callable) -> Any:
+    """
+    Wrap around a function to record the time taken by each call in `profiler`.
+
+    Nothing is recorded unless the profiler is enabled, with `profiler.configure()` or
+    by setting the environment variable ZOOMIN_PROFILE to 1.
+
+    :param func: Function
+
+    .. note:: Usage as a decorator before a function -> @measure_time
+
+    """
+    return profiler.wrap(func_call)